@@ -50,6 +50,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "cars_api.metrics.MetricsMiddleware",
+    "cars_api.db_router.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -95,6 +97,24 @@ DATABASES = {
 }
 
 
+# Read replicas (optional), space separated "host:port" of PostgreSQL replicas of the default db (same db name and
+# credentials), or paths of db files standing in for replicas with SQLite (local testing). Reads of GET list
+# endpoints go to a random replica, except for clients which wrote data in the last REPLICA_STICKINESS_WINDOW
+# seconds (see cars_api.db_router)
+
+for index, replica in enumerate(os.environ.get("POSTGRES_REPLICAS", "").split(), start=1):
+    if "sqlite" in (DATABASES["default"]["ENGINE"] or ""):
+        replica_overrides = {"NAME": replica}
+    else:
+        replica_host, _, replica_port = replica.partition(":")
+        replica_overrides = {"HOST": replica_host, "PORT": replica_port or DATABASES["default"]["PORT"]}
+    DATABASES[f"replica_{index}"] = {**DATABASES["default"], **replica_overrides}
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["cars_api.db_router.ReplicaRouter"]
+REPLICA_STICKINESS_WINDOW = float(os.getenv("REPLICA_STICKINESS_WINDOW", "5"))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -147,3 +167,85 @@ REST_FRAMEWORK = {
         "rest_framework.renderers.JSONRenderer",
     ]
 }
+
+
+# External api (vPIC) cache, shared by worker processes (stored in db)
+# TTL in seconds for known makes (0 turns cache off) and unknown makes, max number of cached makes (LRU eviction)
+# Min interval in seconds between writes of LRU position of an entry, and of hits counted by a worker process (LRU order
+# is approximate within the interval, entries above the limit are evicted on insert and with hits write)
+
+VPIC_CACHE_TTL = int(os.getenv("VPIC_CACHE_TTL", "86400"))
+VPIC_CACHE_NEGATIVE_TTL = int(os.getenv("VPIC_CACHE_NEGATIVE_TTL", "3600"))
+VPIC_CACHE_MAX_ENTRIES = int(os.getenv("VPIC_CACHE_MAX_ENTRIES", "10000"))
+VPIC_CACHE_TOUCH_INTERVAL = int(os.getenv("VPIC_CACHE_TOUCH_INTERVAL", "60"))
+
+
+# External api (vPIC) http client, one pooled keep-alive session per worker process
+# Timeouts in seconds, number of retries (on connection errors and 5xx responses) with exponential backoff factor,
+# deadline in seconds of a whole call with retries (keep it below worker timeout, gunicorn --timeout 30 in Dockerfile)
+
+VPIC_CONNECT_TIMEOUT = float(os.getenv("VPIC_CONNECT_TIMEOUT", "3.05"))
+VPIC_READ_TIMEOUT = float(os.getenv("VPIC_READ_TIMEOUT", "10"))
+VPIC_RETRIES = int(os.getenv("VPIC_RETRIES", "2"))
+VPIC_BACKOFF_FACTOR = float(os.getenv("VPIC_BACKOFF_FACTOR", "0.3"))
+VPIC_DEADLINE = float(os.getenv("VPIC_DEADLINE", "20"))
+VPIC_POOL_SIZE = int(os.getenv("VPIC_POOL_SIZE", "10"))
+
+# Per-process circuit breaker of external api: opens after a number of consecutive failed calls (0 turns it off), calls
+# fail fast while it's open, after reset timeout (seconds) a limited number of trial calls decides if it closes again
+
+VPIC_BREAKER_FAILURES = int(os.getenv("VPIC_BREAKER_FAILURES", "5"))
+VPIC_BREAKER_RESET_TIMEOUT = float(os.getenv("VPIC_BREAKER_RESET_TIMEOUT", "30"))
+VPIC_BREAKER_HALF_OPEN_CALLS = int(os.getenv("VPIC_BREAKER_HALF_OPEN_CALLS", "1"))
+
+
+# Local vPIC catalogue mirror (see import_vpic_catalogue command), used to validate cars without external api
+# "off" - not used, "only" - catalogue only, "fallback" - external api is called for pairs missing in catalogue
+
+VPIC_CATALOGUE_MODE = os.getenv("VPIC_CATALOGUE_MODE", "off")
+
+
+# Rate ingestion, "direct" - rates are saved by request, "buffered" - rates are accepted into a buffer (staging
+# table) and moved into Rate table in batches by flush_rate_buffer command. Max batch size and wait time in seconds
+# of the flusher after partial batch
+
+RATE_INGESTION_MODE = os.getenv("RATE_INGESTION_MODE", "direct")
+RATE_BUFFER_FLUSH_SIZE = int(os.getenv("RATE_BUFFER_FLUSH_SIZE", "5000"))
+RATE_BUFFER_FLUSH_INTERVAL = float(os.getenv("RATE_BUFFER_FLUSH_INTERVAL", "1.0"))
+
+
+# Car verification against external api, "sync" - car is verified by POST /cars/ request, "queued" - car is saved as
+# pending and verified by verify_cars worker in batches. Max batch size, number of concurrent lookups, wait time
+# after partial batch, job lease and base retry delay (doubled after every failed attempt) in seconds
+
+CAR_VERIFICATION_MODE = os.getenv("CAR_VERIFICATION_MODE", "sync")
+CAR_VERIFICATION_BATCH_SIZE = int(os.getenv("CAR_VERIFICATION_BATCH_SIZE", "500"))
+CAR_VERIFICATION_CONCURRENCY = int(os.getenv("CAR_VERIFICATION_CONCURRENCY", "4"))
+CAR_VERIFICATION_INTERVAL = float(os.getenv("CAR_VERIFICATION_INTERVAL", "1.0"))
+CAR_VERIFICATION_LEASE = float(os.getenv("CAR_VERIFICATION_LEASE", "300"))
+CAR_VERIFICATION_RETRY_DELAY = float(os.getenv("CAR_VERIFICATION_RETRY_DELAY", "5"))
+
+
+# Bayesian average rating of a car, mean and weight (number of rates) of prior rating
+
+RATING_PRIOR_MEAN = float(os.getenv("RATING_PRIOR_MEAN", "3.0"))
+RATING_PRIOR_WEIGHT = int(os.getenv("RATING_PRIOR_WEIGHT", "10"))
+
+
+# Time-windowed popularity (/popular/?window=7d), daily rate rollups are kept for RATE_ROLLUP_RETENTION_DAYS days
+# (the longest window), older ones are merged into monthly rollups by rollup_rates command
+
+RATE_ROLLUP_RETENTION_DAYS = int(os.getenv("RATE_ROLLUP_RETENTION_DAYS", "90"))
+
+
+# Car search (/cars/search/), on databases other than PostgreSQL cars are searched with in-memory index of every
+# worker process, which is rebuilt after data changes at most every SEARCH_INDEX_MAX_AGE seconds
+
+SEARCH_INDEX_MAX_AGE = float(os.getenv("SEARCH_INDEX_MAX_AGE", "60"))
+
+
+# /metrics endpoint clients, addresses (space separated, localhost by default) and bearer token (none by default) of
+# Prometheus scrapers. Other clients get 404, metrics of routes and traffic aren't public
+
+METRICS_ALLOWED_IPS = os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1 ::1").split()
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
@@ -0,0 +1,45 @@
+"""
+API-only settings profile, for processes serving the public JSON api.
+
+Same as app.settings, without admin, sessions, messages, templates, static files and middleware the JSON api doesn't
+use (CSRF, authentication, messages, clickjacking), so they don't cost per-request work. Startup time barely
+changes, it's dominated by Django and DRF imports (see benchmarks/settings_profiles.py).
+Admin is served by a separate process running with app.settings (full profile).
+
+Usage:
+    DJANGO_SETTINGS_MODULE=app.settings_api gunicorn app.wsgi:application
+"""
+
+from .settings import *  # noqa: F401, F403
+
+# Auth and contenttypes provide no middleware or views here, they're kept so `boot` of any profile migrates the same
+# schema (admin and sessions tables are created by the full profile)
+INSTALLED_APPS = [
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "rest_framework",
+    "app",
+    "cars_api",
+]
+
+MIDDLEWARE = [
+    "cars_api.metrics.MetricsMiddleware",
+    "cars_api.db_router.ReplicaRoutingMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.middleware.common.CommonMiddleware",
+]
+
+ROOT_URLCONF = "app.urls_api"
+
+TEMPLATES = []  # type: ignore
+
+# Api messages are in English only, so translation catalogs aren't loaded on the first request
+USE_I18N = False
+
+# No sessions or users: every request is anonymous, without authenticators (and CSRF check they'd do)
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,  # noqa: F405
+    "DEFAULT_AUTHENTICATION_CLASSES": [],
+    "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.AllowAny"],
+    "UNAUTHENTICATED_USER": None,
+}
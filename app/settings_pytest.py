@@ -49,6 +49,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "cars_api.metrics.MetricsMiddleware",
+    "cars_api.db_router.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -94,6 +96,18 @@ DATABASES = {
 }
 
 
+# Separate (not replicated) db standing in for a read replica in tests of db router, which turn replica reads on with
+# settings fixture
+
+DATABASES["replica"] = {**DATABASES["default"]}
+if "sqlite" not in (DATABASES["default"]["ENGINE"] or ""):
+    DATABASES["replica"]["TEST"] = {"NAME": f"test_{DATABASES['default']['NAME']}_replica"}
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias not in ("default", "replica")]
+DATABASE_ROUTERS = ["cars_api.db_router.ReplicaRouter"]
+REPLICA_STICKINESS_WINDOW = 5.0
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -135,6 +149,13 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 
+# Cache
+# Responses of list endpoints are cached by data version, which is bumped on commit, so tests running in a single
+# transaction would get stale responses. Tests of response cache turn it on with settings fixture
+
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -146,3 +167,86 @@ REST_FRAMEWORK = {
         "rest_framework.renderers.JSONRenderer",
     ]
 }
+
+
+# External api (vPIC) cache, shared by worker processes (stored in db)
+# Turned off by default in tests (external api tests don't use db), tests of cache turn it on with settings fixture
+
+VPIC_CACHE_TTL = 0
+VPIC_CACHE_NEGATIVE_TTL = 3600
+VPIC_CACHE_MAX_ENTRIES = 10000
+VPIC_CACHE_TOUCH_INTERVAL = 60
+
+
+# External api (vPIC) http client, one pooled keep-alive session per worker process
+# Timeouts in seconds, number of retries (on connection errors and 5xx responses) with exponential backoff factor,
+# deadline in seconds of a whole call with retries (keep it below worker timeout, gunicorn --timeout 30 in Dockerfile)
+# Retries are turned off by default in tests (errors mocked by external api tests would be retried), tests of retries
+# turn them on
+
+VPIC_CONNECT_TIMEOUT = float(os.getenv("VPIC_CONNECT_TIMEOUT", "3.05"))
+VPIC_READ_TIMEOUT = float(os.getenv("VPIC_READ_TIMEOUT", "10"))
+VPIC_RETRIES = 0
+VPIC_BACKOFF_FACTOR = float(os.getenv("VPIC_BACKOFF_FACTOR", "0.3"))
+VPIC_DEADLINE = float(os.getenv("VPIC_DEADLINE", "20"))
+VPIC_POOL_SIZE = int(os.getenv("VPIC_POOL_SIZE", "10"))
+
+
+# Per-process circuit breaker of external api
+# Turned off by default in tests (failures mocked by external api tests would open it), tests of breaker turn it on
+
+VPIC_BREAKER_FAILURES = 0
+VPIC_BREAKER_RESET_TIMEOUT = 30.0
+VPIC_BREAKER_HALF_OPEN_CALLS = 1
+
+
+# Local vPIC catalogue mirror (see import_vpic_catalogue command), used to validate cars without external api
+# "off" - not used, "only" - catalogue only, "fallback" - external api is called for pairs missing in catalogue
+
+VPIC_CATALOGUE_MODE = "off"
+
+
+# Rate ingestion, "direct" - rates are saved by request, "buffered" - rates are accepted into a buffer (staging
+# table) and moved into Rate table in batches by flush_rate_buffer command. Max batch size and wait time in seconds
+# of the flusher after partial batch
+
+RATE_INGESTION_MODE = "direct"
+RATE_BUFFER_FLUSH_SIZE = int(os.getenv("RATE_BUFFER_FLUSH_SIZE", "5000"))
+RATE_BUFFER_FLUSH_INTERVAL = float(os.getenv("RATE_BUFFER_FLUSH_INTERVAL", "1.0"))
+
+
+# Car verification against external api, "sync" - car is verified by POST /cars/ request, "queued" - car is saved as
+# pending and verified by verify_cars worker in batches. Max batch size, number of concurrent lookups, wait time
+# after partial batch, job lease and base retry delay (doubled after every failed attempt) in seconds
+
+CAR_VERIFICATION_MODE = "sync"
+CAR_VERIFICATION_BATCH_SIZE = int(os.getenv("CAR_VERIFICATION_BATCH_SIZE", "500"))
+CAR_VERIFICATION_CONCURRENCY = int(os.getenv("CAR_VERIFICATION_CONCURRENCY", "4"))
+CAR_VERIFICATION_INTERVAL = float(os.getenv("CAR_VERIFICATION_INTERVAL", "1.0"))
+CAR_VERIFICATION_LEASE = float(os.getenv("CAR_VERIFICATION_LEASE", "300"))
+CAR_VERIFICATION_RETRY_DELAY = float(os.getenv("CAR_VERIFICATION_RETRY_DELAY", "5"))
+
+
+# Bayesian average rating of a car, mean and weight (number of rates) of prior rating
+
+RATING_PRIOR_MEAN = float(os.getenv("RATING_PRIOR_MEAN", "3.0"))
+RATING_PRIOR_WEIGHT = int(os.getenv("RATING_PRIOR_WEIGHT", "10"))
+
+
+# Time-windowed popularity (/popular/?window=7d), daily rate rollups are kept for RATE_ROLLUP_RETENTION_DAYS days
+# (the longest window), older ones are merged into monthly rollups by rollup_rates command
+
+RATE_ROLLUP_RETENTION_DAYS = int(os.getenv("RATE_ROLLUP_RETENTION_DAYS", "90"))
+
+
+# Car search (/cars/search/), on databases other than PostgreSQL cars are searched with in-memory index of every
+# worker process, which is rebuilt after data changes at most every SEARCH_INDEX_MAX_AGE seconds
+
+SEARCH_INDEX_MAX_AGE = float(os.getenv("SEARCH_INDEX_MAX_AGE", "60"))
+
+
+# /metrics endpoint clients, addresses (space separated, localhost by default) and bearer token (none by default) of
+# Prometheus scrapers. Other clients get 404, metrics of routes and traffic aren't public
+
+METRICS_ALLOWED_IPS = os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1 ::1").split()
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
@@ -0,0 +1,6 @@
+"""API-only URL Configuration (app.settings_api profile), public api without admin."""
+from django.urls import include, path
+
+urlpatterns = [
+    path('', include('cars_api.urls'))
+]
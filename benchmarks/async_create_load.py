@@ -0,0 +1,191 @@
+"""Load test of concurrent car creation: sync view under WSGI (gunicorn) vs async view under ASGI (uvicorn).
+
+Both servers run a single process against a local stub vPIC api with configurable latency and a temporary sqlite db,
+so the result shows how many upstream lookups one process can keep in flight.
+
+Usage:
+    python -m benchmarks.async_create_load --requests 200 --concurrency 50 --latency 0.2
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import requests
+
+from benchmarks.stub_vpic import start_stub
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    "sync_wsgi": {
+        "command": ["gunicorn", "app.wsgi:application", "--workers", "1", "--bind"],
+        "path": "/cars/",
+    },
+    "async_asgi": {
+        "command": ["uvicorn", "app.asgi:application", "--workers", "1", "--log-level", "warning", "--bind"],
+        "path": "/cars/async/",
+    },
+}
+
+
+def free_port() -> int:
+    """Find free local port.
+
+    Returns:
+        int: Port number.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_env(api_url: str, db_path: str) -> Dict[str, str]:
+    """Build environment of benchmarked server.
+
+    Args:
+        api_url (str): Stub vPIC api url
+        db_path (str): Path of sqlite db file
+
+    Returns:
+        Dict[str, str]: Environment variables.
+    """
+    env = dict(os.environ)
+    env.update(
+        {
+            "FROM_DOCKER": "True",
+            "DJANGO_SECRET_KEY": env.get("DJANGO_SECRET_KEY", "benchmark"),
+            "DJANGO_ALLOWED_HOSTS": "127.0.0.1 localhost",
+            "POSTGRES_ENGINE": "django.db.backends.sqlite3",
+            "POSTGRES_DB": db_path,
+            "EXTERNAL_API_URL": api_url,
+            # Every create has to reach the upstream
+            "VPIC_CACHE_TTL": "0",
+        }
+    )
+    env.pop("DJANGO_DEBUG", None)
+    return env
+
+
+def create_schema(env: Dict[str, str]) -> None:
+    """Create db schema: apply migrations, then create tables of models which aren't covered by migrations.
+
+    Args:
+        env (Dict[str, str]): Server environment
+    """
+    subprocess.run([sys.executable, "manage.py", "migrate", "-v", "0"], cwd=BASE_DIR, env=env, check=True)
+    code = (
+        "import django; django.setup()\n"
+        "from django.apps import apps\n"
+        "from django.db import connection\n"
+        "tables = connection.introspection.table_names()\n"
+        "with connection.schema_editor() as editor:\n"
+        "    for model in apps.get_models():\n"
+        "        if model._meta.db_table not in tables:\n"
+        "            editor.create_model(model)\n"
+    )
+    subprocess.run(
+        [sys.executable, "-c", code], cwd=BASE_DIR, env={**env, "DJANGO_SETTINGS_MODULE": "app.settings"}, check=True
+    )
+
+
+def wait_for_port(port: int, timeout: float = 30.0) -> None:
+    """Wait until server accepts connections.
+
+    Args:
+        port (int): Server port
+        timeout (float): Max wait time in seconds
+
+    Raises:
+        RuntimeError: Raised if server didn't start in time
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} didn't start")
+
+
+def run_scenario(name: str, env: Dict[str, str], n_requests: int, concurrency: int) -> Dict[str, Any]:
+    """Start server for a scenario and send concurrent create requests to it.
+
+    Args:
+        name (str): Scenario name (key of SCENARIOS)
+        env (Dict[str, str]): Server environment
+        n_requests (int): Number of create requests
+        concurrency (int): Number of concurrent clients
+
+    Returns:
+        Dict[str, Any]: Scenario results.
+    """
+    scenario = SCENARIOS[name]
+    port = free_port()
+    command = scenario["command"] + [f"127.0.0.1:{port}"]
+    if command[0] == "uvicorn":
+        command = command[:-2] + ["--host", "127.0.0.1", "--port", str(port)]
+    server = subprocess.Popen(command, cwd=BASE_DIR, env=env)
+    try:
+        wait_for_port(port)
+        url = f"http://127.0.0.1:{port}{scenario['path']}"
+
+        def create(i: int) -> Tuple[int, float]:
+            started = time.perf_counter()
+            response = requests.post(url, json={"make": f"{name}{i // 100}", "model": f"Model{i % 100}"})
+            return response.status_code, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(create, range(n_requests)))
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = sorted(latency for _, latency in results)
+    statuses: Dict[str, int] = {}
+    for status_code, _ in results:
+        statuses[str(status_code)] = statuses.get(str(status_code), 0) + 1
+    return {
+        "requests": n_requests,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(n_requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+        "statuses": statuses,
+    }
+
+
+def main(argv: List[str]) -> None:
+    """Run all scenarios and print results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2, help="stub upstream latency in seconds")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append")
+    args = parser.parse_args(argv)
+
+    stub, api_url = start_stub(latency=args.latency)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        env = server_env(api_url, os.path.join(tmp, "db.sqlite3"))
+        create_schema(env)
+        for name in args.scenario or sorted(SCENARIOS, reverse=True):
+            results[name] = run_scenario(name, env, args.requests, args.concurrency)
+    stub.shutdown()
+    print(json.dumps({"upstream_latency_s": args.latency, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,136 @@
+"""Benchmark of /cars/search/ queries: latency of prefix and substring queries, and query plans on PostgreSQL.
+
+Benchmark uses db configured in django settings (env variables), filled e.g. with benchmarks.data_generator. Queries
+are prefixes (1 to 5 characters) and inner substrings of search names of random cars. On PostgreSQL query plans
+(EXPLAIN ANALYZE) of both search queries are printed as well, to check that prefix query uses btree index
+car_search_name_prefix_idx (or ranking index for very common prefixes) and never sorts all matching cars. Other
+databases use in-memory index, its build time is reported separately.
+
+Usage:
+    python -m benchmarks.data_generator --cars 1000000 --rates 1000000
+    python -m benchmarks.car_search --queries 200
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+# Query kind: function returning query of a search name
+QUERY_KINDS = {
+    "prefix_1": lambda name: name[:1],
+    "prefix_2": lambda name: name[:2],
+    "prefix_3": lambda name: name[:3],
+    "prefix_5": lambda name: name[:5],
+    "substring_4": lambda name: name[len(name) // 2 : len(name) // 2 + 4],
+}
+
+
+def percentile(timings: List[float], share: float) -> float:
+    """Get percentile of timings, in milliseconds.
+
+    Args:
+        timings (List[float]): Sorted timings, in seconds
+        share (float): Percentile as a share (e.g. 0.95)
+
+    Returns:
+        float: Percentile, in milliseconds.
+    """
+    return round(timings[min(len(timings) - 1, int(share * len(timings)))] * 1000, 2)
+
+
+def measure(names: List[str], queries: int, order: str, limit: int, seed: int) -> Dict[str, Any]:
+    """Measure search latency of every query kind.
+
+    Args:
+        names (List[str]): Search names queries are taken from
+        queries (int): Number of queries of every kind
+        order (str): Ranking, key of search.ORDERINGS
+        limit (int): Max number of results
+        seed (int): Random seed
+
+    Returns:
+        Dict[str, Any]: Latency percentiles and mean number of results of every query kind.
+    """
+    from cars_api.search import search_cars
+
+    rng = random.Random(seed)
+    results = {}
+    for kind, make_query in QUERY_KINDS.items():
+        timings, found = [], 0
+        for _ in range(queries):
+            query = make_query(rng.choice(names))
+            started = time.perf_counter()
+            found += len(search_cars(query, order, limit))
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        results[kind] = {
+            "p50_ms": percentile(timings, 0.5),
+            "p95_ms": percentile(timings, 0.95),
+            "mean_results": round(found / queries, 1),
+        }
+    return results
+
+
+def explain(query: str, order: str, limit: int) -> Dict[str, str]:
+    """Get PostgreSQL query plans of prefix and substring search queries.
+
+    Args:
+        query (str): Normalized search query
+        order (str): Ranking, key of search.ORDERINGS
+        limit (int): Max number of results
+
+    Returns:
+        Dict[str, str]: EXPLAIN ANALYZE output of both queries.
+    """
+    from cars_api.models import Car
+    from cars_api.search import ORDERINGS
+
+    cars = Car.objects.verified().order_by(ORDERINGS[order], "id")
+    return {
+        "prefix": cars.filter(search_name__startswith=query)[:limit].explain(analyze=True),
+        "substring": cars.filter(search_name__contains=query)
+        .exclude(search_name__startswith=query)[:limit]
+        .explain(analyze=True),
+    }
+
+
+def main(argv: List[str]) -> None:
+    """Run benchmark against configured db and print results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200, help="number of measured queries of every kind")
+    parser.add_argument("--order", default="rating", help="ranking, rating or popular")
+    parser.add_argument("--limit", type=int, default=10, help="max number of results")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+    import django
+
+    django.setup()
+
+    from django.db import connection
+
+    from cars_api import search
+    from cars_api.models import Car
+
+    names = list(Car.objects.verified().values_list("search_name", flat=True)[:100000])
+    if not names:
+        sys.exit("No verified cars, fill db first (python -m benchmarks.data_generator)")
+    output: Dict[str, Any] = {"params": vars(args), "vendor": connection.vendor, "cars": Car.objects.count()}
+    if connection.vendor == "postgresql":
+        queries = (QUERY_KINDS["prefix_2"](names[0]), QUERY_KINDS["substring_4"](names[0]))
+        output["plans"] = {query: explain(query, args.order, args.limit) for query in queries}
+    else:
+        search.clear_memory_indexes()
+        started = time.perf_counter()
+        search.get_memory_index(args.order)
+        output["index_build_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    output["results"] = measure(names, args.queries, args.order, args.limit, args.seed)
+    print(json.dumps(output, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,106 @@
+"""Synthetic data generator for benchmarks: cars with a skewed (Zipf-like) distribution of rates.
+
+Car popularity follows 1 / rank ** skew, so a few cars get most of the rates, like in a real catalogue. Ratings are
+skewed towards high values and spread evenly over recent days. Data is inserted in batches, then rating aggregates
+and daily rollups are rebuilt once.
+Generator uses db configured in django settings (env variables), e.g. to fill a local db with 100k cars / 10M rates:
+
+Usage:
+    python -m benchmarks.data_generator --cars 100000 --rates 10000000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+from itertools import accumulate
+from typing import Dict, List
+
+# Weights of ratings 1..5
+RATING_WEIGHTS = [0.08, 0.07, 0.15, 0.3, 0.4]
+
+
+def generate(
+    n_cars: int,
+    n_rates: int,
+    skew: float = 1.1,
+    seed: int = 0,
+    models_per_make: int = 100,
+    batch_size: int = 50000,
+    days: int = 90,
+) -> Dict[str, float]:
+    """Replace stored cars and rates with synthetic data.
+
+    Car make is Make<i // models_per_make> and model is Model<i % models_per_make>, so every car is valid for stub
+    vPIC api (benchmarks.stub_vpic) with the same models_per_make.
+
+    Args:
+        n_cars (int): Number of cars
+        n_rates (int): Number of rates
+        skew (float): Exponent of car popularity distribution (0 for uniform)
+        seed (int): Random seed, the same seed gives the same data
+        models_per_make (int): Number of models of every make
+        batch_size (int): Number of records inserted with a single query
+        days (int): Number of days rates are spread over, ending now
+
+    Returns:
+        Dict[str, float]: Number of generated records and generation time.
+    """
+    from django.db import transaction
+    from django.utils import timezone
+
+    from cars_api.models import Car, DailyRates, Rate
+
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    with transaction.atomic():
+        Rate.objects.all().delete()
+        Car.objects.all().delete()
+        Car.objects.bulk_create(
+            (Car(make=f"Make{i // models_per_make}", model=f"Model{i % models_per_make}") for i in range(n_cars)),
+            batch_size=batch_size,
+        )
+        car_ids: List[int] = list(Car.objects.order_by("id").values_list("id", flat=True))
+        car_weights = list(accumulate(1 / (rank + 1) ** skew for rank in range(n_cars)))
+        ratings = list(range(1, 6))
+        rating_weights = list(accumulate(RATING_WEIGHTS))
+        now = timezone.now()
+
+        inserted = 0
+        while inserted < n_rates:
+            size = min(batch_size, n_rates - inserted)
+            cars = rng.choices(car_ids, cum_weights=car_weights, k=size)
+            values = rng.choices(ratings, cum_weights=rating_weights, k=size)
+            Rate.objects.bulk_create(
+                [
+                    Rate(car_id_id=car, rating=value, created_at=now - timedelta(seconds=rng.random() * days * 86400))
+                    for car, value in zip(cars, values)
+                ]
+            )
+            inserted += size
+        # Rates were inserted with bulk_create (without aggregate updates), so aggregates are rebuilt once
+        Car.objects.rebuild_rating_aggregates()
+        DailyRates.objects.rebuild()
+    return {"cars": n_cars, "rates": n_rates, "elapsed_s": round(time.perf_counter() - started, 1)}
+
+
+def main(argv: List[str]) -> None:
+    """Fill configured db with synthetic data and print summary as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cars", type=int, default=100000)
+    parser.add_argument("--rates", type=int, default=10000000)
+    parser.add_argument("--skew", type=float, default=1.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+    import django
+
+    django.setup()
+    print(json.dumps(generate(args.cars, args.rates, args.skew, args.seed)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,220 @@
+"""Load benchmark of all endpoints against synthetic data and a local stub vPIC api.
+
+Db (temporary sqlite) is filled by benchmarks.data_generator, then for every scenario:
+    * number of db queries of a single request is counted in-process (with cold response cache),
+    * requests are sent concurrently to a gunicorn server, latency percentiles and throughput are measured.
+List responses are cached between writes (see ETag section in README), `cars_list_page` and `popular_window` ask for
+varying page sizes, so most of their requests miss the cache.
+Results are printed and can be saved as JSON (with commit hash). Pass previous results as baseline, to get p95
+latency and throughput ratios for every scenario.
+
+Usage:
+    python -m benchmarks.endpoints_load --cars 10000 --rates 1000000 --output results.json
+    python -m benchmarks.endpoints_load --baseline results.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from benchmarks.async_create_load import BASE_DIR, free_port, server_env, wait_for_port
+from benchmarks.data_generator import generate
+from benchmarks.list_serialization import setup_django
+from benchmarks.stub_vpic import start_stub
+
+# Request of a scenario: method, path and json body. Built from request number and number of generated cars
+RequestSpec = Tuple[str, str, Optional[Dict[str, Any]]]
+
+SCENARIOS: Dict[str, Callable[[int, int], RequestSpec]] = {
+    "cars_list": lambda i, n_cars: ("GET", "/cars/", None),
+    "cars_list_page": lambda i, n_cars: ("GET", f"/cars/?page_size={1 + i % 1000}", None),
+    "popular": lambda i, n_cars: ("GET", "/popular/", None),
+    "popular_window": lambda i, n_cars: ("GET", f"/popular/?window=7d&page_size={1 + i % 1000}", None),
+    "rate": lambda i, n_cars: ("POST", "/rate/", {"car_id": 1 + (i * 7919) % n_cars, "rating": 1 + i % 5}),
+    "car_create": lambda i, n_cars: ("POST", "/cars/", {"make": f"Bench{i // 100}", "model": f"Model{i % 100}"}),
+    # Every request deletes a different car, starting from the least popular ones
+    "car_delete": lambda i, n_cars: ("DELETE", f"/cars/{n_cars - i}/", None),
+}
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Get nearest-rank percentile of sorted values.
+
+    Args:
+        sorted_values (List[float]): Sorted values
+        percent (float): Percentile (0-100)
+
+    Returns:
+        float: Percentile value.
+    """
+    rank = max(int(round(percent / 100 * len(sorted_values))), 1)
+    return sorted_values[rank - 1]
+
+
+def count_queries(spec: RequestSpec) -> int:
+    """Count db queries of a single in-process request, with cold response cache.
+
+    Args:
+        spec (RequestSpec): Request method, path and body
+
+    Returns:
+        int: Number of queries.
+    """
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    method, path, body = spec
+    cache.clear()
+    client = Client()
+    with CaptureQueriesContext(connection) as queries:
+        getattr(client, method.lower())(path, data=body, content_type="application/json")
+    return len(queries)
+
+
+def run_load(base_url: str, name: str, n_cars: int, n_requests: int, concurrency: int) -> Dict[str, Any]:
+    """Send concurrent requests of a scenario and measure latency and throughput.
+
+    Args:
+        base_url (str): Server url
+        name (str): Scenario name (key of SCENARIOS)
+        n_cars (int): Number of generated cars
+        n_requests (int): Number of requests
+        concurrency (int): Number of concurrent clients
+
+    Returns:
+        Dict[str, Any]: Scenario results.
+    """
+    local = threading.local()
+
+    def send(i: int) -> Tuple[int, float]:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        method, path, body = SCENARIOS[name](i, n_cars)
+        started = time.perf_counter()
+        response = local.session.request(method, base_url + path, json=body)
+        return response.status_code, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send, range(n_requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for _, latency in results)
+    statuses: Dict[str, int] = {}
+    for status_code, _ in results:
+        statuses[str(status_code)] = statuses.get(str(status_code), 0) + 1
+    return {
+        "requests": n_requests,
+        "throughput_rps": round(n_requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "statuses": statuses,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Compare scenario results with baseline results.
+
+    Args:
+        results (Dict[str, Any]): Current results by scenario
+        baseline (Dict[str, Any]): Baseline results by scenario
+
+    Returns:
+        Dict[str, Dict[str, float]]: Ratios (current / baseline) of p95 latency and throughput, by scenario.
+    """
+    ratios = {}
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous["p95_ms"] or not previous["throughput_rps"]:
+            continue
+        ratios[name] = {
+            "p95_ratio": round(current["p95_ms"] / previous["p95_ms"], 2),
+            "throughput_ratio": round(current["throughput_rps"] / previous["throughput_rps"], 2),
+        }
+    return ratios
+
+
+def git_commit() -> Optional[str]:
+    """Get current commit hash.
+
+    Returns:
+        Optional[str]: Commit hash, or None outside of git repository.
+    """
+    result = subprocess.run(["git", "rev-parse", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def main(argv: List[str]) -> None:
+    """Generate data, run all scenarios and print (and save) results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cars", type=int, default=10000)
+    parser.add_argument("--rates", type=int, default=100000)
+    parser.add_argument("--skew", type=float, default=1.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=2, help="number of gunicorn workers")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub upstream latency in seconds")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append")
+    parser.add_argument("--output", help="path of JSON file for results")
+    parser.add_argument("--baseline", help="path of JSON file with previous results")
+    args = parser.parse_args(argv)
+    names = args.scenario or list(SCENARIOS)
+    if "car_delete" in names and args.requests >= args.cars:
+        parser.error("--requests has to be lower than --cars for car_delete scenario")
+
+    stub, api_url = start_stub(latency=args.latency)
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        env = server_env(api_url, os.path.join(tmp, "db.sqlite3"))
+        env["DJANGO_ALLOWED_HOSTS"] += " testserver"
+        os.environ.update(env)
+        setup_django(env["POSTGRES_DB"])
+        data = generate(args.cars, args.rates, args.skew, args.seed)
+
+        port = free_port()
+        server = subprocess.Popen(
+            ["gunicorn", "app.wsgi:application", "--workers", str(args.workers), "--bind", f"127.0.0.1:{port}"],
+            cwd=BASE_DIR,
+            env=env,
+        )
+        try:
+            wait_for_port(port)
+            for name in names:
+                # Probe request uses the last request number + 1, so it doesn't collide with load requests
+                queries = count_queries(SCENARIOS[name](args.requests, args.cars))
+                results[name] = run_load(f"http://127.0.0.1:{port}", name, args.cars, args.requests, args.concurrency)
+                results[name]["queries"] = queries
+        finally:
+            server.terminate()
+            server.wait()
+    stub.shutdown()
+
+    report: Dict[str, Any] = {
+        "commit": git_commit(),
+        "params": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "data": data,
+        "results": results,
+    }
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            report["comparison"] = compare(results, json.load(baseline_file)["results"])
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
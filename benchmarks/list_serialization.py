@@ -0,0 +1,141 @@
+"""Micro-benchmark of car list serialization: CarSerializer + JSONRenderer vs values() projection + orjson renderer.
+
+Cars are stored in a temporary sqlite db, both paths fetch and render the whole (unpaginated) /cars/ list, and
+rendered bytes of both paths are compared.
+
+Usage:
+    python -m benchmarks.list_serialization --cars 10000 100000 --repeat 3
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+
+def setup_django(db_path: str) -> None:
+    """Configure django with a temporary sqlite db and create tables of all models.
+
+    Args:
+        db_path (str): Path of sqlite db file
+    """
+    os.environ.update(
+        {
+            "DJANGO_SETTINGS_MODULE": "app.settings",
+            "DJANGO_SECRET_KEY": os.environ.get("DJANGO_SECRET_KEY", "benchmark"),
+            "POSTGRES_ENGINE": "django.db.backends.sqlite3",
+            "POSTGRES_DB": db_path,
+        }
+    )
+    import django
+
+    django.setup()
+
+    from django.apps import apps
+    from django.db import connection
+
+    with connection.schema_editor() as editor:
+        for model in apps.get_models():
+            editor.create_model(model)
+
+
+def fill_cars(n_cars: int) -> None:
+    """Replace stored cars with n_cars cars with various rating aggregates.
+
+    Args:
+        n_cars (int): Number of cars
+    """
+    from cars_api.models import Car
+
+    Car.objects.all().delete()
+    cars = []
+    for i in range(n_cars):
+        count = i % 7
+        rating_sum = count * (1 + i % 5)
+        cars.append(
+            Car(
+                make=f"Make{i // 100}",
+                model=f"Model{i}",
+                rates_count=count,
+                rating_sum=rating_sum,
+                avg_rating=rating_sum / count if count else 0.0,
+            )
+        )
+    Car.objects.bulk_create(cars, batch_size=5000)
+
+
+def serializer_path() -> bytes:
+    """Render car list with CarSerializer and JSONRenderer (list endpoint implementation before the fast path).
+
+    Returns:
+        bytes: Rendered list.
+    """
+    from rest_framework.renderers import JSONRenderer
+
+    from cars_api.models import Car
+    from cars_api.serializers import CarSerializer
+
+    cars = Car.objects.order_by("-avg_rating", "id")
+    return JSONRenderer().render(CarSerializer(cars, fields=("id", "make", "model", "avg_rating"), many=True).data)
+
+
+def fast_path() -> bytes:
+    """Render car list with values() projection and FastJSONRenderer (current list endpoint implementation).
+
+    Returns:
+        bytes: Rendered list.
+    """
+    from cars_api.models import Car
+    from cars_api.renderers import FastJSONRenderer
+    from cars_api.serializers import CAR_ROW_FIELDS, car_rows_to_representation
+
+    rows = Car.objects.order_by("-avg_rating", "id").values(*CAR_ROW_FIELDS)
+    return FastJSONRenderer().render(car_rows_to_representation(rows, ("id", "make", "model", "avg_rating")))
+
+
+def measure(path: Callable[[], bytes], repeat: int) -> Dict[str, Any]:
+    """Measure best time of rendering a list with given path.
+
+    Args:
+        path (Callable[[], bytes]): Rendering function
+        repeat (int): Number of runs
+
+    Returns:
+        Dict[str, Any]: Best time and rendered bytes.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        content = path()
+        timings.append(time.perf_counter() - started)
+    return {"best_ms": round(min(timings) * 1000, 1), "content": content}
+
+
+def main(argv: List[str]) -> None:
+    """Run benchmark for every requested list size and print results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cars", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, "db.sqlite3"))
+        for n_cars in args.cars:
+            fill_cars(n_cars)
+            serializer = measure(serializer_path, args.repeat)
+            fast = measure(fast_path, args.repeat)
+            results[str(n_cars)] = {
+                "serializer_ms": serializer["best_ms"],
+                "fast_ms": fast["best_ms"],
+                "speedup": round(serializer["best_ms"] / fast["best_ms"], 1),
+                "identical": serializer["content"] == fast["content"],
+                "bytes": len(fast["content"]),
+            }
+    print(json.dumps({"repeat": args.repeat, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,119 @@
+"""Micro-benchmark of "did you mean" model suggestions: trigram index vs difflib scan of all model names of a make.
+
+Model names are synthetic (random words and numbers, as in real vPIC lists), queries are model names with one typo.
+Reports index build time, mean time per query of both paths, and share of queries both paths suggest the same best
+name for.
+
+Usage:
+    python -m benchmarks.model_suggestions --models 100 1000 10000 --queries 1000
+"""
+import argparse
+import difflib
+import json
+import os
+import random
+import string
+import sys
+import time
+from typing import Any, Dict, FrozenSet, List
+
+
+def model_names(count: int, rng: random.Random) -> FrozenSet[str]:
+    """Generate lower-cased model names.
+
+    Args:
+        count (int): Number of names
+        rng (random.Random): Random generator
+
+    Returns:
+        FrozenSet[str]: Model names.
+    """
+    names = set()
+    while len(names) < count:
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 8)))
+        names.add(f"{word} {rng.randint(1, 999)}" if rng.random() < 0.5 else word)
+    return frozenset(names)
+
+
+def misspell(name: str, rng: random.Random) -> str:
+    """Replace, drop or insert a single character of the name.
+
+    Args:
+        name (str): Model name
+        rng (random.Random): Random generator
+
+    Returns:
+        str: Misspelled name.
+    """
+    i = rng.randrange(len(name))
+    return rng.choice(
+        [
+            name[:i] + rng.choice(string.ascii_lowercase) + name[i + 1 :],
+            name[:i] + name[i + 1 :],
+            name[:i] + rng.choice(string.ascii_lowercase) + name[i:],
+        ]
+    )
+
+
+def measure(count: int, queries: int, seed: int) -> Dict[str, Any]:
+    """Measure both paths for a make with given number of model names.
+
+    Args:
+        count (int): Number of model names of the make
+        queries (int): Number of queries
+        seed (int): Random seed
+
+    Returns:
+        Dict[str, Any]: Measurements.
+    """
+    from cars_api.suggestions import ModelNamesIndex, suggest_models
+
+    rng = random.Random(seed)
+    names = model_names(count, rng)
+    sorted_names = sorted(names)
+    query_names = [misspell(rng.choice(sorted_names), rng) for _ in range(queries)]
+
+    started = time.perf_counter()
+    ModelNamesIndex(names)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    suggest_models("benchmark", "", count, lambda: names)
+    started = time.perf_counter()
+    indexed = [suggest_models("benchmark", query, count, lambda: names) for query in query_names]
+    indexed_us = (time.perf_counter() - started) / queries * 1e6
+
+    started = time.perf_counter()
+    scanned = [difflib.get_close_matches(query, sorted_names, n=3, cutoff=0.6) for query in query_names]
+    scan_us = (time.perf_counter() - started) / queries * 1e6
+
+    same = sum(1 for a, b in zip(indexed, scanned) if a[:1] == b[:1])
+    return {
+        "models": count,
+        "index_build_ms": round(build_ms, 2),
+        "indexed_us": round(indexed_us, 1),
+        "difflib_scan_us": round(scan_us, 1),
+        "speedup": round(scan_us / indexed_us, 1),
+        "same_best_suggestion": round(same / queries, 3),
+    }
+
+
+def main(argv: List[str]) -> None:
+    """Run benchmark for every number of model names and print results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", type=int, nargs="+", default=[100, 1000], help="numbers of model names of a make")
+    parser.add_argument("--queries", type=int, default=1000, help="number of measured queries")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+    os.environ.setdefault("DJANGO_SECRET_KEY", "benchmark")
+    import django
+
+    django.setup()
+
+    results = [measure(count, args.queries, args.seed) for count in args.models]
+    print(json.dumps({"params": {"queries": args.queries, "seed": args.seed}, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
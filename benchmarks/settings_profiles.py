@@ -0,0 +1,146 @@
+"""Startup and per-request overhead of settings profiles: full (app.settings) vs API-only (app.settings_api).
+
+Every profile runs in fresh processes against the same temporary sqlite db (schema created with migrations, one
+rated car):
+    * startup: time of django.setup() (apps and models import), WSGI handler creation (middleware import), the first
+      request (urlconf, views, translations) and the whole process, number of imported modules - median of --starts
+      processes,
+    * per-request: mean time of --requests requests sent straight to the WSGI handler (no server, no network), for
+      a car detail request and a cached /popular/ list request, where the profile overhead is the biggest share.
+
+Usage:
+    python -m benchmarks.settings_profiles --starts 5 --requests 2000
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from benchmarks.async_create_load import BASE_DIR, create_schema, server_env
+
+PROFILES = ["app.settings", "app.settings_api"]
+# Benchmarked requests: path and query string
+REQUESTS = {"car_detail": ("/cars/1/", ""), "popular_cached": ("/popular/", "page_size=10")}
+
+
+def child(requests: int) -> Dict[str, Any]:
+    """Measure startup phases of this process, then per-request time (profile is set with DJANGO_SETTINGS_MODULE).
+
+    Args:
+        requests (int): Number of measured requests per request type (0 to measure startup only)
+
+    Returns:
+        Dict[str, Any]: Measurements.
+    """
+    from wsgiref.util import setup_testing_defaults
+
+    started = time.perf_counter()
+    import django
+
+    django.setup(set_prefix=False)
+    setup_done = time.perf_counter()
+    from django.core.handlers.wsgi import WSGIHandler
+
+    application = WSGIHandler()
+    handler_done = time.perf_counter()
+
+    def request(path: str, query: str) -> None:
+        environ: Dict[str, Any] = {"PATH_INFO": path, "QUERY_STRING": query, "HTTP_HOST": "127.0.0.1"}
+        setup_testing_defaults(environ)
+        statuses = []
+        body = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+        b"".join(body)
+        body.close()
+        assert statuses[0].startswith("200"), statuses[0]
+
+    request(*REQUESTS["car_detail"])
+    first_request_done = time.perf_counter()
+    result: Dict[str, Any] = {
+        "setup_ms": (setup_done - started) * 1000,
+        "wsgi_handler_ms": (handler_done - setup_done) * 1000,
+        "first_request_ms": (first_request_done - handler_done) * 1000,
+        "modules": len(sys.modules),
+    }
+    for name, (path, query) in REQUESTS.items():
+        if not requests:
+            break
+        request(path, query)
+        request_started = time.perf_counter()
+        for _ in range(requests):
+            request(path, query)
+        result[f"{name}_us"] = (time.perf_counter() - request_started) / requests * 1e6
+    return result
+
+
+def run_child(env: Dict[str, str], profile: str, requests: int) -> Dict[str, Any]:
+    """Run measurement in a fresh process with given profile.
+
+    Args:
+        env (Dict[str, str]): Environment of the process
+        profile (str): Settings module
+        requests (int): Number of measured requests per request type
+
+    Returns:
+        Dict[str, Any]: Measurements, with wall time of the whole process.
+    """
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.settings_profiles", "--child", "--requests", str(requests)],
+        cwd=BASE_DIR,
+        env={**env, "DJANGO_SETTINGS_MODULE": profile},
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    result = json.loads(completed.stdout)
+    result["process_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def main(argv: List[str]) -> None:
+    """Measure every profile and print results (with API-only / full ratios) as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--starts", type=int, default=5, help="number of measured process starts per profile")
+    parser.add_argument("--requests", type=int, default=1000, help="number of measured requests per request type")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        print(json.dumps(child(args.requests)))
+        return
+
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        env = server_env("http://127.0.0.1:1/", f"{tmp}/db.sqlite3")
+        create_schema(env)
+        code = (
+            "import django; django.setup()\n"
+            "from cars_api.models import Car, Rate\n"
+            "Rate.objects.create(car_id=Car.objects.create(make='Honda', model='Civic'), rating=5)\n"
+        )
+        subprocess.run(
+            [sys.executable, "-c", code], cwd=BASE_DIR, env={**env, "DJANGO_SETTINGS_MODULE": PROFILES[0]}, check=True
+        )
+        for profile in PROFILES:
+            starts = [run_child(env, profile, 0) for _ in range(args.starts)]
+            startup = {key: statistics.median(run[key] for run in starts) for key in starts[0]}
+            requests = run_child(env, profile, args.requests)
+            results[profile] = {
+                key: round(value, 1)
+                for key, value in {**startup, **{k: v for k, v in requests.items() if k.endswith("_us")}}.items()
+            }
+
+    full, api = (results[profile] for profile in PROFILES)
+    report = {
+        "params": {"starts": args.starts, "requests": args.requests},
+        "results": results,
+        "api_to_full_ratio": {key: round(api[key] / full[key], 2) for key in full if full[key]},
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
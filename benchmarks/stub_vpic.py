@@ -0,0 +1,82 @@
+"""Local stub of NHTSA vPIC GetModelsForMake api, used by benchmarks.
+
+Every make has models named Model0..Model<N-1>. Response latency can be set, to simulate slow upstream.
+
+Usage:
+    python -m benchmarks.stub_vpic --port 8099 --latency 0.2
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+from urllib.parse import unquote, urlparse
+
+
+def make_handler(latency: float, models_per_make: int) -> type:
+    """Create request handler class with given latency and number of models per make.
+
+    Args:
+        latency (float): Response latency in seconds
+        models_per_make (int): Number of models returned for every make
+
+    Returns:
+        type: Request handler class.
+    """
+
+    class StubVpicHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:  # noqa: N802
+            """Return list of models for make given as the last path segment."""
+            make = unquote(urlparse(self.path).path.rstrip("/").rsplit("/", 1)[-1])
+            results = [
+                {"Make_ID": 1, "Make_Name": make.upper(), "Model_ID": i, "Model_Name": f"Model{i}"}
+                for i in range(models_per_make)
+            ]
+            body = json.dumps({"Count": len(results), "SearchCriteria": f"Make:{make}", "Results": results}).encode()
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            """Don't log requests."""
+
+    return StubVpicHandler
+
+
+def start_stub(port: int = 0, latency: float = 0.0, models_per_make: int = 100) -> Tuple[ThreadingHTTPServer, str]:
+    """Start stub server in a background thread.
+
+    Args:
+        port (int): Port to listen on (0 picks a free one)
+        latency (float): Response latency in seconds
+        models_per_make (int): Number of models returned for every make
+
+    Returns:
+        Tuple[ThreadingHTTPServer, str]: Server object and url to use as EXTERNAL_API_URL.
+    """
+    # Default listen backlog (5) drops connections under load, which would show up as upstream latency
+    ThreadingHTTPServer.request_queue_size = 1024
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency, models_per_make))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/vehicles/GetModelsForMake"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--models-per-make", type=int, default=100)
+    args = parser.parse_args()
+    server, url = start_stub(args.port, args.latency, args.models_per_make)
+    print(f"Stub vPIC api listening, EXTERNAL_API_URL={url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CarsApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cars_api'
+
+    def ready(self) -> None:
+        """Overridden ready method, installs db execute wrapper measuring SQL queries on every new db connection."""
+        from .metrics import install_db_wrapper
+
+        connection_created.connect(install_db_wrapper, dispatch_uid="cars_api_metrics_db_wrapper")
@@ -0,0 +1,78 @@
+import json
+from typing import Any
+
+import requests
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, JsonResponse
+from rest_framework import serializers, status
+
+from .external_api import NoMatchingModelError, async_external_api_call
+from .serializers import CarSerializer
+
+
+async def create_car(request: HttpRequest) -> JsonResponse:
+    """Post handle for /cars/async/ endpoint.
+
+        Async variant of ListCarGenerics.create, with the same validation and responses. External api is called
+        without blocking the event loop, so under ASGI server one process can handle many creates concurrently.
+        DB work is done in sync code, through sync_to_async.
+    Args:
+        request (HttpRequest): Input data
+
+    Returns:
+        JsonResponse: Response data varies on validation and external api communication status.
+    """
+    if request.method != "POST":
+        return JsonResponse(
+            data={"detail": f'Method "{request.method}" not allowed.'}, status=status.HTTP_405_METHOD_NOT_ALLOWED
+        )
+    try:
+        data = _parse_body(request)
+    except ValueError as e:
+        return JsonResponse(data={"detail": f"JSON parse error - {e}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = CarSerializer(data=data, fields=("make", "model"))
+    if not await sync_to_async(serializer.is_valid)():
+        return JsonResponse(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    car_make = serializer.validated_data.get("make", "")
+    car_model = serializer.validated_data.get("model", "")
+
+    try:
+        await async_external_api_call(request, car_model, car_make)
+    except (requests.exceptions.RequestException, ConnectionError) as e:
+        return JsonResponse(data={"external_api_error": f"{e}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    except AttributeError as e:
+        return JsonResponse(data={"external_api_error": f"{e}"}, status=status.HTTP_400_BAD_REQUEST)
+    except NoMatchingModelError as e:
+        data = {"external_api_error": f"{e}", "suggestions": e.suggestions}
+        return JsonResponse(data=data, status=status.HTTP_404_NOT_FOUND)
+    except ValueError as e:
+        return JsonResponse(data={"external_api_error": f"{e}"}, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        await sync_to_async(serializer.save)()
+    except serializers.ValidationError as e:
+        return JsonResponse(data=e.detail, status=status.HTTP_400_BAD_REQUEST)
+    return JsonResponse(data=serializer.data)
+
+
+# Same as DRF views, endpoint doesn't use session authentication (csrf_exempt decorator isn't async aware)
+create_car.csrf_exempt = True  # type: ignore
+
+
+def _parse_body(request: HttpRequest) -> Any:
+    """Parse JSON or form request body.
+
+    Args:
+        request (HttpRequest): Input data
+
+    Raises:
+        ValueError: An error occuring if JSON body is invalid
+
+    Returns:
+        Any: Parsed request data
+    """
+    if request.content_type == "application/json":
+        return json.loads(request.body or b"{}")
+    return request.POST
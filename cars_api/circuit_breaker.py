@@ -0,0 +1,132 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(ConnectionError):
+    """Call wasn't made, because circuit of the service is open.
+
+    It's a ConnectionError, so callers handle it as any other unavailability of the service.
+    """
+
+
+class CircuitBreaker:
+    """Circuit breaker of a single service, shared by all threads of a process.
+
+    Closed circuit lets every call through. After `failure_threshold` consecutive failed calls it opens, and calls
+    fail fast with CircuitOpenError for `reset_timeout` seconds. Then it's half-open: up to `half_open_calls` trial
+    calls are let through, the first success closes the circuit, a failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        half_open_calls: int = 1,
+        on_reject: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Init method of CircuitBreaker class.
+
+        Args:
+            name (str): Service name, used in error messages
+            failure_threshold (int): Number of consecutive failures opening the circuit (0 turns the breaker off)
+            reset_timeout (float): Seconds the circuit stays open before trial calls
+            half_open_calls (int): Max number of concurrent trial calls of half-open circuit
+            on_reject (Optional[Callable[[], None]]): Callback called when a call fails fast
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.on_reject = on_reject
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_calls = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Let the call inside the block through (or fail fast), and record its result.
+
+        Any exception raised in the block counts as a failure. A call interrupted with BaseException (e.g. cancelled
+        task) has no result, it only gives back its trial call slot.
+
+        Raises:
+            CircuitOpenError: An error occuring if circuit is open, or half-open with all trial calls in progress
+        """
+        trial = self.before_call()
+        try:
+            yield
+        except Exception:
+            self.record_failure()
+            raise
+        else:
+            self.record_success()
+        finally:
+            if trial is not None:
+                self.release_trial(trial)
+
+    def before_call(self) -> Optional[float]:
+        """Check that a call can be made, switch open circuit to half-open after reset timeout.
+
+        Raises:
+            CircuitOpenError: An error occuring if circuit is open, or half-open with all trial calls in progress
+
+        Returns:
+            Optional[float]: For a trial call, time the circuit was opened at (identifies the half-open period),
+            None otherwise.
+        """
+        if self.failure_threshold <= 0:
+            return None
+        trial = None
+        with self._lock:
+            error = None
+            if self.state == OPEN:
+                remaining = self.opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    error = f"{self.name} unavailable (circuit open), retry in {math.ceil(remaining)} s"
+                else:
+                    self.state, self.trial_calls = HALF_OPEN, 0
+            if self.state == HALF_OPEN:
+                if self.trial_calls < self.half_open_calls:
+                    self.trial_calls += 1
+                    trial = self.opened_at
+                else:
+                    error = f"{self.name} unavailable (circuit half-open), retry later"
+        if error is not None:
+            if self.on_reject is not None:
+                self.on_reject()
+            raise CircuitOpenError(error)
+        return trial
+
+    def release_trial(self, trial: float) -> None:
+        """Give back slot of a finished trial call, if the circuit is still in the same half-open period.
+
+        Args:
+            trial (float): Value returned by before_call for the trial call
+        """
+        with self._lock:
+            if self.state == HALF_OPEN and self.opened_at == trial and self.trial_calls > 0:
+                self.trial_calls -= 1
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call."""
+        with self._lock:
+            self.state, self.failures, self.trial_calls = CLOSED, 0, 0
+
+    def record_failure(self) -> None:
+        """Count a failed call, open the circuit after too many of them, or after a failed trial call."""
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state, self.opened_at = OPEN, time.monotonic()
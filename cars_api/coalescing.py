@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key, made by threads of a process.
+
+    The first call runs, calls made while it's in flight wait for it and share its result (or exception). Calls made
+    after it finished run again, so results aren't cached.
+    """
+
+    def __init__(self) -> None:
+        """Init method of SingleFlight class."""
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any], on_shared: Optional[Callable[[], None]] = None) -> Any:
+        """Run function, or wait for the call of the same key already in flight.
+
+        Args:
+            key (Hashable): Call key, calls with the same key share results
+            func (Callable[[], Any]): Function to run
+            on_shared (Optional[Callable[[], None]]): Callback called when the call joins one in flight
+
+        Returns:
+            Any: Result of the function.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            if on_shared is not None:
+                on_shared()
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            self._finish(key)
+            future.set_exception(e)
+            raise
+        self._finish(key)
+        future.set_result(result)
+        return result
+
+    def _finish(self, key: Hashable) -> None:
+        """Stop sharing the call, before its result is published.
+
+        Args:
+            key (Hashable): Call key
+        """
+        with self._lock:
+            del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """Coalesces concurrent calls with the same key, made by coroutines of an event loop.
+
+    The first call starts a task, calls made while it's in flight await the same task. The task is shielded, so a
+    cancelled caller doesn't cancel the call shared by others.
+    """
+
+    def __init__(self) -> None:
+        """Init method of AsyncSingleFlight class."""
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(
+        self, key: Hashable, func: Callable[[], Awaitable], on_shared: Optional[Callable[[], None]] = None
+    ) -> Any:
+        """Run coroutine function, or await the call of the same key already in flight.
+
+        Args:
+            key (Hashable): Call key, calls with the same key share results
+            func (Callable[[], Awaitable]): Coroutine function to run
+            on_shared (Optional[Callable[[], None]]): Callback called when the call joins one in flight
+
+        Returns:
+            Any: Result of the coroutine.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda done: self._calls.pop(key) if self._calls.get(key) is done else None)
+        elif on_shared is not None:
+            on_shared()
+        return await asyncio.shield(task)
@@ -0,0 +1,185 @@
+import asyncio
+import random
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpRequest, HttpResponse
+
+# Cookie with time (unix timestamp) until which reads of the client stay on primary db, set after every write
+STICKY_COOKIE = "cars_api_primary_until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Replica alias used for reads of current request, None means primary db
+_replica: ContextVar[Optional[str]] = ContextVar("cars_api_replica", default=None)
+
+
+class ReplicaRouter:
+    """Database router sending reads of selected requests to a replica (see ReplicaRoutingMiddleware).
+
+    Writes, and reads of all other requests, management commands etc. always use primary (default) db.
+    """
+
+    def db_for_read(self, model: Any, **hints) -> Optional[str]:
+        """Get db alias for read queries.
+
+        Args:
+            model (Any): Model class
+
+        Returns:
+            Optional[str]: Replica alias picked for current request, None (primary db) outside of such requests.
+        """
+        return _replica.get()
+
+    def db_for_write(self, model: Any, **hints) -> Optional[str]:
+        """Get db alias for write queries.
+
+        Args:
+            model (Any): Model class
+
+        Returns:
+            Optional[str]: Always primary db.
+        """
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Any, obj2: Any, **hints) -> Optional[bool]:
+        """Allow relations between objects read from any db, replicas hold the same data as primary.
+
+        Args:
+            obj1 (Any): Model instance
+            obj2 (Any): Model instance
+
+        Returns:
+            Optional[bool]: Always True.
+        """
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    """Middleware routing reads of GET list endpoints (views with `replica_reads = True`) to a random replica.
+
+    After a successful write, client gets a cookie which keeps its reads on primary db for
+    REPLICA_STICKINESS_WINDOW seconds, so it reads its own writes even if replicas lag behind. Without configured
+    replicas (DATABASE_REPLICAS setting) every query goes to primary db. Middleware is sync and async capable, so
+    under ASGI server async views aren't adapted to sync.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        """Init method of ReplicaRoutingMiddleware class.
+
+        Args:
+            get_response (Callable): Next middleware or view
+        """
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Marks instance as coroutine function (as django's MiddlewareMixin does), so handler awaits it directly,
+            # and replaces process_view with coroutine, so handler doesn't run it in sync_to_async thread
+            self._is_coroutine = asyncio.coroutines._is_coroutine  # type: ignore
+            self.process_view = self.aprocess_view  # type: ignore
+
+    def __call__(self, request: HttpRequest) -> Union[HttpResponse, Awaitable[HttpResponse]]:
+        """Handle request, reset replica choice after it and mark writing client as sticky.
+
+        Args:
+            request (HttpRequest): Input data
+
+        Returns:
+            Union[HttpResponse, Awaitable[HttpResponse]]: Response of the view (awaitable in async mode).
+        """
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = _replica.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica.reset(token)
+        return self.mark_sticky(request, response)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """Handle request in async mode, reset replica choice after it and mark writing client as sticky.
+
+        Args:
+            request (HttpRequest): Input data
+
+        Returns:
+            HttpResponse: Response of the view.
+        """
+        token = _replica.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _replica.reset(token)
+        return self.mark_sticky(request, response)
+
+    @staticmethod
+    def mark_sticky(request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        """Set stickiness cookie after a successful write, if replicas are configured.
+
+        Args:
+            request (HttpRequest): Input data
+            response (HttpResponse): Response of the view
+
+        Returns:
+            HttpResponse: The same response.
+        """
+        if request.method not in SAFE_METHODS and response.status_code < 400 and settings.DATABASE_REPLICAS:
+            window = settings.REPLICA_STICKINESS_WINDOW
+            response.set_cookie(
+                STICKY_COOKIE, f"{time.time() + window:.3f}", max_age=int(window) + 1, httponly=True, samesite="Lax"
+            )
+        return response
+
+    def process_view(
+        self, request: HttpRequest, view_func: Callable, view_args: Tuple[Any, ...], view_kwargs: Dict[str, Any]
+    ) -> None:
+        """Pick a replica for reads of the request, if the view allows it and client didn't write recently.
+
+        Args:
+            request (HttpRequest): Input data
+            view_func (Callable): View function
+            view_args (Tuple[Any, ...]): View positional arguments
+            view_kwargs (Dict[str, Any]): View keyword arguments
+        """
+        replicas = settings.DATABASE_REPLICAS
+        view_class = getattr(view_func, "view_class", None)
+        if not replicas or request.method not in SAFE_METHODS or not getattr(view_class, "replica_reads", False):
+            return
+        if self.is_sticky(request):
+            return
+        _replica.set(random.choice(replicas))
+
+    async def aprocess_view(
+        self, request: HttpRequest, view_func: Callable, view_args: Tuple[Any, ...], view_kwargs: Dict[str, Any]
+    ) -> None:
+        """Async variant of process_view, used in async mode (it doesn't block, so it runs in the event loop).
+
+        Args:
+            request (HttpRequest): Input data
+            view_func (Callable): View function
+            view_args (Tuple[Any, ...]): View positional arguments
+            view_kwargs (Dict[str, Any]): View keyword arguments
+        """
+        ReplicaRoutingMiddleware.process_view(self, request, view_func, view_args, view_kwargs)
+
+    @staticmethod
+    def is_sticky(request: HttpRequest) -> bool:
+        """Check if client wrote recently, so its reads have to stay on primary db.
+
+        Args:
+            request (HttpRequest): Input data
+
+        Returns:
+            bool: True if stickiness window of the client didn't pass yet.
+        """
+        try:
+            primary_until = float(request.COOKIES.get(STICKY_COOKIE, 0))
+        except ValueError:
+            return False
+        now = time.time()
+        # Cookie values from the future beyond the window are ignored, so a client can't pin itself to primary db
+        return now < primary_until <= now + settings.REPLICA_STICKINESS_WINDOW
@@ -1,14 +1,183 @@
+import asyncio
 import os
-from typing import List
+import time
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+from weakref import WeakKeyDictionary
 
+import httpx
 import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpRequest
+from requests.adapters import HTTPAdapter
 from rest_framework import status
 from rest_framework.request import Request
 
+from . import external_api_cache, suggestions, vehicle_catalogue
+from .circuit_breaker import CircuitBreaker
+from .coalescing import AsyncSingleFlight, SingleFlight
+from .metrics import record_external_api_response, record_skipped_external_api_call, timed_external_api
 
+# Session is created lazily and recreated after fork, so every worker process has its own connection pool
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+# Async clients are bound to the event loop they were created in, so there is one client per loop
+_async_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = WeakKeyDictionary()
+# Circuit breaker is shared by sync and async calls of a process, and recreated after fork as the session
+_breaker: Optional[CircuitBreaker] = None
+_breaker_pid: Optional[int] = None
+# Concurrent calls for the same make share one external api call, coalesced per process (threads) or event loop
+_flight = SingleFlight()
+_async_flights: "WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncSingleFlight]" = WeakKeyDictionary()
+
+API_URL_ERROR = "Wrong request method (post required) or missing api url env variable"
+
+
+class NoMatchingModelError(ValueError):
+    """Model isn't present in external api for the make, error carries the closest model names of the make."""
+
+    def __init__(self, car_make: str, car_model: str, index: suggestions.ModelNamesIndex) -> None:
+        """Init method of NoMatchingModelError class, finds suggestions (see suggestions.get_index).
+
+        Args:
+            car_make (str): Car make string
+            car_model (str): Car model string
+            index (suggestions.ModelNamesIndex): Index of model names of the make, suggestions keep their casing
+        """
+        super(NoMatchingModelError, self).__init__(f"No matching result in external api for {car_make} {car_model}")
+        self.suggestions = index.suggest(car_model, suggestions.MAX_SUGGESTIONS)
+
+
+def get_session() -> requests.Session:
+    """Get pooled keep-alive session for external api calls, owned by current process.
+
+    Pool size is configured with VPIC_POOL_SIZE setting. Session doesn't retry, calls are retried by _fetch_results,
+    within VPIC_DEADLINE.
+
+    Returns:
+        requests.Session: Session object
+    """
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        pool_size = settings.VPIC_POOL_SIZE
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _session, _session_pid = session, os.getpid()
+    return _session
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Get pooled keep-alive async client for external api calls, owned by current event loop.
+
+    Client retries connection errors, with timeouts and pool size configured with VPIC_* settings
+    (5xx responses are retried by async_external_api_call).
+
+    Returns:
+        httpx.AsyncClient: Async client object
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        pool_size = settings.VPIC_POOL_SIZE
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.VPIC_READ_TIMEOUT, connect=settings.VPIC_CONNECT_TIMEOUT),
+            transport=httpx.AsyncHTTPTransport(limits=limits, retries=settings.VPIC_RETRIES),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def get_breaker() -> CircuitBreaker:
+    """Get circuit breaker of external api, owned by current process.
+
+    Thresholds are configured with VPIC_BREAKER_* settings.
+
+    Returns:
+        CircuitBreaker: Circuit breaker object
+    """
+    global _breaker, _breaker_pid
+    if _breaker is None or _breaker_pid != os.getpid():
+        _breaker = CircuitBreaker(
+            "External api",
+            failure_threshold=settings.VPIC_BREAKER_FAILURES,
+            reset_timeout=settings.VPIC_BREAKER_RESET_TIMEOUT,
+            half_open_calls=settings.VPIC_BREAKER_HALF_OPEN_CALLS,
+            on_reject=lambda: record_skipped_external_api_call("circuit_open"),
+        )
+        _breaker_pid = os.getpid()
+    return _breaker
+
+
+@timed_external_api
+def get_model_names(request: Request, car_make: str, car_models: Iterable[str] = ()) -> FrozenSet[str]:
+    """Get set of lower-cased model names for a make, from local catalogue, cache or the external api.
+
+    With catalogue in fallback mode, external api is called only if the make is not in catalogue, or some of
+    car_models are missing in catalogue.
+
+    Args:
+        request (Request): Request object
+        car_make (str): Car make string
+        car_models (Iterable[str]): Car models which are going to be validated
+
+    Raises:
+        AttributeError: An error occuring when incorrect request type and api url are provided
+        RequestException: An error occuring during external api call
+        ConnectionError: An error occuring if response code is other than 200
+
+    Returns:
+        FrozenSet[str]: Set of model names (empty if make is unknown to external api)
+    """
+    _check_request(request)
+    return lookup_model_names(get_api_url(), car_make, car_models)
+
+
+def lookup_model_names(api_url: str, car_make: str, car_models: Iterable[str] = ()) -> FrozenSet[str]:
+    """Get set of lower-cased model names for a make, same as get_model_names, outside of a request.
+
+    Args:
+        api_url (str): External api url
+        car_make (str): Car make string
+        car_models (Iterable[str]): Car models which are going to be validated
+
+    Raises:
+        AttributeError: An error occuring when api url is missing and the external api has to be called
+        RequestException: An error occuring during external api call
+        ConnectionError: An error occuring if response code is other than 200
+
+    Returns:
+        FrozenSet[str]: Set of model names (empty if make is unknown to external api)
+    """
+    catalogue_names: FrozenSet[str] = frozenset()
+    mode = vehicle_catalogue.get_mode()
+    if mode != vehicle_catalogue.MODE_OFF:
+        catalogue_names = vehicle_catalogue.get_model_names(car_make)
+        missing = {vehicle_catalogue.normalize_model(car_model) for car_model in car_models} - catalogue_names
+        if mode == vehicle_catalogue.MODE_ONLY or (catalogue_names and not missing):
+            return catalogue_names
+
+    use_cache = external_api_cache.is_enabled()
+    if use_cache:
+        model_names = external_api_cache.get_model_names(car_make)
+        if model_names is not None:
+            return catalogue_names | frozenset(name.lower() for name in model_names)
+    results = _get_results(_require_api_url(api_url), car_make)
+    if use_cache:
+        external_api_cache.store_model_names(car_make, [car.get("Model_Name") for car in results])
+    return catalogue_names | frozenset(car.get("Model_Name").lower() for car in results)
+
+
+@timed_external_api
 def external_api_call(request: Request, car_model: str, car_make: str) -> List:
     """Call to the external api.
 
+    Model names received for a make are cached (see external_api_cache), so subsequent calls for the same make
+    don't reach external api until cache entry expires. If local catalogue is used (see vehicle_catalogue), pair is
+    looked up in catalogue first. For cached and catalogue data, only make and model names are returned.
+
     Args:
         request (Request): Request object
         car_model (str): Car model string
@@ -18,22 +187,339 @@ def external_api_call(request: Request, car_model: str, car_make: str) -> List:
         AttributeError: An error occuring when incorrect request type and api url are provided
         RequestException: An error occuring during external api call
         ConnectionError: An error occuring if response code is other than 200
-        ValueError: An error occuring if data specified by input parameters is not present in response
+        NoMatchingModelError: An error occuring if data specified by input parameters is not present in response
 
     Returns:
         List: List with data from external api, filtered by input parameters
     """
-    api_url = os.getenv("EXTERNAL_API_URL", "")
-    if not (request.method == "POST" and api_url):
-        raise AttributeError("Wrong request method (post required) or missing api url env variable")
+    _check_request(request)
+    if _check_catalogue(car_model, car_make):
+        return [{"Make_Name": car_make, "Model_Name": car_model}]
+
+    use_cache = external_api_cache.is_enabled()
+    if use_cache:
+        index = _get_cached_index(car_make)
+        if index is not None:
+            if car_model not in index:
+                raise NoMatchingModelError(car_make, car_model, index)
+            return [{"Make_Name": car_make, "Model_Name": car_model}]
+
+    results = _get_results(_require_api_url(get_api_url()), car_make)
+    index = _store_results(car_make, results, use_cache)
+    car = [car for car in results if car.get("Model_Name").lower() == car_model.lower()]
+    if not car:
+        raise NoMatchingModelError(car_make, car_model, index)
+    return car
+
+
+def _get_cached_index(car_make: str) -> Optional[suggestions.ModelNamesIndex]:
+    """Get index of cached model names of a make, reused as long as cache entry isn't stored again.
+
+    Only version of cache entry is read, model names are read just to build missing index.
+
+    Args:
+        car_make (str): Car make string
+
+    Returns:
+        Optional[suggestions.ModelNamesIndex]: Index of model names, or None if there is no valid cache entry.
+    """
+    version = external_api_cache.get_entry_version(car_make)
+    if version is None:
+        return None
+    return suggestions.get_index(car_make, version, lambda: external_api_cache.load_model_names(car_make))
+
+
+def _store_results(car_make: str, results: List, use_cache: bool) -> suggestions.ModelNamesIndex:
+    """Store model names of external api results in cache (if it's used), and index them.
+
+    Index is built once per stored cache entry, following cache hits of this process reuse it.
+
+    Args:
+        car_make (str): Car make string
+        results (List): External api results for the make
+        use_cache (bool): True if cache is enabled
+
+    Returns:
+        suggestions.ModelNamesIndex: Index of model names.
+    """
+    model_names = [car.get("Model_Name") for car in results]
+    version = external_api_cache.store_model_names(car_make, model_names) if use_cache else None
+    # Names without stored version (cache is off or entry was stored by another worker) are indexed anew
+    return suggestions.get_index(car_make, object() if version is None else version, lambda: model_names)
+
+
+def _check_catalogue(car_model: str, car_make: str) -> bool:
+    """Look up (make, model) pair in local catalogue, if it's used.
+
+    Args:
+        car_model (str): Car model string
+        car_make (str): Car make string
+
+    Raises:
+        NoMatchingModelError: An error occuring if pair is missing and catalogue is the only source of data
+
+    Returns:
+        bool: True if pair is present in catalogue, False if it's missing (or catalogue isn't used).
+    """
+    mode = vehicle_catalogue.get_mode()
+    if mode == vehicle_catalogue.MODE_OFF:
+        return False
+    if vehicle_catalogue.contains(car_make, car_model):
+        return True
+    if mode == vehicle_catalogue.MODE_ONLY:
+        version = vehicle_catalogue.get_model_names_version(car_make)
+        index = suggestions.get_index(car_make, version, lambda: vehicle_catalogue.get_original_model_names(car_make))
+        raise NoMatchingModelError(car_make, car_model, index)
+    return False
+
+
+def get_api_url() -> str:
+    """Get external api url, from EXTERNAL_API_URL env variable.
+
+    Returns:
+        str: External api url, empty if it isn't set
+    """
+    return os.getenv("EXTERNAL_API_URL", "")
+
+
+def _check_request(request: Request) -> None:
+    """Check that request is allowed to validate cars (against catalogue, cache or the external api).
+
+    Args:
+        request (Request): Request object
 
+    Raises:
+        AttributeError: An error occuring when incorrect request type is provided
+    """
+    if request.method != "POST":
+        raise AttributeError(API_URL_ERROR)
+
+
+def _require_api_url(api_url: str) -> str:
+    """Check that external api url is set, right before the external api is called.
+
+    Local catalogue and cache don't need it, so with catalogue as the only source of data it can be missing.
+
+    Args:
+        api_url (str): External api url
+
+    Raises:
+        AttributeError: An error occuring when api url is missing
+
+    Returns:
+        str: External api url
+    """
+    if not api_url:
+        raise AttributeError(API_URL_ERROR)
+    return api_url
+
+
+def _flight_key(api_url: str, car_make: str) -> Tuple[str, str]:
+    """Get key of external api call, identical calls (same url and normalized make) have the same key.
+
+    Args:
+        api_url (str): External api url
+        car_make (str): Car make string
+
+    Returns:
+        Tuple[str, str]: Call key
+    """
+    return api_url, external_api_cache.normalize_make(car_make)
+
+
+def _get_results(api_url: str, car_make: str) -> List:
+    """Get models of a make from the external api.
+
+    Concurrent calls for the same make share one external api call and its result (or error). While circuit breaker
+    is open, calls fail fast with CircuitOpenError (a ConnectionError).
+
+    Args:
+        api_url (str): External api url
+        car_make (str): Car make string
+
+    Raises:
+        RequestException: An error occuring during external api call
+        ConnectionError: An error occuring if response code is other than 200, or circuit breaker is open
+
+    Returns:
+        List: List with all models of a make
+    """
+    return _flight.do(
+        _flight_key(api_url, car_make),
+        lambda: _fetch_results(api_url, car_make),
+        on_shared=lambda: record_skipped_external_api_call("coalesced"),
+    )
+
+
+def _retry_delay(attempt: int, deadline: float) -> Optional[float]:
+    """Get backoff delay before the next attempt of external api call.
+
+    Args:
+        attempt (int): Number of failed attempt, starting from 0
+        deadline (float): Deadline of the call (time.monotonic value)
+
+    Returns:
+        Optional[float]: Delay in seconds, None if retries are used up or the next attempt would start after deadline.
+    """
+    if attempt >= settings.VPIC_RETRIES:
+        return None
+    delay = settings.VPIC_BACKOFF_FACTOR * (2 ** attempt)
+    if time.monotonic() + delay >= deadline:
+        return None
+    return delay
+
+
+def _fetch_results(api_url: str, car_make: str) -> List:
+    """Call the external api for models of a make, through circuit breaker.
+
+    Connection errors, timeouts and 5xx responses are retried with exponential backoff. Connect and read timeouts of
+    every attempt are capped by time left to VPIC_DEADLINE, so a call with retries doesn't outlive worker timeout.
+
+    Args:
+        api_url (str): External api url
+        car_make (str): Car make string
+
+    Raises:
+        RequestException: An error occuring during external api call
+        ConnectionError: An error occuring if response code is other than 200, or circuit breaker is open
+
+    Returns:
+        List: List with all models of a make
+    """
     api_url += f"/{car_make}?format=json"
-    # requests.exceptions.RequestException can occure (should be handled by calling method)
-    response = requests.get(url=api_url)
-    if response.status_code != status.HTTP_200_OK:
-        raise ConnectionError("External api error or API unavailable")
-    resp = response.json()
-    car = [car for car in resp.get("Results") if car.get("Model_Name").lower() == car_model.lower()]
+    deadline = time.monotonic() + settings.VPIC_DEADLINE
+    with get_breaker().guard():
+        for attempt in range(settings.VPIC_RETRIES + 1):
+            remaining = max(deadline - time.monotonic(), 0.0)
+            timeout = (min(settings.VPIC_CONNECT_TIMEOUT, remaining), min(settings.VPIC_READ_TIMEOUT, remaining))
+            # requests.exceptions.RequestException can occure (should be handled by calling method)
+            try:
+                response = get_session().get(url=api_url, timeout=timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                delay = _retry_delay(attempt, deadline)
+                if delay is None:
+                    record_external_api_response(None)
+                    raise
+            except requests.exceptions.RequestException:
+                record_external_api_response(None)
+                raise
+            else:
+                if response.status_code < status.HTTP_500_INTERNAL_SERVER_ERROR:
+                    break
+                delay = _retry_delay(attempt, deadline)
+                if delay is None:
+                    break
+            time.sleep(delay)
+        record_external_api_response(response.status_code)
+        if response.status_code != status.HTTP_200_OK:
+            raise ConnectionError("External api error or API unavailable")
+        return response.json().get("Results")
+
+
+@timed_external_api
+async def async_external_api_call(request: HttpRequest, car_model: str, car_make: str) -> List:
+    """Call to the external api, without blocking the event loop.
+
+    Async variant of external_api_call, with the same cache, semantics and exceptions.
+
+    Args:
+        request (HttpRequest): Request object
+        car_model (str): Car model string
+        car_make (str): Car make string
+
+    Raises:
+        AttributeError: An error occuring when incorrect request type and api url are provided
+        RequestException: An error occuring during external api call
+        ConnectionError: An error occuring if response code is other than 200
+        NoMatchingModelError: An error occuring if data specified by input parameters is not present in response
+
+    Returns:
+        List: List with data from external api, filtered by input parameters
+    """
+    _check_request(request)
+    if await sync_to_async(_check_catalogue)(car_model, car_make):
+        return [{"Make_Name": car_make, "Model_Name": car_model}]
+
+    use_cache = external_api_cache.is_enabled()
+    if use_cache:
+        index = await sync_to_async(_get_cached_index)(car_make)
+        if index is not None:
+            if car_model not in index:
+                raise NoMatchingModelError(car_make, car_model, index)
+            return [{"Make_Name": car_make, "Model_Name": car_model}]
+
+    results = await _async_get_results(_require_api_url(get_api_url()), car_make)
+    index = await sync_to_async(_store_results)(car_make, results, use_cache)
+    car = [car for car in results if car.get("Model_Name").lower() == car_model.lower()]
     if not car:
-        raise ValueError(f"No matching result in external api for {car_make} {car_model}")
+        raise NoMatchingModelError(car_make, car_model, index)
     return car
+
+
+async def _async_get_results(api_url: str, car_make: str) -> List:
+    """Get models of a make from the external api, without blocking the event loop.
+
+    Concurrent calls for the same make (in the same event loop) share one external api call, and the circuit breaker
+    is shared with sync calls.
+
+    Args:
+        api_url (str): External api url
+        car_make (str): Car make string
+
+    Raises:
+        RequestException: An error occuring during external api call
+        ConnectionError: An error occuring if response code is other than 200, or circuit breaker is open
+
+    Returns:
+        List: List with all models of a make
+    """
+    loop = asyncio.get_running_loop()
+    flight = _async_flights.get(loop)
+    if flight is None:
+        flight = _async_flights[loop] = AsyncSingleFlight()
+    return await flight.do(
+        _flight_key(api_url, car_make),
+        lambda: _async_fetch_results(api_url, car_make),
+        on_shared=lambda: record_skipped_external_api_call("coalesced"),
+    )
+
+
+async def _async_fetch_results(api_url: str, car_make: str) -> List:
+    """Call the external api for models of a make through circuit breaker, without blocking the event loop.
+
+    5xx responses are retried with exponential backoff, as in the sync call. The whole call with retries is cancelled
+    after VPIC_DEADLINE.
+
+    Args:
+        api_url (str): External api url
+        car_make (str): Car make string
+
+    Raises:
+        RequestException: An error occuring during external api call
+        ConnectionError: An error occuring if response code is other than 200, or circuit breaker is open
+
+    Returns:
+        List: List with all models of a make
+    """
+    api_url += f"/{car_make}?format=json"
+    client = get_async_client()
+
+    async def attempts() -> httpx.Response:
+        for attempt in range(settings.VPIC_RETRIES + 1):
+            response = await client.get(api_url)
+            if response.status_code < status.HTTP_500_INTERNAL_SERVER_ERROR or attempt == settings.VPIC_RETRIES:
+                break
+            await asyncio.sleep(settings.VPIC_BACKOFF_FACTOR * (2 ** attempt))
+        return response
+
+    with get_breaker().guard():
+        try:
+            response = await asyncio.wait_for(attempts(), settings.VPIC_DEADLINE)
+        except (httpx.HTTPError, asyncio.TimeoutError) as e:
+            record_external_api_response(None)
+            # Keep the same exception type as sync call, so callers handle both in the same way
+            raise requests.exceptions.RequestException(f"{e}" or "External api deadline exceeded") from e
+        record_external_api_response(response.status_code)
+        if response.status_code != status.HTTP_200_OK:
+            raise ConnectionError("External api error or API unavailable")
+        return response.json().get("Results")
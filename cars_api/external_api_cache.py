@@ -0,0 +1,197 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ExternalApiCache, ExternalApiCacheStats
+
+# Hits counted by this process, not written to ExternalApiCacheStats yet, and time of the last write
+_pending_hits = 0
+_hits_written_at = time.monotonic()
+_hits_lock = threading.Lock()
+
+
+def normalize_make(car_make: str) -> str:
+    """Normalize make string, to use it as a cache key.
+
+    Args:
+        car_make (str): Car make string
+
+    Returns:
+        str: Normalized make string.
+    """
+    return car_make.strip().lower()
+
+
+def is_enabled() -> bool:
+    """Check if external api cache is turned on (VPIC_CACHE_TTL setting other than 0).
+
+    Returns:
+        bool: True if cache is enabled.
+    """
+    return settings.VPIC_CACHE_TTL > 0
+
+
+def get_model_names(car_make: str) -> Optional[FrozenSet[str]]:
+    """Get cached set of model names for given make, in their original casing.
+
+    Hit is a single read in most cases: entry position in LRU order is refreshed only if it's older than
+    VPIC_CACHE_TOUCH_INTERVAL, and hits are counted in memory, then added to cache stats at most once per interval.
+
+    Args:
+        car_make (str): Car make string
+
+    Returns:
+        Optional[FrozenSet[str]]: Set of model names (empty for unknown make), or None if there is no valid entry.
+    """
+    entry = _get_entry(car_make, "model_names")
+    return None if entry is None else frozenset(entry[0])
+
+
+def get_entry_version(car_make: str) -> Optional[datetime]:
+    """Get version of valid cache entry for given make, without reading its model names. Counted as a hit.
+
+    Version of an entry is its expiry time, set anew by every store of model names (make is unique), so it changes
+    whenever model names may have changed. Used to reuse in-memory data built from the names (see suggestions).
+
+    Args:
+        car_make (str): Car make string
+
+    Returns:
+        Optional[datetime]: Entry version, or None if there is no valid entry.
+    """
+    entry = _get_entry(car_make, "expires_at")
+    return None if entry is None else entry[0]
+
+
+def load_model_names(car_make: str) -> FrozenSet[str]:
+    """Read model names of cache entry for given make, not counted as a hit (e.g. after get_entry_version).
+
+    Args:
+        car_make (str): Car make string
+
+    Returns:
+        FrozenSet[str]: Set of model names (empty if there is no entry).
+    """
+    entry = ExternalApiCache.objects.filter(make=normalize_make(car_make)).values_list("model_names", flat=True)
+    return frozenset(entry.first() or ())
+
+
+def _get_entry(car_make: str, *fields: str) -> Optional[Tuple[Any, ...]]:
+    """Read fields of valid cache entry for given make, count a hit and refresh LRU position if it's due.
+
+    Args:
+        car_make (str): Car make string
+        fields (str): Names of read fields
+
+    Returns:
+        Optional[Tuple[Any, ...]]: Values of the fields, or None if there is no valid entry.
+    """
+    now = timezone.now()
+    entry = (
+        ExternalApiCache.objects.filter(make=normalize_make(car_make), expires_at__gt=now)
+        .values_list("pk", "last_used_at", *fields)
+        .first()
+    )
+    if entry is None:
+        return None
+    pk, last_used_at, *values = entry
+    if now - last_used_at >= timedelta(seconds=settings.VPIC_CACHE_TOUCH_INTERVAL):
+        ExternalApiCache.objects.filter(pk=pk).update(last_used_at=now)
+    _count_hit()
+    return tuple(values)
+
+
+def _count_hit() -> None:
+    """Count a cache hit in memory, write hits counted so far to cache stats once VPIC_CACHE_TOUCH_INTERVAL passed.
+
+    Entries above VPIC_CACHE_MAX_ENTRIES are evicted along with the write, so the limit is kept between inserts as well
+    (e.g. after it was lowered), by LRU positions refreshed in the meantime.
+    """
+    global _pending_hits, _hits_written_at
+    with _hits_lock:
+        _pending_hits += 1
+        if time.monotonic() - _hits_written_at < settings.VPIC_CACHE_TOUCH_INTERVAL:
+            return
+        hits, _pending_hits, _hits_written_at = _pending_hits, 0, time.monotonic()
+    _add_to_stats(hits=hits)
+    evict_least_recently_used()
+
+
+def _add_to_stats(hits: int = 0, misses: int = 0) -> None:
+    """Add hits and misses to cache stats, creating its record if needed.
+
+    Args:
+        hits (int): Number of hits
+        misses (int): Number of misses
+    """
+    stats = ExternalApiCacheStats.objects.filter(pk=1)
+    if not stats.update(hits=F("hits") + hits, misses=F("misses") + misses):
+        ExternalApiCacheStats.objects.get_or_create(pk=1)
+        stats.update(hits=F("hits") + hits, misses=F("misses") + misses)
+
+
+def store_model_names(car_make: str, model_names: Iterable[str]) -> Optional[datetime]:
+    """Store set of model names received from external api for given make.
+
+    Every store is counted as a miss (external api call was needed). Empty set is stored with shorter
+    VPIC_CACHE_NEGATIVE_TTL. Least recently used entries above VPIC_CACHE_MAX_ENTRIES are evicted.
+
+    Args:
+        car_make (str): Car make string
+        model_names (Iterable[str]): Model names received from external api
+
+    Returns:
+        Optional[datetime]: Version of stored entry (see get_entry_version), None if another worker stored it first.
+    """
+    now = timezone.now()
+    names = sorted({name.lower(): name for name in model_names}.values(), key=str.lower)
+    ttl = settings.VPIC_CACHE_TTL if names else settings.VPIC_CACHE_NEGATIVE_TTL
+    key = normalize_make(car_make)
+    fields = {"model_names": names, "expires_at": now + timedelta(seconds=ttl), "last_used_at": now}
+
+    _add_to_stats(misses=1)
+    if ExternalApiCache.objects.filter(make=key).update(**fields):
+        return fields["expires_at"]
+    try:
+        with transaction.atomic():
+            ExternalApiCache.objects.create(make=key, **fields)
+    except IntegrityError:
+        # Entry was created by another worker in the meantime, it holds the same data
+        return None
+    evict_least_recently_used()
+    return fields["expires_at"]
+
+
+def evict_least_recently_used() -> int:
+    """Remove least recently used entries above VPIC_CACHE_MAX_ENTRIES limit.
+
+    LRU order is approximate: LRU position of an entry is written at most once per VPIC_CACHE_TOUCH_INTERVAL, so
+    entries used within the last interval are ordered by their previous writes.
+
+    Returns:
+        int: Number of removed entries.
+    """
+    max_entries = settings.VPIC_CACHE_MAX_ENTRIES
+    stale = list(ExternalApiCache.objects.order_by("-last_used_at").values_list("pk", flat=True)[max_entries:])
+    if not stale:
+        return 0
+    deleted, _ = ExternalApiCache.objects.filter(pk__in=stale).delete()
+    return deleted
+
+
+def get_stats() -> Dict[str, int]:
+    """Get cache counters, of evicted entries as well.
+
+    Hits counted by worker processes in the last VPIC_CACHE_TOUCH_INTERVAL may be missing.
+
+    Returns:
+        Dict[str, int]: Number of entries, hits (saved external api calls) and misses (external api calls).
+    """
+    hits, misses = ExternalApiCacheStats.objects.filter(pk=1).values_list("hits", "misses").first() or (0, 0)
+    return {"entries": ExternalApiCache.objects.count(), "hits": hits, "misses": misses}
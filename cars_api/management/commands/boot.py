@@ -0,0 +1,151 @@
+import hashlib
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.finders import get_finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.migrations.executor import MigrationExecutor
+
+# File in STATIC_ROOT with fingerprint of source static files, written after they're collected
+FINGERPRINT_FILE = ".static-fingerprint"
+# Same as default ignore patterns of collectstatic
+STATIC_IGNORE_PATTERNS = ["CVS", ".*", "*~"]
+# Key of PostgreSQL advisory lock held while migrating, so replicas started at the same time don't migrate together
+MIGRATION_LOCK_KEY = 4_721_903
+
+
+def pending_migrations(connection: BaseDatabaseWrapper) -> List[Tuple[Any, bool]]:
+    """Get migrations which aren't applied yet.
+
+    Args:
+        connection (BaseDatabaseWrapper): Db connection
+
+    Returns:
+        List[Tuple[Any, bool]]: Migration plan, empty if schema is at head.
+    """
+    executor = MigrationExecutor(connection)
+    return executor.migration_plan(executor.loader.graph.leaf_nodes())
+
+
+@contextmanager
+def migration_lock(connection: BaseDatabaseWrapper) -> Iterator[None]:
+    """Hold advisory lock while migrating (PostgreSQL only, other databases aren't shared by containers).
+
+    Args:
+        connection (BaseDatabaseWrapper): Db connection
+    """
+    if connection.vendor != "postgresql":
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_lock(%s)", [MIGRATION_LOCK_KEY])
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [MIGRATION_LOCK_KEY])
+
+
+def static_fingerprint() -> str:
+    """Compute fingerprint of static files found by staticfiles finders, and of the storage they're collected with.
+
+    Returns:
+        str: Hex digest, changes when any static file is added, removed or changed.
+    """
+    found = {}
+    for finder in get_finders():
+        for path, storage in finder.list(STATIC_IGNORE_PATTERNS):
+            # The first finder wins, same as in collectstatic
+            found.setdefault(path, storage)
+    digest = hashlib.sha256(settings.STATICFILES_STORAGE.encode())
+    for path in sorted(found):
+        with found[path].open(path) as static_file:
+            digest.update(path.encode())
+            digest.update(hashlib.sha256(static_file.read()).digest())
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    """Prepare production container for serving traffic, skipping work which is already done."""
+
+    help = (
+        "Apply committed migrations unless schema is already at head, collect static files unless they didn't change "
+        "since the last collection, and report timing of every boot phase. Data is never flushed."
+    )
+    # Checks aren't needed to serve traffic (gunicorn doesn't run them either), skipping them speeds up the boot
+    requires_system_checks: List[str] = []
+
+    def add_arguments(self, parser) -> None:
+        """Add command arguments."""
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Db alias to migrate")
+        parser.add_argument(
+            "--skip-migrate", action="store_true", help="Don't touch db, e.g. to collect static files at image build"
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Command entry point."""
+        started = time.perf_counter()
+        if not options["skip_migrate"]:
+            self.run_phase("migrate", lambda: self.migrate(options["database"]))
+        self.run_phase("collectstatic", self.collect_static)
+        self.stdout.write(self.style.SUCCESS(f"boot: ready in {(time.perf_counter() - started) * 1000:.0f} ms"))
+
+    def run_phase(self, name: str, func: Callable[[], str]) -> None:
+        """Run boot phase and report its result and time.
+
+        Args:
+            name (str): Phase name
+            func (Callable[[], str]): Phase function, returns description of what was done
+        """
+        started = time.perf_counter()
+        result = func()
+        self.stdout.write(f"boot: {name} {result} ({(time.perf_counter() - started) * 1000:.0f} ms)")
+
+    def migrate(self, database: str) -> str:
+        """Apply pending migrations, if there are any.
+
+        Args:
+            database (str): Db alias
+
+        Returns:
+            str: Phase result.
+        """
+        connection = connections[database]
+        if not pending_migrations(connection):
+            return "skipped, schema is at head"
+        with migration_lock(connection):
+            # Another container could apply migrations while this one was waiting for the lock
+            plan = pending_migrations(connection)
+            if not plan:
+                return "skipped, migrated by another process"
+            call_command("migrate", database=database, interactive=False, verbosity=0)
+        return f"applied {len(plan)} migrations"
+
+    def collect_static(self) -> str:
+        """Collect static files, unless they're already collected with the same fingerprint.
+
+        Returns:
+            str: Phase result.
+        """
+        if not apps.is_installed("django.contrib.staticfiles"):
+            return "skipped, staticfiles app isn't installed"
+        fingerprint = static_fingerprint()
+        fingerprint_path = os.path.join(settings.STATIC_ROOT, FINGERPRINT_FILE)
+        manifest_name = getattr(staticfiles_storage, "manifest_name", None)
+        collected = manifest_name is None or staticfiles_storage.exists(manifest_name)
+        if collected and os.path.exists(fingerprint_path):
+            with open(fingerprint_path) as fingerprint_file:
+                if fingerprint_file.read() == fingerprint:
+                    return "skipped, static files didn't change"
+        call_command("collectstatic", interactive=False, verbosity=0)
+        with open(fingerprint_path, "w") as fingerprint_file:
+            fingerprint_file.write(fingerprint)
+        return "collected static files"
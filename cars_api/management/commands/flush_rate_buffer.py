@@ -0,0 +1,36 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from cars_api.rate_buffer import flush, run_flusher
+
+
+class Command(BaseCommand):
+    """Move buffered rates into Rate table (buffered rate ingestion mode)."""
+
+    help = (
+        "Move rates accepted in buffered ingestion mode into Rate table, in batches. Runs until SIGTERM/SIGINT "
+        "(current batch is finished first), or until buffer is empty with --once."
+    )
+
+    def add_arguments(self, parser) -> None:
+        """Add command arguments."""
+        parser.add_argument("--batch-size", type=int, help="Max number of rates moved at once (RATE_BUFFER_FLUSH_SIZE)")
+        parser.add_argument(
+            "--interval", type=float, help="Wait time in seconds after partial batch (RATE_BUFFER_FLUSH_INTERVAL)"
+        )
+        parser.add_argument("--once", action="store_true", help="Flush buffered rates and exit")
+
+    def handle(self, *args, **options) -> None:
+        """Command entry point."""
+        if options["once"]:
+            moved = flushed = flush(options["batch_size"])
+            while flushed:
+                flushed = flush(options["batch_size"])
+                moved += flushed
+        else:
+            stop = []
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, lambda *_: stop.append(True))
+            moved = run_flusher(options["batch_size"], options["interval"], should_stop=lambda: bool(stop))
+        self.stdout.write(self.style.SUCCESS(f"Moved {moved} buffered rates."))
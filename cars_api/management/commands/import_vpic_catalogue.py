@@ -0,0 +1,41 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cars_api.vehicle_catalogue import import_dump
+
+
+class Command(BaseCommand):
+    """Import vPIC makes/models dump into local catalogue."""
+
+    help = (
+        "Import vPIC makes/models dump (JSON or CSV file) into local catalogue. Import is incremental, so it can be "
+        "run again with a newer dump to refresh the catalogue."
+    )
+
+    def add_arguments(self, parser) -> None:
+        """Add command arguments."""
+        parser.add_argument("path", help="Path to dump file")
+        parser.add_argument("--format", choices=["json", "csv"], help="Dump format (by default taken from extension)")
+        parser.add_argument(
+            "--prune", action="store_true", help="Remove models missing in the dump, for makes present in the dump"
+        )
+        parser.add_argument("--batch-size", type=int, default=5000, help="Number of records inserted at once")
+
+    def handle(self, *args, **options) -> None:
+        """Command entry point."""
+        path = Path(options["path"])
+        file_format = options["format"] or path.suffix.lstrip(".").lower()
+        if file_format not in ("json", "csv"):
+            raise CommandError("Unknown dump format, use --format json or --format csv")
+        try:
+            with path.open("rb") as stream:
+                stats = import_dump(stream, file_format, prune=options["prune"], batch_size=options["batch_size"])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Import failed: {e}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Read {stats['read']} models, created {stats['created']}, "
+                f"deleted {stats['deleted']} catalogue records."
+            )
+        )
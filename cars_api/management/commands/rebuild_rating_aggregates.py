@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from cars_api.models import Car
+
+
+class Command(BaseCommand):
+    """Rebuild stored car rating aggregates from Rate records."""
+
+    help = "Rebuild stored rates_count, rating_sum and avg_rating of every car from Rate records."
+
+    def handle(self, *args, **options) -> None:
+        """Command entry point."""
+        with transaction.atomic():
+            updated = Car.objects.all().rebuild_rating_aggregates()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rating aggregates for {updated} cars."))
@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from cars_api.models import DailyRates
+
+
+class Command(BaseCommand):
+    """Backfill and compact daily rate rollups, used by time-windowed popularity."""
+
+    help = (
+        "Merge daily rate rollups older than RATE_ROLLUP_RETENTION_DAYS into monthly ones. With --backfill, rollups "
+        "are rebuilt from Rate records first (e.g. after deploying rollups, or to fix drift of compacted buckets)."
+    )
+
+    def add_arguments(self, parser) -> None:
+        """Add command arguments."""
+        parser.add_argument("--backfill", action="store_true", help="Rebuild daily rollups from Rate records")
+        parser.add_argument(
+            "--retention-days", type=int, help="Number of days kept in daily rollups (RATE_ROLLUP_RETENTION_DAYS)"
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Command entry point."""
+        if options["backfill"]:
+            created = DailyRates.objects.rebuild()
+            self.stdout.write(self.style.SUCCESS(f"Backfilled {created} daily rollups."))
+        retention_days = options["retention_days"] or settings.RATE_ROLLUP_RETENTION_DAYS
+        removed = DailyRates.objects.compact(timezone.localdate() - timedelta(days=retention_days - 1))
+        self.stdout.write(self.style.SUCCESS(f"Compacted {removed} daily rollups."))
@@ -0,0 +1,57 @@
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cars_api import vehicle_catalogue
+from cars_api.external_api import get_api_url
+from cars_api.verification import run_worker, verify_batch
+
+
+class Command(BaseCommand):
+    """Verify cars queued in queued verification mode against external api."""
+
+    help = (
+        "Verify pending cars against external api in batches (one lookup per make, limited concurrency), mark them "
+        "verified or rejected. Runs until SIGTERM/SIGINT (current batch is finished first), or until no job is "
+        "available with --once."
+    )
+
+    def add_arguments(self, parser) -> None:
+        """Add command arguments."""
+        parser.add_argument(
+            "--batch-size", type=int, help="Max number of cars verified at once (CAR_VERIFICATION_BATCH_SIZE)"
+        )
+        parser.add_argument(
+            "--concurrency", type=int, help="Max number of concurrent lookups (CAR_VERIFICATION_CONCURRENCY)"
+        )
+        parser.add_argument(
+            "--interval", type=float, help="Wait time in seconds after partial batch (CAR_VERIFICATION_INTERVAL)"
+        )
+        parser.add_argument("--once", action="store_true", help="Verify available jobs and exit")
+
+    def handle(self, *args, **options) -> None:
+        """Command entry point."""
+        # Catalogue as the only source of data doesn't need the external api
+        if not get_api_url() and vehicle_catalogue.get_mode() != vehicle_catalogue.MODE_ONLY:
+            raise CommandError("Missing api url env variable (EXTERNAL_API_URL)")
+        if options["once"]:
+            totals = {"verified": 0, "rejected": 0, "retried": 0}
+            while True:
+                counts = verify_batch(options["batch_size"], options["concurrency"])
+                for key, count in counts.items():
+                    totals[key] += count
+                # Loop ends when no job is available, or all jobs failed and wait for a retry
+                if not counts["verified"] + counts["rejected"]:
+                    break
+        else:
+            stop = []
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, lambda *_: stop.append(True))
+            totals = run_worker(
+                options["batch_size"], options["concurrency"], options["interval"], should_stop=lambda: bool(stop)
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Verified {totals['verified']}, rejected {totals['rejected']}, retried {totals['retried']} cars."
+            )
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from cars_api.external_api_cache import get_stats
+
+
+class Command(BaseCommand):
+    """Show external api (vPIC) cache counters."""
+
+    help = "Show number of cached makes, cache hits (saved external api calls) and misses (external api calls)."
+
+    def handle(self, *args, **options) -> None:
+        """Command entry point."""
+        stats = get_stats()
+        self.stdout.write(f"entries: {stats['entries']}, hits: {stats['hits']}, misses: {stats['misses']}")
@@ -0,0 +1,282 @@
+import asyncio
+import hmac
+import os
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Awaitable, Callable, Optional, Union
+
+from django.conf import settings
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.http import Http404, HttpRequest, HttpResponse
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest,
+                               multiprocess)
+
+# Metrics are labeled with url route (pattern from urls.py, e.g. "cars/<int:pk>/") and request method.
+# With PROMETHEUS_MULTIPROC_DIR env variable set, every worker process writes its values to that directory and
+# /metrics endpoint aggregates values of all processes
+LABELS = ("route", "method")
+REQUEST_DURATION = Histogram("cars_api_request_duration_seconds", "Total request latency.", LABELS)
+DB_DURATION = Histogram("cars_api_request_db_duration_seconds", "Time spent in SQL queries per request.", LABELS)
+DB_QUERIES = Histogram(
+    "cars_api_request_db_queries",
+    "Number of SQL queries per request.",
+    LABELS,
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, float("inf")),
+)
+EXTERNAL_API_DURATION = Histogram(
+    "cars_api_request_external_api_duration_seconds", "Time spent in external api calls per request.", LABELS
+)
+RESPONSES = Counter("cars_api_responses", "Responses by status code.", LABELS + ("status",))
+EXTERNAL_API_RESPONSES = Counter(
+    "cars_api_external_api_responses", "External api responses by status code (error if no response).", ("status",)
+)
+EXTERNAL_API_SKIPPED_CALLS = Counter(
+    "cars_api_external_api_skipped_calls",
+    "External api calls not made: failed fast with open circuit, or coalesced with an identical call in flight.",
+    ("reason",),
+)
+
+
+class RequestMetrics:
+    """Timings of a single request. Instance also measures SQL queries, called by record_query db execute wrapper."""
+
+    __slots__ = ("db_duration", "db_queries", "external_api_duration")
+
+    def __init__(self) -> None:
+        """Init method of RequestMetrics class."""
+        self.db_duration = 0.0
+        self.db_queries = 0
+        self.external_api_duration = 0.0
+
+    def __call__(self, execute: Callable, sql: str, params: Any, many: bool, context: Any) -> Any:
+        """Execute SQL query and measure its time.
+
+        Args:
+            execute (Callable): Next wrapper or query execution
+            sql (str): SQL query
+            params (Any): Query params
+            many (bool): True for executemany
+            context (Any): Execution context
+
+        Returns:
+            Any: Result of query execution.
+        """
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_duration += time.perf_counter() - started
+            self.db_queries += 1
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("cars_api_request_metrics", default=None)
+
+
+def record_query(execute: Callable, sql: str, params: Any, many: bool, context: Any) -> Any:
+    """Db execute wrapper adding SQL query to current request metrics (if any).
+
+    Args:
+        execute (Callable): Next wrapper or query execution
+        sql (str): SQL query
+        params (Any): Query params
+        many (bool): True for executemany
+        context (Any): Execution context
+
+    Returns:
+        Any: Result of query execution.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def install_db_wrapper(sender: Any, connection: BaseDatabaseWrapper, **kwargs: Any) -> None:
+    """Add record_query wrapper to a new db connection (connection_created signal receiver).
+
+    Connections are thread-local and queries of async views run in sync_to_async threads, so a wrapper installed by
+    middleware in its own thread would miss them. Wrapper installed on every connection finds metrics of the request
+    in a context variable, which is copied to sync_to_async threads.
+
+    Args:
+        sender (Any): Database backend class
+        connection (BaseDatabaseWrapper): Connected db connection
+        kwargs (Any): Other signal arguments
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def timed_external_api(func: Callable) -> Callable:
+    """Decorator adding execution time of external api function (sync or async) to current request metrics.
+
+    Args:
+        func (Callable): External api function
+
+    Returns:
+        Callable: Decorated function.
+    """
+
+    def record(started: float) -> None:
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.external_api_duration += time.perf_counter() - started
+
+    if asyncio.iscoroutinefunction(func):
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):  # type: ignore
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                record(started)
+
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):  # type: ignore
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record(started)
+
+    return wrapper
+
+
+def record_external_api_response(status_code: Optional[int]) -> None:
+    """Count external api response.
+
+    Args:
+        status_code (Optional[int]): Response status code, or None if there was no response
+    """
+    EXTERNAL_API_RESPONSES.labels(status=str(status_code) if status_code else "error").inc()
+
+
+def record_skipped_external_api_call(reason: str) -> None:
+    """Count external api call which wasn't made.
+
+    Args:
+        reason (str): "circuit_open" or "coalesced"
+    """
+    EXTERNAL_API_SKIPPED_CALLS.labels(reason=reason).inc()
+
+
+class MetricsMiddleware:
+    """Middleware recording latency, SQL time, number of queries and external api time of every request.
+
+    SQL queries are measured with execute wrapper of every db connection (see install_db_wrapper). Time of streamed
+    response body is not included. Middleware is sync and async capable, so under ASGI server async views aren't
+    adapted to sync.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        """Init method of MetricsMiddleware class.
+
+        Args:
+            get_response (Callable): Next middleware or view
+        """
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Marks instance as coroutine function (as django's MiddlewareMixin does), so handler awaits it directly
+            self._is_coroutine = asyncio.coroutines._is_coroutine  # type: ignore
+
+    def __call__(self, request: HttpRequest) -> Union[HttpResponse, Awaitable[HttpResponse]]:
+        """Handle request and record its metrics.
+
+        Args:
+            request (HttpRequest): Input data
+
+        Returns:
+            Union[HttpResponse, Awaitable[HttpResponse]]: Response of the view (awaitable in async mode).
+        """
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, metrics, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """Handle request in async mode and record its metrics.
+
+        Args:
+            request (HttpRequest): Input data
+
+        Returns:
+            HttpResponse: Response of the view.
+        """
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, metrics, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def record(request: HttpRequest, response: HttpResponse, metrics: RequestMetrics, duration: float) -> None:
+        """Record metrics of handled request.
+
+        Args:
+            request (HttpRequest): Input data
+            response (HttpResponse): Response of the view
+            metrics (RequestMetrics): Timings of the request
+            duration (float): Total latency in seconds
+        """
+        route = request.resolver_match.route if request.resolver_match else "unmatched"
+        labels = {"route": route, "method": request.method}
+        REQUEST_DURATION.labels(**labels).observe(duration)
+        DB_DURATION.labels(**labels).observe(metrics.db_duration)
+        DB_QUERIES.labels(**labels).observe(metrics.db_queries)
+        EXTERNAL_API_DURATION.labels(**labels).observe(metrics.external_api_duration)
+        RESPONSES.labels(status=str(response.status_code), **labels).inc()
+
+
+def is_metrics_client(request: HttpRequest) -> bool:
+    """Check if request may read metrics: it comes from METRICS_ALLOWED_IPS or has METRICS_TOKEN bearer token.
+
+    Args:
+        request (HttpRequest): Input data
+
+    Returns:
+        bool: True if metrics may be exposed to the client.
+    """
+    if request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS:
+        return True
+    token = settings.METRICS_TOKEN
+    authorization = request.META.get("HTTP_AUTHORIZATION", "")
+    return bool(token) and hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode())
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """Expose metrics in Prometheus text format, aggregated for all worker processes in multiprocess mode.
+
+    Args:
+        request (HttpRequest): Input data
+
+    Raises:
+        Http404: Raised for clients other than metrics scrapers (see is_metrics_client), endpoint isn't public
+
+    Returns:
+        HttpResponse: Metrics.
+    """
+    if not is_metrics_client(request):
+        raise Http404
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR") or os.getenv("prometheus_multiproc_dir"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
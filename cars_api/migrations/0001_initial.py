@@ -0,0 +1,132 @@
+# Generated by Django 3.2.4 on 2026-10-18 17:29
+
+import cars_api.models
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Car',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('make', cars_api.models.TitleCharField(max_length=50)),
+                ('model', cars_api.models.TitleCharField(max_length=50)),
+                ('rates_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('avg_rating', models.FloatField(default=0.0)),
+                ('rating_1_count', models.PositiveIntegerField(default=0)),
+                ('rating_2_count', models.PositiveIntegerField(default=0)),
+                ('rating_3_count', models.PositiveIntegerField(default=0)),
+                ('rating_4_count', models.PositiveIntegerField(default=0)),
+                ('rating_5_count', models.PositiveIntegerField(default=0)),
+                ('search_name', models.CharField(default='', editable=False, max_length=101)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyRates',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('rates_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ExternalApiCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('make', models.CharField(max_length=50, unique=True)),
+                ('model_names', models.JSONField(default=list)),
+                ('expires_at', models.DateTimeField()),
+                ('last_used_at', models.DateTimeField(db_index=True)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('misses', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PendingRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.IntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)])),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Rate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.IntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)])),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VehicleCatalogue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('make', models.CharField(max_length=50)),
+                ('model', models.CharField(max_length=100)),
+                ('make_key', models.CharField(max_length=50)),
+                ('model_key', models.CharField(max_length=100)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='vehiclecatalogue',
+            constraint=models.UniqueConstraint(fields=('make_key', 'model_key'), name='vehicle_catalogue_key'),
+        ),
+        migrations.AddField(
+            model_name='rate',
+            name='car_id',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='cars_api.car'),
+        ),
+        migrations.AddField(
+            model_name='pendingrate',
+            name='car_id',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='cars_api.car'),
+        ),
+        migrations.AddField(
+            model_name='dailyrates',
+            name='car_id',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rates', to='cars_api.car'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['-avg_rating', 'id'], name='car_avg_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['-rates_count', 'id'], name='car_rates_count_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='car',
+            constraint=models.UniqueConstraint(fields=('make', 'model'), name='car_make_model_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='rate',
+            index=models.Index(fields=['car_id', '-id'], name='rate_car_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyrates',
+            index=models.Index(fields=['day', 'car_id', 'rates_count'], name='daily_rates_window_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrates',
+            constraint=models.UniqueConstraint(fields=('car_id', 'day'), name='daily_rates_car_day_unique'),
+        ),
+    ]
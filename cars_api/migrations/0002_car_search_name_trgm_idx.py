@@ -0,0 +1,38 @@
+from django.db import migrations
+from django.db.models import Value
+from django.db.models.functions import Concat, Lower
+
+
+def create_search_index(apps, schema_editor):
+    """Create trigram index on car search names, used by /cars/search/ on PostgreSQL.
+
+    Index can't be declared in Car.Meta, since other databases (SQLite in development) don't support it. Search names
+    of cars created before search_name field are filled as well.
+    """
+    Car = apps.get_model("cars_api", "Car")
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS car_search_name_trgm_idx "
+            f"ON {Car._meta.db_table} USING gin (search_name gin_trgm_ops)"
+        )
+    Car.objects.using(schema_editor.connection.alias).filter(search_name="").update(
+        search_name=Lower(Concat("make", Value(" "), "model"))
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    """Drop trigram index on car search names (PostgreSQL only)."""
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS car_search_name_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cars_api", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 3.2.4 on 2026-10-18 17:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars_api', '0002_car_search_name_trgm_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CarVerificationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('make_key', models.CharField(max_length=50)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.CharField(blank=True, default='', max_length=200)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='car',
+            name='car_avg_rating_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='car',
+            name='car_rates_count_idx',
+        ),
+        migrations.AddField(
+            model_name='car',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('verified', 'Verified'), ('rejected', 'Rejected')], default='verified', max_length=8),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['status', '-avg_rating', 'id'], name='car_status_avg_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['status', '-rates_count', 'id'], name='car_status_rates_count_idx'),
+        ),
+        migrations.AddField(
+            model_name='carverificationjob',
+            name='car_id',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='verification_job', to='cars_api.car'),
+        ),
+        migrations.AddIndex(
+            model_name='carverificationjob',
+            index=models.Index(fields=['available_at', 'id'], name='car_verification_job_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def create_prefix_index(apps, schema_editor):
+    """Create btree index on car search names for prefix (LIKE 'query%') lookups of /cars/search/ on PostgreSQL.
+
+    Prefix of any length is a range scan of this index, while trigram index (see migration 0002) needs 3 characters of
+    query and rechecks every candidate. Default btree operator class can't serve LIKE under non-C collations, hence
+    varchar_pattern_ops. Other databases (SQLite in development) use in-memory index instead.
+    """
+    Car = apps.get_model("cars_api", "Car")
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS car_search_name_prefix_idx "
+            f"ON {Car._meta.db_table} (search_name varchar_pattern_ops)"
+        )
+
+
+def drop_prefix_index(apps, schema_editor):
+    """Drop prefix index on car search names (PostgreSQL only)."""
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS car_search_name_prefix_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cars_api", "0003_car_status_verification_job"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_index, drop_prefix_index),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.4 on 2026-10-18 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars_api', '0004_car_search_name_prefix_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExternalApiCacheStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hits', models.PositiveBigIntegerField(default=0)),
+                ('misses', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RemoveField(
+            model_name='externalapicache',
+            name='hits',
+        ),
+        migrations.RemoveField(
+            model_name='externalapicache',
+            name='misses',
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.4 on 2026-10-18 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars_api', '0005_external_api_cache_stats'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='car',
+            name='car_make_model_unique',
+        ),
+        migrations.AddConstraint(
+            model_name='car',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'rejected'), _negated=True), fields=('make', 'model'), name='car_make_model_unique'),
+        ),
+    ]
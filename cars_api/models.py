@@ -1,7 +1,34 @@
-from typing import Any, Dict
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import Case, Count, F, FloatField, Min, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, TruncDate, TruncMonth
+from django.utils import timezone
+
+from . import ratings
+
+
+def bump_data_version() -> None:
+    """Increment global data version after current transaction is committed (or right away in autocommit mode).
+
+    Version is bumped once per transaction, no matter how many writes it contains. Bumping after commit keeps the
+    version row locked only for a moment, and readers (which read version before data) never cache stale data
+    under a new version. In autocommit mode it has to be called after the write, so the write is visible first.
+    """
+    connection = transaction.get_connection()
+    if connection.in_atomic_block and any(entry[1] is _increment_data_version for entry in connection.run_on_commit):
+        return
+    transaction.on_commit(_increment_data_version)
+
+
+def _increment_data_version() -> None:
+    """Increment global data version, creating its record if needed."""
+    if not DataVersion.objects.filter(pk=1).update(version=F("version") + 1, updated_at=timezone.now()):
+        DataVersion.objects.get_or_create(pk=1, defaults={"version": 1})
 
 
 class TitleCharField(models.CharField):
@@ -21,9 +48,160 @@ class TitleCharField(models.CharField):
         return str(value).title()
 
 
+# Car fields with number of rates of every rating value (rating histogram)
+HISTOGRAM_FIELDS = {rating: f"rating_{rating}_count" for rating in range(1, 6)}
+
+# Verification statuses of a car against external api, only verified cars are listed and rated (see verification)
+STATUS_PENDING = "pending"
+STATUS_VERIFIED = "verified"
+STATUS_REJECTED = "rejected"
+CAR_STATUSES = [(STATUS_PENDING, "Pending"), (STATUS_VERIFIED, "Verified"), (STATUS_REJECTED, "Rejected")]
+
+
+class CarQuerySet(models.QuerySet):
+    def verified(self) -> "CarQuerySet":
+        """Filter cars verified against external api, the only ones listed by list endpoints.
+
+        Returns:
+            CarQuerySet: Verified cars.
+        """
+        return self.filter(status=STATUS_VERIFIED)
+
+    def apply_rating_delta(self, rating_deltas: Dict[int, int]) -> int:
+        """Shift stored rating aggregates and histogram counters of selected cars, in a single UPDATE query.
+
+        Args:
+            rating_deltas (Dict[int, int]): Change of the number of rates, by rating value (1-5)
+
+        Returns:
+            int: Number of updated car records.
+        """
+        count_delta = sum(rating_deltas.values())
+        new_count = F("rates_count") + count_delta
+        new_sum = F("rating_sum") + sum(rating * delta for rating, delta in rating_deltas.items())
+        counters = {
+            HISTOGRAM_FIELDS[rating]: F(HISTOGRAM_FIELDS[rating]) + delta
+            for rating, delta in rating_deltas.items()
+            if delta
+        }
+        updated = self.update(
+            rates_count=new_count,
+            rating_sum=new_sum,
+            avg_rating=Case(
+                When(rates_count__gt=-count_delta, then=Cast(new_sum, FloatField()) / Cast(new_count, FloatField())),
+                default=Value(0.0),
+                output_field=FloatField(),
+            ),
+            **counters,
+        )
+        bump_data_version()
+        return updated
+
+    def apply_rating_deltas(self, rates: Iterable["Rate"]) -> None:
+        """Add new rates to stored rating aggregates (single UPDATE query per car) and daily rate rollups.
+
+        Used for rates inserted with bulk_create, which doesn't call Rate.save.
+
+        Args:
+            rates (Iterable[Rate]): Newly created rates
+        """
+        deltas: Dict[int, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        daily: Dict[Tuple[int, date], int] = defaultdict(int)
+        for rate in rates:
+            deltas[rate.car_id_id][rate.rating] += 1
+            daily[(rate.car_id_id, rate.day)] += 1
+        # Cars are updated in the same order by every batch, to avoid deadlocks between concurrent batches
+        for car_id in sorted(deltas):
+            self.filter(pk=car_id).apply_rating_delta(deltas[car_id])
+        DailyRates.objects.add_rates(daily)
+
+    def rebuild_rating_aggregates(self) -> int:
+        """Recompute stored rating aggregates of selected cars from Rate records.
+
+        Returns:
+            int: Number of updated car records.
+        """
+        rates = Rate.objects.filter(car_id=OuterRef("pk")).order_by().values("car_id")
+        count = Coalesce(Subquery(rates.annotate(c=Count("pk")).values("c")), 0)
+        rating_sum = Coalesce(Subquery(rates.annotate(s=Sum("rating")).values("s")), 0)
+        counters = {
+            field: Coalesce(Subquery(rates.filter(rating=rating).annotate(c=Count("pk")).values("c")), 0)
+            for rating, field in HISTOGRAM_FIELDS.items()
+        }
+        updated = self.update(
+            rates_count=count,
+            rating_sum=rating_sum,
+            avg_rating=Coalesce(
+                Subquery(rates.annotate(a=Cast(Sum("rating"), FloatField()) / Count("pk")).values("a")),
+                Value(0.0),
+                output_field=FloatField(),
+            ),
+            **counters,
+        )
+        bump_data_version()
+        return updated
+
+    def bulk_create(self, objs: Iterable["Car"], *args, **kwargs) -> List["Car"]:
+        """Overridden bulk_create method, fills search names and bumps global data version.
+
+        Returns:
+            List[Car]: Created cars.
+        """
+        objs = list(objs)
+        for car in objs:
+            car.search_name = Car.build_search_name(car.make, car.model)
+        created = super(CarQuerySet, self).bulk_create(objs, *args, **kwargs)
+        bump_data_version()
+        return created
+
+    def delete(self) -> Tuple[int, Dict[str, int]]:
+        """Overridden delete method, bumps global data version.
+
+        Returns:
+            Tuple[int, Dict[str, int]]: Number of deleted objects and number of deletions per object type.
+        """
+        result = super(CarQuerySet, self).delete()
+        bump_data_version()
+        return result
+
+
 class Car(models.Model):
     make = TitleCharField(max_length=50)
     model = TitleCharField(max_length=50)
+    # Denormalized rating aggregates, maintained by Rate writes (see RateQuerySet and Rate.save/delete).
+    rates_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    avg_rating = models.FloatField(default=0.0)
+    # Rating histogram, number of rates of every rating value (see HISTOGRAM_FIELDS)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+    # Lower-cased "make model", matched by /cars/search/ (see search module)
+    search_name = models.CharField(max_length=101, default="", editable=False)
+    # Cars created in queued verification mode stay pending until verify_cars worker checks them in external api
+    status = models.CharField(max_length=8, choices=CAR_STATUSES, default=STATUS_VERIFIED)
+
+    objects = CarQuerySet.as_manager()
+
+    class Meta:
+        """Meta class of Car model.
+
+        Indexes back the filter (verified cars only) and ordering used by /cars/ and /popular/ endpoints. Make and
+        model are stored title-cased (see TitleCharField), so unique constraint on them is a constraint on normalized
+        pair. Rejected cars are kept (their status stays visible) but don't hold the pair, so it can be submitted again.
+        """
+
+        indexes = [
+            models.Index(fields=["status", "-avg_rating", "id"], name="car_status_avg_rating_idx"),
+            models.Index(fields=["status", "-rates_count", "id"], name="car_status_rates_count_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["make", "model"], condition=~models.Q(status=STATUS_REJECTED), name="car_make_model_unique"
+            )
+        ]
 
     def __str__(self) -> str:
         """Overridden method, with custom string representation.
@@ -41,10 +219,108 @@ class Car(models.Model):
         """
         return {"make": self.make, "model": self.model}
 
+    def save(self, *args, **kwargs) -> None:
+        """Overridden save method, fills search name and bumps global data version."""
+        self.search_name = self.build_search_name(self.make, self.model)
+        super(Car, self).save(*args, **kwargs)
+        bump_data_version()
+
+    @staticmethod
+    def build_search_name(make: str, model: str) -> str:
+        """Build normalized search name of a car.
+
+        Args:
+            make (str): Car make
+            model (str): Car model
+
+        Returns:
+            str: Lower-cased make and model, separated with space.
+        """
+        return f"{make} {model}".lower()
+
+    def delete(self, *args, **kwargs) -> Tuple[int, Dict[str, int]]:
+        """Overridden delete method, bumps global data version (rates of the car are removed by cascade delete).
+
+        Returns:
+            Tuple[int, Dict[str, int]]: Number of deleted objects and number of deletions per object type.
+        """
+        result = super(Car, self).delete(*args, **kwargs)
+        bump_data_version()
+        return result
+
+    @property
+    def average_rating(self) -> Optional[float]:
+        """Average rating derived from stored aggregates.
+
+        Returns:
+            Optional[float]: Average rating, or None if car has no rates.
+        """
+        if not self.rates_count:
+            return None
+        return self.rating_sum / self.rates_count
+
+    @property
+    def rating_histogram(self) -> Dict[str, int]:
+        """Number of rates of every rating value.
+
+        Returns:
+            Dict[str, int]: Number of rates by rating value ("1" to "5").
+        """
+        return {str(rating): getattr(self, field) for rating, field in HISTOGRAM_FIELDS.items()}
+
+    @property
+    def median_rating(self) -> Optional[float]:
+        """Median rating derived from stored histogram.
+
+        Returns:
+            Optional[float]: Median rating, or None if car has no rates.
+        """
+        return ratings.median(getattr(self, field) for field in HISTOGRAM_FIELDS.values())
+
+    @property
+    def bayesian_average_rating(self) -> float:
+        """Bayesian average rating derived from stored aggregates.
+
+        Returns:
+            float: Average rating weighted towards the prior mean.
+        """
+        return ratings.bayesian_average(self.rating_sum, self.rates_count)
+
+
+class RateQuerySet(models.QuerySet):
+    def delete(self) -> Tuple[int, Dict[str, int]]:
+        """Overridden delete method, keeps stored car rating aggregates up to date.
+
+        Cascade deletes of Car records don't go through this method, aggregates are removed along with the car.
+
+        Returns:
+            Tuple[int, Dict[str, int]]: Number of deleted objects and number of deletions per object type.
+        """
+        with transaction.atomic():
+            daily = {
+                (row["car_id"], row["day"]): -row["count"]
+                for row in self.order_by().values("car_id", day=TruncDate("created_at")).annotate(count=Count("pk"))
+            }
+            result = super(RateQuerySet, self).delete()
+            Car.objects.filter(pk__in={car_id for car_id, _ in daily}).rebuild_rating_aggregates()
+            DailyRates.objects.add_rates(daily)
+        return result
+
 
 class Rate(models.Model):
     car_id = models.ForeignKey(Car, on_delete=models.CASCADE)
     rating = models.IntegerField(validators=[MinValueValidator(1), MaxValueValidator(5)])
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = RateQuerySet.as_manager()
+
+    class Meta:
+        """Meta class of Rate model.
+
+        Index backs the ordering used by /cars/<pk>/rates/ endpoint (rates of a car, newest first).
+        """
+
+        indexes = [models.Index(fields=["car_id", "-id"], name="rate_car_id_idx")]
 
     def __str__(self) -> str:
         """Overridden method, with custom string representation.
@@ -61,3 +337,347 @@ class Rate(models.Model):
             dict: Object data represented as dict.
         """
         return {"car": self.car_id.to_dict(), "rate": self.rating}
+
+    @property
+    def day(self) -> date:
+        """Day of rate creation, in current time zone.
+
+        Returns:
+            date: Key of daily rollup bucket the rate is counted in.
+        """
+        return timezone.localdate(self.created_at)
+
+    def save(self, *args, **kwargs) -> None:
+        """Overridden save method, updates stored car rating aggregates and daily rollups in the same transaction."""
+        with transaction.atomic():
+            if self._state.adding:
+                super(Rate, self).save(*args, **kwargs)
+                Car.objects.filter(pk=self.car_id_id).apply_rating_delta({self.rating: 1})
+                DailyRates.objects.add_rates({(self.car_id_id, self.day): 1})
+                return
+            previous = Rate.objects.filter(pk=self.pk).values_list("car_id", "created_at").first()
+            super(Rate, self).save(*args, **kwargs)
+            daily: Dict[Tuple[int, date], int] = defaultdict(int, {(self.car_id_id, self.day): 1})
+            if previous is not None:
+                daily[(previous[0], timezone.localdate(previous[1]))] -= 1
+            Car.objects.filter(pk__in={car_id for car_id, _ in daily}).rebuild_rating_aggregates()
+            DailyRates.objects.add_rates(daily)
+
+    def delete(self, *args, **kwargs) -> Tuple[int, Dict[str, int]]:
+        """Overridden delete method, updates stored car rating aggregates and daily rollups in the same transaction.
+
+        Returns:
+            Tuple[int, Dict[str, int]]: Number of deleted objects and number of deletions per object type.
+        """
+        with transaction.atomic():
+            result = super(Rate, self).delete(*args, **kwargs)
+            Car.objects.filter(pk=self.car_id_id).apply_rating_delta({self.rating: -1})
+            DailyRates.objects.add_rates({(self.car_id_id, self.day): -1})
+        return result
+
+
+def supports_upsert(connection: BaseDatabaseWrapper) -> bool:
+    """Check if db supports INSERT ... ON CONFLICT DO UPDATE query (PostgreSQL, SQLite 3.24+).
+
+    Args:
+        connection (BaseDatabaseWrapper): Db connection
+
+    Returns:
+        bool: True if upsert can be used.
+    """
+    if connection.vendor == "sqlite":
+        return connection.Database.sqlite_version_info >= (3, 24)
+    return connection.vendor == "postgresql"
+
+
+class DailyRatesQuerySet(models.QuerySet):
+    def add_rates(self, counts: Dict[Tuple[int, date], int]) -> None:
+        """Shift rate counters of daily buckets, creating missing buckets.
+
+        Added rates are upserted with a single query where db supports it (see upsert_rates), otherwise every bucket
+        is updated with a single UPDATE query (and created if it's missing).
+
+        Negative changes only update existing buckets, rates of days already compacted into monthly buckets
+        (see compact) are not subtracted from them.
+
+        Args:
+            counts (Dict[Tuple[int, date], int]): Change of the number of rates, by car id and day
+        """
+        # Buckets are updated in the same order by every transaction, to avoid deadlocks between concurrent writes
+        items = sorted(item for item in counts.items() if item[1])
+        connection = connections[router.db_for_write(DailyRates)]
+        if items and all(delta > 0 for _, delta in items) and supports_upsert(connection):
+            self.upsert_rates(items, connection)
+            return
+        for (car_id, day), delta in items:
+            bucket = DailyRates.objects.filter(car_id=car_id, day=day)
+            if delta < 0:
+                bucket.filter(rates_count__gte=-delta).update(rates_count=F("rates_count") + delta)
+            elif not bucket.update(rates_count=F("rates_count") + delta):
+                _, created = DailyRates.objects.get_or_create(
+                    car_id_id=car_id, day=day, defaults={"rates_count": delta}
+                )
+                if not created:
+                    bucket.update(rates_count=F("rates_count") + delta)
+
+    def upsert_rates(self, counts: List[Tuple[Tuple[int, date], int]], connection: BaseDatabaseWrapper) -> None:
+        """Add positive rate counts to daily buckets, creating missing buckets, with a single INSERT ... ON CONFLICT query.
+
+        Large changes are split into batches of the most parameters db accepts in a single query.
+
+        Args:
+            counts (List[Tuple[Tuple[int, date], int]]): Positive change of the number of rates, by car id and day
+            connection (BaseDatabaseWrapper): Connection supporting upserts (see supports_upsert)
+        """
+        opts = DailyRates._meta
+        table, car_id, day, rates_count = (
+            connection.ops.quote_name(name)
+            for name in (opts.db_table, *(opts.get_field(field).column for field in ("car_id", "day", "rates_count")))
+        )
+        day_field = opts.get_field("day")
+        batch_size = connection.ops.bulk_batch_size(["car_id", "day", "rates_count"], counts)
+        with connection.cursor() as cursor:
+            for start in range(0, len(counts), batch_size):
+                batch = counts[start : start + batch_size]
+                cursor.execute(
+                    f"INSERT INTO {table} ({car_id}, {day}, {rates_count}) "
+                    f"VALUES {', '.join(['(%s, %s, %s)'] * len(batch))} "
+                    f"ON CONFLICT ({car_id}, {day}) DO UPDATE SET {rates_count} = {table}.{rates_count} + "
+                    f"EXCLUDED.{rates_count}",
+                    [
+                        param
+                        for (car, bucket_day), delta in batch
+                        for param in (car, day_field.get_db_prep_value(bucket_day, connection), delta)
+                    ],
+                )
+
+    def rebuild(self, batch_size: int = 10000) -> int:
+        """Replace all buckets with daily rate counts computed from Rate records.
+
+        Args:
+            batch_size (int): Number of buckets inserted with a single query
+
+        Returns:
+            int: Number of created buckets.
+        """
+        with transaction.atomic():
+            DailyRates.objects.all().delete()
+            rows = (
+                Rate.objects.order_by()
+                .values("car_id", day=TruncDate("created_at"))
+                .annotate(count=Count("pk"))
+                .iterator()
+            )
+            buckets = DailyRates.objects.bulk_create(
+                (DailyRates(car_id_id=row["car_id"], day=row["day"], rates_count=row["count"]) for row in rows),
+                batch_size=batch_size,
+            )
+            bump_data_version()
+        return len(buckets)
+
+    def compact(self, before: date) -> int:
+        """Merge daily buckets older than given day into monthly buckets (dated with the first day of month).
+
+        Monthly buckets are never matched by popularity windows, as long as windows don't reach past `before` day.
+        Months already stored as a single monthly bucket are skipped.
+
+        Args:
+            before (date): First day which is kept in daily buckets
+
+        Returns:
+            int: Number of removed buckets.
+        """
+        old = self.filter(day__lt=before)
+        groups = [
+            group
+            for group in old.order_by()
+            .values("car_id", month=TruncMonth("day"))
+            .annotate(total=Sum("rates_count"), buckets=Count("pk"), first_day=Min("day"))
+            if group["buckets"] > 1 or group["first_day"] != group["month"]
+        ]
+        with transaction.atomic():
+            for group in groups:
+                month = group["month"]
+                old.filter(car_id=group["car_id"], day__year=month.year, day__month=month.month).delete()
+            DailyRates.objects.bulk_create(
+                [
+                    DailyRates(car_id_id=group["car_id"], day=group["month"], rates_count=group["total"])
+                    for group in groups
+                ]
+            )
+        return sum(group["buckets"] for group in groups) - len(groups)
+
+
+class DailyRates(models.Model):
+    """Number of rates of a car created on a given day, maintained incrementally by Rate writes.
+
+    Used to rank cars by popularity in recent days (/popular/?window=7d) by summing a few buckets per car instead of
+    counting Rate records. Buckets older than RATE_ROLLUP_RETENTION_DAYS are merged into monthly ones by
+    rollup_rates command.
+    """
+
+    car_id = models.ForeignKey(Car, on_delete=models.CASCADE, related_name="daily_rates")
+    day = models.DateField()
+    rates_count = models.PositiveIntegerField(default=0)
+
+    objects = DailyRatesQuerySet.as_manager()
+
+    class Meta:
+        """Meta class of DailyRates model.
+
+        Unique constraint keeps a single bucket per car and day. Window index covers the whole windowed popularity
+        query (buckets since a day, with their car and count).
+        """
+
+        constraints = [models.UniqueConstraint(fields=["car_id", "day"], name="daily_rates_car_day_unique")]
+        indexes = [models.Index(fields=["day", "car_id", "rates_count"], name="daily_rates_window_idx")]
+
+    def __str__(self) -> str:
+        """Overridden method, with custom string representation.
+
+        Returns:
+            str: Formatted output data
+        """
+        return f"{self.car_id_id} {self.day}: {self.rates_count}"
+
+
+class PendingRate(models.Model):
+    """Rate accepted in buffered ingestion mode, waiting to be moved into Rate table (see rate_buffer module).
+
+    Rating is acknowledged once this record is committed, so it survives a crash of the worker which accepted it.
+    """
+
+    car_id = models.ForeignKey(Car, on_delete=models.CASCADE)
+    rating = models.IntegerField(validators=[MinValueValidator(1), MaxValueValidator(5)])
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self) -> str:
+        """Overridden method, with custom string representation.
+
+        Returns:
+            str: Formatted output data
+        """
+        return f"{self.car_id_id}: {self.rating} (pending)"
+
+
+class CarVerificationJob(models.Model):
+    """Queued verification of a pending car against external api, processed by verify_cars command.
+
+    Claimed job is leased: it isn't available to other workers until `available_at`, so job of a crashed worker is
+    picked up again after the lease expires. Jobs failed with external api errors are retried with backoff.
+    """
+
+    car_id = models.OneToOneField(Car, on_delete=models.CASCADE, related_name="verification_job")
+    # Normalized make (see external_api_cache.normalize_make), jobs of a batch are verified with one lookup per make
+    make_key = models.CharField(max_length=50)
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    last_error = models.CharField(max_length=200, blank=True, default="")
+
+    class Meta:
+        """Meta class of CarVerificationJob model.
+
+        Index backs claiming of available jobs, oldest first.
+        """
+
+        indexes = [models.Index(fields=["available_at", "id"], name="car_verification_job_idx")]
+
+    def __str__(self) -> str:
+        """Overridden method, with custom string representation.
+
+        Returns:
+            str: Formatted output data
+        """
+        return f"{self.car_id_id}: attempt {self.attempts}"
+
+
+class DataVersion(models.Model):
+    """Global version of cars and rates data, single record bumped after every Car or Rate write.
+
+    Used to answer conditional requests and cache rendered responses of list endpoints.
+    """
+
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    @classmethod
+    def get(cls) -> Tuple[int, Optional[datetime]]:
+        """Get current data version, with a single primary key lookup.
+
+        Returns:
+            Tuple[int, Optional[datetime]]: Version number and time of the last change (None if data never changed).
+        """
+        return cls.objects.filter(pk=1).values_list("version", "updated_at").first() or (0, None)
+
+    def __str__(self) -> str:
+        """Overridden method, with custom string representation.
+
+        Returns:
+            str: Formatted output data
+        """
+        return f"{self.version} ({self.updated_at})"
+
+
+class ExternalApiCache(models.Model):
+    """Cached list of model names for a make, received from external api.
+
+    Stored in db, so it's shared by every worker process. Empty model_names list means that make is unknown
+    to external api (negative cache entry). Hit and miss counters are kept in ExternalApiCacheStats, so they
+    outlive evicted entries.
+    """
+
+    make = models.CharField(max_length=50, unique=True)
+    model_names = models.JSONField(default=list)
+    expires_at = models.DateTimeField()
+    last_used_at = models.DateTimeField(db_index=True)
+
+    def __str__(self) -> str:
+        """Overridden method, with custom string representation.
+
+        Returns:
+            str: Formatted output data
+        """
+        return f"{self.make}: {len(self.model_names)} models"
+
+
+class ExternalApiCacheStats(models.Model):
+    """Hit and miss counters of external api cache (see ExternalApiCache), single record for the whole cache."""
+
+    hits = models.PositiveBigIntegerField(default=0)
+    misses = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        """Overridden method, with custom string representation.
+
+        Returns:
+            str: Formatted output data
+        """
+        return f"hits: {self.hits}, misses: {self.misses}"
+
+
+class VehicleCatalogue(models.Model):
+    """Local mirror of external api (vPIC) makes and models, used to validate cars without calling external api.
+
+    Lookups use normalized (make_key, model_key) pair, backed by unique index.
+    """
+
+    make = models.CharField(max_length=50)
+    model = models.CharField(max_length=100)
+    make_key = models.CharField(max_length=50)
+    model_key = models.CharField(max_length=100)
+
+    class Meta:
+        """Meta class of VehicleCatalogue model.
+
+        Unique constraint on normalized pair also serves as index for lookups by make_key.
+        """
+
+        constraints = [models.UniqueConstraint(fields=["make_key", "model_key"], name="vehicle_catalogue_key")]
+
+    def __str__(self) -> str:
+        """Overridden method, with custom string representation.
+
+        Returns:
+            str: Formatted output data
+        """
+        return f"{self.make} {self.model}"
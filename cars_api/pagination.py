@@ -0,0 +1,187 @@
+import json
+from base64 import b64decode, b64encode
+from typing import Any, List, Optional, Tuple
+
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor based pagination over (ordering_field, id) pair.
+
+    Each page is fetched with a WHERE condition on the last seen (value, id) pair instead of OFFSET, so with
+    composite index on (ordering_field, id) fetching any page costs the same as fetching the first one. Condition
+    on the pair is an OR, which databases can't use as an index range, so it's bounded with a plain range on the
+    value (e.g. `value <= last AND (value < last OR (value = last AND id > last_id))`), which they can.
+    Cursor is opaque for clients, it's base64 encoded json with last seen (value, id) pair.
+    Unpaginated response (plain list) is still available for old clients with `?paginate=false` query param.
+    """
+
+    # Ordering field, with "-" prefix for descending order. Ties are ordered by ascending id.
+    ordering_field = ""
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    paginate_query_param = "paginate"
+    page_size = 100
+    max_page_size = 1000
+    invalid_cursor_message = "Invalid cursor"
+    invalid_page_size_message = "Invalid page size"
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view: Any = None) -> Optional[List[Any]]:
+        """Return single page of results, or None if pagination is turned off by the client.
+
+        Args:
+            queryset (QuerySet): Queryset to paginate
+            request (Request): Input data
+            view (Any): View calling pagination
+
+        Returns:
+            Optional[List[Any]]: List of objects on requested page.
+        """
+        if request.query_params.get(self.paginate_query_param, "").lower() in ("0", "false", "no"):
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        field_name = self.ordering_field.lstrip("-")
+        descending = self.ordering_field.startswith("-")
+
+        queryset = queryset.order_by(self.ordering_field, "id")
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            value, pk = cursor
+            after, bound = ("lt", "lte") if descending else ("gt", "gte")
+            queryset = queryset.filter(
+                Q(**{f"{field_name}__{bound}": value})
+                & (Q(**{f"{field_name}__{after}": value}) | Q(**{field_name: value, "id__gt": pk}))
+            )
+
+        # Fetch one extra record, to know if there is a next page
+        results = list(queryset[: self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if self.has_next:
+            last = self.page[-1]
+            # Rows are model instances, or dicts for querysets projected with values()
+            if isinstance(last, dict):
+                self.next_position: Optional[Tuple[Any, int]] = (last[field_name], last["id"])
+            else:
+                self.next_position = (getattr(last, field_name), last.pk)
+        else:
+            self.next_position = None
+        return self.page
+
+    def get_paginated_response(self, data: List[Any]) -> Response:
+        """Wrap page data with link to the next page.
+
+        Args:
+            data (List[Any]): Serialized page data
+
+        Returns:
+            Response: Response with next page link and results.
+        """
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_page_size(self, request: Request) -> int:
+        """Read page size from query params, clamped to max_page_size.
+
+        Args:
+            request (Request): Input data
+
+        Raises:
+            ValidationError: Raised if page size is not a positive integer
+
+        Returns:
+            int: Page size.
+        """
+        page_size = request.query_params.get(self.page_size_query_param)
+        if page_size is None:
+            return self.page_size
+        try:
+            value = int(page_size)
+        except ValueError:
+            value = 0
+        if value < 1:
+            raise ValidationError({self.page_size_query_param: [self.invalid_page_size_message]})
+        return min(value, self.max_page_size)
+
+    def get_next_link(self) -> Optional[str]:
+        """Build url of the next page.
+
+        Returns:
+            Optional[str]: Url of the next page, or None if current page is the last one.
+        """
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_previous_link(self) -> Optional[str]:
+        """Keyset pagination is forward only, so there is no link to previous page.
+
+        Returns:
+            Optional[str]: Always None.
+        """
+        return None
+
+    def decode_cursor(self, request: Request) -> Optional[Tuple[Any, int]]:
+        """Decode last seen (value, id) pair from the request.
+
+        Args:
+            request (Request): Input data
+
+        Raises:
+            NotFound: Raised if cursor can't be decoded
+
+        Returns:
+            Optional[Tuple[Any, int]]: Last seen (value, id) pair, or None for the first page.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            value, pk = json.loads(b64decode(encoded.encode("ascii"), altchars=b"-_").decode("utf-8"))
+            if not isinstance(pk, int) or not isinstance(value, (int, float)):
+                raise ValueError
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk
+
+    def encode_cursor(self, position: Tuple[Any, int]) -> str:
+        """Encode last seen (value, id) pair as url safe string.
+
+        Args:
+            position (Tuple[Any, int]): Last seen (value, id) pair
+
+        Returns:
+            str: Encoded cursor.
+        """
+        return b64encode(json.dumps(list(position)).encode("utf-8"), altchars=b"-_").decode("ascii")
+
+
+class AvgRatingPagination(KeysetPagination):
+    """Keyset pagination for /cars/ endpoint, ordered by average rating."""
+
+    ordering_field = "-avg_rating"
+
+
+class RatesNumberPagination(KeysetPagination):
+    """Keyset pagination for /popular/ endpoint, ordered by number of rates."""
+
+    ordering_field = "-rates_count"
+
+
+class WindowRatesPagination(KeysetPagination):
+    """Keyset pagination for /popular/?window=<n>d endpoint, ordered by number of rates in the window."""
+
+    ordering_field = "-window_rates"
+
+
+class RatePagination(KeysetPagination):
+    """Keyset pagination for rate lists (/rate/ and /cars/<pk>/rates/ endpoints), newest rates first."""
+
+    ordering_field = "-id"
@@ -0,0 +1,96 @@
+import time
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Car, PendingRate, Rate
+
+# Rate ingestion modes (RATE_INGESTION_MODE setting): rates saved by request, or buffered and moved in batches
+MODE_DIRECT = "direct"
+MODE_BUFFERED = "buffered"
+
+
+def is_enabled() -> bool:
+    """Check if buffered rate ingestion is turned on.
+
+    Returns:
+        bool: True if rates are buffered.
+    """
+    return settings.RATE_INGESTION_MODE == MODE_BUFFERED
+
+
+def append(car_id: int, rating: int) -> PendingRate:
+    """Append validated rate to the buffer.
+
+    Buffer record is a single INSERT, without Rate aggregates update (and row lock of a car it'd take), so concurrent
+    rates of the same car don't wait for each other.
+
+    Args:
+        car_id (int): Car primary key
+        rating (int): Rating value
+
+    Returns:
+        PendingRate: Buffered rate.
+    """
+    return PendingRate.objects.create(car_id_id=car_id, rating=rating)
+
+
+def flush(batch_size: Optional[int] = None) -> int:
+    """Move a batch of buffered rates into Rate table, in a single transaction.
+
+    Rates are inserted with bulk_create, car aggregates are updated once per car, then buffered records are deleted.
+    If anything fails, transaction is rolled back and rates stay in the buffer. Buffered records are locked with
+    SKIP LOCKED (where supported), so multiple flushers don't move the same rates.
+
+    Args:
+        batch_size (Optional[int]): Max number of moved rates, RATE_BUFFER_FLUSH_SIZE by default
+
+    Returns:
+        int: Number of moved rates.
+    """
+    batch_size = batch_size or settings.RATE_BUFFER_FLUSH_SIZE
+    with transaction.atomic():
+        pending = list(
+            PendingRate.objects.select_for_update(skip_locked=True)
+            .order_by("id")
+            .values_list("id", "car_id", "rating", "created_at")[:batch_size]
+        )
+        if not pending:
+            return 0
+        # Rates keep time of acceptance, so they're counted in daily rollups of the day they were sent
+        rates = [
+            Rate(car_id_id=car_id, rating=rating, created_at=created_at) for _, car_id, rating, created_at in pending
+        ]
+        Rate.objects.bulk_create(rates)
+        Car.objects.apply_rating_deltas(rates)
+        PendingRate.objects.filter(id__in=[pending_rate[0] for pending_rate in pending]).delete()
+    return len(pending)
+
+
+def run_flusher(
+    batch_size: Optional[int] = None,
+    interval: Optional[float] = None,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> int:
+    """Flush buffer in a loop: full batches are flushed one after another, then flusher waits for interval seconds.
+
+    Args:
+        batch_size (Optional[int]): Max number of rates moved in a batch, RATE_BUFFER_FLUSH_SIZE by default
+        interval (Optional[float]): Wait time in seconds after flushing partial batch, RATE_BUFFER_FLUSH_INTERVAL
+            by default
+        should_stop (Callable[[], bool]): Function checked after every batch, loop ends when it returns True
+
+    Returns:
+        int: Number of moved rates.
+    """
+    batch_size = batch_size or settings.RATE_BUFFER_FLUSH_SIZE
+    interval = settings.RATE_BUFFER_FLUSH_INTERVAL if interval is None else interval
+    moved = 0
+    while True:
+        flushed = flush(batch_size)
+        moved += flushed
+        if should_stop():
+            return moved
+        if flushed < batch_size:
+            time.sleep(interval)
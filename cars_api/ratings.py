@@ -0,0 +1,47 @@
+from typing import Iterable, Optional
+
+from django.conf import settings
+
+
+def median(histogram: Iterable[int]) -> Optional[float]:
+    """Compute median rating from rating histogram, without reading rates.
+
+    Args:
+        histogram (Iterable[int]): Number of rates of ratings 1 to 5
+
+    Returns:
+        Optional[float]: Median rating (mean of two middle ratings for even number of rates), None if there are no
+        rates.
+    """
+    counts = list(histogram)
+    total = sum(counts)
+    if not total:
+        return None
+    # 1-based positions of middle rates, the same position twice for odd number of rates
+    middle = ((total + 1) // 2, total // 2 + 1)
+    values = []
+    seen = 0
+    for rating, count in enumerate(counts, start=1):
+        seen += count
+        while len(values) < 2 and middle[len(values)] <= seen:
+            values.append(rating)
+    return (values[0] + values[1]) / 2
+
+
+def bayesian_average(rating_sum: int, rates_count: int) -> float:
+    """Compute Bayesian average rating, pulled towards prior mean for cars with few rates.
+
+    Average is computed as if every car had additional RATING_PRIOR_WEIGHT rates of RATING_PRIOR_MEAN value, so
+    cars with a few high rates don't outrank cars with many good rates.
+
+    Args:
+        rating_sum (int): Sum of ratings
+        rates_count (int): Number of rates
+
+    Returns:
+        float: Bayesian average rating.
+    """
+    prior_weight = settings.RATING_PRIOR_WEIGHT
+    if not prior_weight + rates_count:
+        return settings.RATING_PRIOR_MEAN
+    return (settings.RATING_PRIOR_MEAN * prior_weight + rating_sum) / (prior_weight + rates_count)
@@ -0,0 +1,66 @@
+from typing import Any, Mapping, Optional
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSON renderer using orjson, with output identical to compact JSONRenderer output.
+
+    Meant for responses built from plain python types (dicts, lists, strings, numbers, None), e.g. projected car rows.
+    Data orjson can't handle (e.g. lazy translation strings), pretty printed (`indent`) and non default JSON settings
+    are rendered by JSONRenderer.
+    """
+
+    def render(
+        self, data: Any, accepted_media_type: Optional[str] = None, renderer_context: Optional[Mapping[str, Any]] = None
+    ) -> bytes:
+        """Overridden render method.
+
+        Args:
+            data (Any): Response data
+            accepted_media_type (Optional[str]): Accepted media type, may contain indent param
+            renderer_context (Optional[Mapping[str, Any]]): Renderer context
+
+        Returns:
+            bytes: Rendered JSON.
+        """
+        if data is None:
+            return b""
+        if self.ensure_ascii or not self.compact or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super(FastJSONRenderer, self).render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data)
+        except orjson.JSONEncodeError:
+            return super(FastJSONRenderer, self).render(data, accepted_media_type, renderer_context)
+        # Same as JSONRenderer, \u2028 and \u2029 are escaped to keep output a strict javascript subset
+        return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+
+
+class NDJSONRenderer(FastJSONRenderer):
+    """Newline-delimited JSON renderer, every list item is rendered as a separate line.
+
+    Large car lists are streamed by the view, this renderer handles regular (e.g. error) responses of the same
+    endpoint.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(
+        self, data: Any, accepted_media_type: Optional[str] = None, renderer_context: Optional[Mapping[str, Any]] = None
+    ) -> bytes:
+        """Overridden render method.
+
+        Args:
+            data (Any): Response data
+            accepted_media_type (Optional[str]): Accepted media type (indent param is not supported)
+            renderer_context (Optional[Mapping[str, Any]]): Renderer context
+
+        Returns:
+            bytes: Rendered lines.
+        """
+        if data is None:
+            return b""
+        items = data if isinstance(data, list) else [data]
+        return b"".join(super(NDJSONRenderer, self).render(item) + b"\n" for item in items)
@@ -0,0 +1,169 @@
+import heapq
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import islice
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Car, DataVersion
+from .serializers import CAR_ROW_FIELDS
+
+# Ranking of search results: field name and stored field it's ordered by
+ORDERINGS = {"rating": "-avg_rating", "popular": "-rates_count"}
+# Min number of characters of trigram index key
+NGRAM = 3
+
+_indexes: Dict[str, "MemoryIndex"] = {}
+_indexes_lock = threading.Lock()
+
+
+def normalize_query(query: str) -> str:
+    """Normalize search query, in the same way as car search names (see Car.build_search_name).
+
+    Args:
+        query (str): Search query
+
+    Returns:
+        str: Lower-cased query with single spaces.
+    """
+    return " ".join(query.split()).lower()
+
+
+def search_cars(query: str, order: str = "rating", limit: int = 10) -> List[Dict[str, Any]]:
+    """Find verified cars with make/model matching the query (case-insensitive prefix or substring).
+
+    Cars with search name starting with the query come first, then cars containing it elsewhere, best ranked first in
+    both groups. Substring matches need a query of at least NGRAM characters, shorter queries match only prefixes
+    (trigram index can't serve them). PostgreSQL uses btree index on search name for prefix matches (see migration
+    0004) and trigram index for the rest (see migration 0002), prefix query alone fills the limit for most type-ahead
+    queries. Other databases (e.g. SQLite used in development) use in-memory index of this process, rebuilt after data
+    changes at most every SEARCH_INDEX_MAX_AGE seconds.
+
+    Args:
+        query (str): Search query
+        order (str): Ranking, key of ORDERINGS
+        limit (int): Max number of results
+
+    Returns:
+        List[Dict[str, Any]]: Car rows (with CAR_ROW_FIELDS), in ranking order.
+    """
+    query = normalize_query(query)
+    ordering = ORDERINGS[order]
+    if connection.vendor == "postgresql":
+        cars = Car.objects.verified().order_by(ordering, "id").values(*CAR_ROW_FIELDS)
+        rows = list(cars.filter(search_name__startswith=query)[:limit])
+        if len(rows) < limit and len(query) >= NGRAM:
+            substring_matches = cars.filter(search_name__contains=query).exclude(search_name__startswith=query)
+            rows.extend(substring_matches[: limit - len(rows)])
+        return rows
+
+    ids = get_memory_index(order).search(query, limit)
+    # Index may be older than the last status change, so only cars still verified are returned
+    rows = {row["id"]: row for row in Car.objects.verified().filter(id__in=ids).values(*CAR_ROW_FIELDS)}
+    return [rows[pk] for pk in ids if pk in rows]
+
+
+def get_memory_index(order: str) -> "MemoryIndex":
+    """Get in-memory index of this process for given ranking, build it if it's missing or stale.
+
+    Index is reused as long as data version didn't change, or it's younger than SEARCH_INDEX_MAX_AGE.
+
+    Args:
+        order (str): Ranking, key of ORDERINGS
+
+    Returns:
+        MemoryIndex: Search index.
+    """
+    version, _ = DataVersion.get()
+    index = _indexes.get(order)
+    if index is not None and (index.version == version or time.monotonic() - index.built_at < index.max_age):
+        return index
+    with _indexes_lock:
+        index = _indexes.get(order)
+        if index is None or index.version != version:
+            index = _indexes[order] = MemoryIndex(ORDERINGS[order], version)
+    return index
+
+
+def clear_memory_indexes() -> None:
+    """Drop in-memory indexes of this process, they're rebuilt on the next search."""
+    with _indexes_lock:
+        _indexes.clear()
+
+
+class MemoryIndex:
+    """In-memory index of car search names, with cars in ranking order.
+
+    Search names are kept sorted as well, so cars with search name starting with the query are a contiguous range,
+    found by bisection. Common prefixes are matched against all cars in ranking order instead, which stops early after
+    `limit` matches. Remaining (substring) matches are found with trigram index: every trigram maps to ranking
+    positions of cars with that trigram in search name. Query is matched against cars of its rarest trigram, in ranking
+    order, so search stops after `limit` matches. Queries with very common trigrams are matched against all cars in
+    ranking order, which stops early as well. Queries shorter than a trigram match only prefixes, as on PostgreSQL.
+    """
+
+    # Share of all cars above which trigram or prefix is considered common
+    common_ratio = 0.1
+
+    def __init__(self, ordering: str, version: int) -> None:
+        """Init method of MemoryIndex class, loads cars from db.
+
+        Args:
+            ordering (str): Car ordering (stored field, with "-" prefix for descending order)
+            version (int): Data version the index is built for
+        """
+        self.version = version
+        self.built_at = time.monotonic()
+        self.max_age = settings.SEARCH_INDEX_MAX_AGE
+        self.ids: List[int] = []
+        self.names: List[str] = []
+        ngrams: Dict[str, array] = defaultdict(lambda: array("I"))
+        cars = Car.objects.verified().order_by(ordering, "id")
+        for position, (pk, name) in enumerate(cars.values_list("id", "search_name")):
+            self.ids.append(pk)
+            self.names.append(name)
+            for ngram in {name[i : i + NGRAM] for i in range(len(name) - NGRAM + 1)}:
+                ngrams[ngram].append(position)
+        self.ngrams = dict(ngrams)
+        by_name = sorted(range(len(self.names)), key=self.names.__getitem__)
+        self.sorted_names = [self.names[position] for position in by_name]
+        self.sorted_positions = array("I", by_name)
+
+    def search(self, query: str, limit: int) -> List[int]:
+        """Find ids of best ranked cars with search name starting with the query, then containing it elsewhere.
+
+        Args:
+            query (str): Normalized (non-empty) search query
+            limit (int): Max number of results
+
+        Returns:
+            List[int]: Car ids, prefix matches first (the only ones for queries shorter than NGRAM), in ranking order.
+        """
+        start = bisect_left(self.sorted_names, query)
+        end = bisect_left(self.sorted_names, query[:-1] + chr(ord(query[-1]) + 1), start)
+        if end - start < self.common_ratio * len(self.ids):
+            prefix_positions = heapq.nsmallest(limit, self.sorted_positions[start:end])
+        else:
+            matches = (position for position, name in enumerate(self.names) if name.startswith(query))
+            prefix_positions = list(islice(matches, limit))
+        found = [self.ids[position] for position in prefix_positions]
+        if len(found) == limit or len(query) < NGRAM:
+            return found
+
+        postings = [self.ngrams.get(query[i : i + NGRAM], ()) for i in range(len(query) - NGRAM + 1)]
+        positions: Any = min(postings, key=len)
+        if len(positions) >= self.common_ratio * len(self.ids):
+            positions = range(len(self.ids))
+
+        for position in positions:
+            name = self.names[position]
+            if query in name and not name.startswith(query):
+                found.append(self.ids[position])
+                if len(found) == limit:
+                    break
+        return found
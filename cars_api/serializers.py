@@ -1,7 +1,14 @@
+from typing import Any, Callable, Dict, Iterable, List, Sequence
+
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from rest_framework.validators import UniqueTogetherValidator
 
-from .models import Car, Rate
+from . import ratings
+from .models import HISTOGRAM_FIELDS, Car, Rate
+
+CAR_UNIQUE_ERROR = UniqueTogetherValidator.message.format(field_names="make, model")
 
 
 class DynamicFieldsModelSerializer(serializers.ModelSerializer):
@@ -31,8 +38,11 @@ class DynamicFieldsModelSerializer(serializers.ModelSerializer):
 class CarSerializer(DynamicFieldsModelSerializer):
     """Serializer for Car model."""
 
-    rates_number = serializers.IntegerField()
-    avg_rating = serializers.FloatField()
+    rates_number = serializers.IntegerField(source="rates_count", read_only=True)
+    avg_rating = serializers.FloatField(source="average_rating", read_only=True)
+    rating_histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+    median_rating = serializers.FloatField(read_only=True)
+    bayesian_avg_rating = serializers.FloatField(source="bayesian_average_rating", read_only=True)
 
     class Meta:
         """Meta class of CarSerializer.
@@ -41,8 +51,73 @@ class CarSerializer(DynamicFieldsModelSerializer):
         """
 
         model = Car
-        fields = ["id", "make", "model", "rates_number", "avg_rating"]
-        validators = [UniqueTogetherValidator(queryset=Car.objects.all(), fields=["make", "model"])]
+        fields = [
+            "id",
+            "make",
+            "model",
+            "rates_number",
+            "avg_rating",
+            "rating_histogram",
+            "median_rating",
+            "bayesian_avg_rating",
+            "status",
+        ]
+        # Status is set by verification only (see verification module)
+        read_only_fields = ["status"]
+        # Uniqueness of (make, model) pair is enforced by db constraint on insert (see create), without SELECT
+        validators = []
+
+    def create(self, validated_data: Dict[str, Any]) -> Car:
+        """Overridden create method, maps unique constraint violation to the same error as UniqueTogetherValidator.
+
+        Args:
+            validated_data (Dict[str, Any]): Validated car data
+
+        Raises:
+            ValidationError: Raised if car with the same make and model already exists
+
+        Returns:
+            Car: Created car.
+        """
+        try:
+            with transaction.atomic():
+                return super(CarSerializer, self).create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [CAR_UNIQUE_ERROR]}, code="unique")
+
+
+# Car columns fetched with values() by list endpoints, and representation of CarSerializer fields computed from them
+CAR_ROW_FIELDS = ("id", "make", "model", "rates_count", "rating_sum", "avg_rating", *HISTOGRAM_FIELDS.values())
+CAR_ROW_REPRESENTATION: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "id": lambda row: row["id"],
+    "make": lambda row: str(row["make"]),
+    "model": lambda row: str(row["model"]),
+    "rates_number": lambda row: row["rates_count"],
+    # Same as Car.average_rating, computed from stored sum and count
+    "avg_rating": lambda row: row["rating_sum"] / row["rates_count"] if row["rates_count"] else None,
+    "rating_histogram": lambda row: {str(rating): row[field] for rating, field in HISTOGRAM_FIELDS.items()},
+    "median_rating": lambda row: ratings.median(row[field] for field in HISTOGRAM_FIELDS.values()),
+    "bayesian_avg_rating": lambda row: ratings.bayesian_average(row["rating_sum"], row["rates_count"]),
+}
+# CarSerializer fields derived from rating histogram
+CAR_HISTOGRAM_FIELDS = ("rating_histogram", "median_rating", "bayesian_avg_rating")
+
+
+def car_rows_to_representation(rows: Iterable[Dict[str, Any]], fields: Sequence[str]) -> List[Dict[str, Any]]:
+    """Represent car rows fetched with `values(*CAR_ROW_FIELDS)`, without CarSerializer instances.
+
+    Output is the same as `CarSerializer(cars, fields=fields, many=True).data`, but it skips serializer copy and
+    field-by-field `to_representation`, which dominate CPU time of large lists.
+
+    Args:
+        rows (Iterable[Dict[str, Any]]): Car rows
+        fields (Sequence[str]): CarSerializer field names, in CarSerializer order
+
+    Returns:
+        List[Dict[str, Any]]: Represented cars.
+    """
+    getters = [(name, CAR_ROW_REPRESENTATION[name]) for name in fields]
+    return [{name: getter(row) for name, getter in getters} for row in rows]
 
 
 class RateSerializer(serializers.ModelSerializer):
@@ -64,5 +139,24 @@ class RateSerializer(serializers.ModelSerializer):
                     "min_value": "Rating has to be between 1 and 5.",
                 }
             },
-            "car_id": {"error_messages": {"does_not_exist": "Car record does not exist."}},
+            # Only verified cars can be rated, pending and rejected ones aren't listed anywhere
+            "car_id": {
+                "queryset": Car.objects.verified(),
+                "error_messages": {"does_not_exist": "Car record does not exist."},
+            },
         }
+
+
+class BulkRateSerializer(RateSerializer):
+    """Serializer for Rate model, used by bulk create.
+
+    Car existence is checked for a whole chunk of rates with a single query, instead of a query per rate.
+    """
+
+    car_id = serializers.IntegerField()
+
+    class Meta(RateSerializer.Meta):
+        """Meta class of BulkRateSerializer.
+
+        Same as RateSerializer Meta, car_id is validated as a plain integer.
+        """
@@ -0,0 +1,143 @@
+import codecs
+import json
+import re
+from itertools import islice
+from typing import IO, Any, Callable, Iterable, Iterator, List, Optional
+
+WHITESPACE = re.compile(r"\s*")
+# Scalar items (e.g. numbers) may be cut in the middle at the end of the buffer, they're complete if followed by these
+DELIMITER = re.compile(r"[\s,\]]")
+# Decode errors of an item cut at the end of the buffer are reported at most this many characters before the end (e.g.
+# "-Infini", "\ud83d\ude9"), or as unterminated string. Errors reported earlier can't be fixed by reading more data
+INCOMPLETE_ITEM_MARGIN = 16
+
+
+def iter_json_array(
+    stream: Optional[IO[bytes]], chunk_size: int = 64 * 1024, max_item_size: int = 1024 * 1024
+) -> Iterator[Any]:
+    """Iterate over items of a JSON array, reading the stream in chunks.
+
+    Only the currently parsed part of the array is kept in memory, so memory use doesn't depend on the array size.
+    Invalid item is reported as soon as it's buffered, and a single item can't take more than max_item_size.
+
+    Args:
+        stream (Optional[IO[bytes]]): Stream with JSON array
+        chunk_size (int): Number of bytes read from the stream at once
+        max_item_size (int): Max number of characters of a single item
+
+    Raises:
+        ValueError: An error occuring if stream doesn't contain valid JSON array, or an item is too large
+
+    Yields:
+        Any: Decoded array items.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer, position, eof = "", 0, stream is None
+    # One of: "start" (before "["), "first" (first item or "]"), "item", "separator" ("," or "]")
+    state = "start"
+
+    while True:
+        position = WHITESPACE.match(buffer, position).end()  # type: ignore
+        item_end = None
+        if position < len(buffer):
+            char = buffer[position]
+            if state == "start":
+                if char != "[":
+                    raise ValueError("Expected a JSON array")
+                position, state = position + 1, "first"
+                continue
+            if state == "separator" or (state == "first" and char == "]"):
+                if char == "]":
+                    return
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']' in JSON array, got '{char}'")
+                position, state = position + 1, "item"
+                continue
+            try:
+                item, item_end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                incomplete = e.pos + INCOMPLETE_ITEM_MARGIN >= len(buffer) or e.msg.startswith("Unterminated string")
+                if eof or not incomplete:
+                    raise ValueError(f"Invalid JSON: {e.msg}")
+            if item_end is not None and (eof or char in '{["' or DELIMITER.match(buffer, item_end)):
+                yield item
+                position, state = item_end, "separator"
+                continue
+
+        if eof:
+            raise ValueError("Unexpected end of JSON array")
+        if len(buffer) - position > max_item_size:
+            raise ValueError(f"JSON array item longer than {max_item_size} characters")
+        data = stream.read(chunk_size)  # type: ignore
+        eof = not data
+        buffer, position = buffer[position:] + text_decoder.decode(data, final=eof), 0
+
+
+def iter_ndjson(stream: Optional[IO[bytes]]) -> Iterator[bytes]:
+    """Iterate over non empty lines of newline-delimited JSON stream.
+
+    Lines are not decoded, so that invalid line can be reported without stopping the iteration.
+
+    Args:
+        stream (Optional[IO[bytes]]): Stream with newline-delimited JSON
+
+    Yields:
+        bytes: Stream lines.
+    """
+    if stream is None:
+        return
+    for line in iter(stream.readline, b""):
+        if line.strip():
+            yield line
+
+
+def iter_chunks(items: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    """Split iterable into lists of at most chunk_size items, consuming it lazily.
+
+    Args:
+        items (Iterable[Any]): Items to split
+        chunk_size (int): Max number of items in a chunk
+
+    Yields:
+        List[Any]: Chunks of items.
+    """
+    iterator = iter(items)
+    chunk = list(islice(iterator, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, chunk_size))
+
+
+def iter_rendered_json_array(chunks: Iterable[List[Any]], render: Callable[[Any], bytes]) -> Iterator[bytes]:
+    """Render JSON array incrementally, one chunk of items at a time.
+
+    Output is the same as compact rendering of the whole list at once, but only one chunk is kept in memory.
+
+    Args:
+        chunks (Iterable[List[Any]]): Chunks of array items
+        render (Callable[[Any], bytes]): Function rendering a list to compact JSON
+
+    Yields:
+        bytes: Parts of rendered array.
+    """
+    separator = b"["
+    for chunk in chunks:
+        # Rendered chunk is "[item,...]", without brackets it's a part of the whole array
+        yield separator + render(chunk)[1:-1]
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
+
+
+def iter_rendered_ndjson(chunks: Iterable[List[Any]], render: Callable[[Any], bytes]) -> Iterator[bytes]:
+    """Render newline-delimited JSON incrementally, one chunk of items at a time.
+
+    Args:
+        chunks (Iterable[List[Any]]): Chunks of items
+        render (Callable[[Any], bytes]): Function rendering a single item to compact JSON
+
+    Yields:
+        bytes: Rendered lines of a chunk.
+    """
+    for chunk in chunks:
+        yield b"".join(render(item) + b"\n" for item in chunk)
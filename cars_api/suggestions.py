@@ -0,0 +1,167 @@
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Callable, Dict, Hashable, Iterable, List, Set
+
+from .external_api_cache import normalize_make
+
+# Max number of makes with trigram index kept in memory of a process (least recently used ones are dropped)
+MAX_INDEXES = 1000
+# Min Dice similarity of trigram sets of query and suggested model name
+MIN_SIMILARITY = 0.3
+# Max number of suggestions for an unmatched model
+MAX_SUGGESTIONS = 3
+
+_indexes: "OrderedDict[str, ModelNamesIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def normalize_name(name: str) -> str:
+    """Normalize model name or query, so they're compared case-insensitively and regardless of whitespace.
+
+    Args:
+        name (str): Model name or query
+
+    Returns:
+        str: Lower-cased name with single spaces.
+    """
+    return " ".join(name.split()).lower()
+
+
+def trigrams(name: str) -> Set[str]:
+    """Split normalized name into trigrams, padded as in PostgreSQL pg_trgm (so short names have trigrams too).
+
+    Args:
+        name (str): Normalized (lower-cased, stripped) name
+
+    Returns:
+        Set[str]: Trigrams of the name.
+    """
+    padded = f"  {name} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def get_index(car_make: str, version: Hashable, model_names: Callable[[], Iterable[str]]) -> "ModelNamesIndex":
+    """Get trigram index of model names of a make, build it if it's missing or built for another version of names.
+
+    Index is kept per make and version of its model names (e.g. id and expiry of cache entry, see
+    external_api_cache.get_entry_version), so following requests reuse it without reading or comparing model names.
+    Names are loaded only when index is built.
+
+    Args:
+        car_make (str): Car make string
+        version (Hashable): Version of model names of the make, changed whenever the names change
+        model_names (Callable[[], Iterable[str]]): Function returning model names of the make (from cache, catalogue
+            or external api)
+
+    Returns:
+        ModelNamesIndex: Index of model names.
+    """
+    make_key = normalize_make(car_make)
+    with _indexes_lock:
+        index = _indexes.get(make_key)
+        if index is not None and index.version == version:
+            _indexes.move_to_end(make_key)
+            return index
+    index = ModelNamesIndex(model_names(), version)
+    with _indexes_lock:
+        _indexes[make_key] = index
+        _indexes.move_to_end(make_key)
+        if len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def suggest_models(
+    car_make: str,
+    car_model: str,
+    version: Hashable,
+    model_names: Callable[[], Iterable[str]],
+    limit: int = MAX_SUGGESTIONS,
+) -> List[str]:
+    """Find model names of a make closest to an unmatched model ("did you mean").
+
+    Trigram index of model names is built once per make and version of its names (see get_index), so a suggestion
+    costs a few dict lookups per query trigram, instead of comparing query with every model name.
+
+    Args:
+        car_make (str): Car make string
+        car_model (str): Unmatched car model string
+        version (Hashable): Version of model names of the make
+        model_names (Callable[[], Iterable[str]]): Function returning model names of the make
+        limit (int): Max number of suggestions
+
+    Returns:
+        List[str]: Model names in their original casing, the most similar first.
+    """
+    return get_index(car_make, version, model_names).suggest(car_model, limit)
+
+
+def clear_indexes() -> None:
+    """Drop trigram indexes of this process, they're rebuilt on the next suggestion."""
+    with _indexes_lock:
+        _indexes.clear()
+
+
+class ModelNamesIndex:
+    """Trigram index of model names of a single make.
+
+    Names are indexed normalized (see normalize_name), and mapped back to their original casing in results. Every
+    trigram maps to positions of normalized names containing it. Names are ranked by Dice similarity of their trigram
+    sets and the query's, counted only for names sharing at least one trigram with the query.
+    """
+
+    def __init__(self, names: Iterable[str], version: Hashable = None) -> None:
+        """Init method of ModelNamesIndex class.
+
+        Args:
+            names (Iterable[str]): Model names
+            version (Hashable): Version of model names the index is built for
+        """
+        self.version = version
+        self.original_names: Dict[str, str] = {}
+        for name in sorted(names):
+            self.original_names.setdefault(normalize_name(name), name)
+        self.sorted_names = sorted(self.original_names)
+        self.sizes: List[int] = []
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        for position, name in enumerate(self.sorted_names):
+            name_trigrams = trigrams(name)
+            self.sizes.append(len(name_trigrams))
+            for trigram in name_trigrams:
+                self.postings[trigram].append(position)
+        self.postings = dict(self.postings)
+
+    def __contains__(self, name: str) -> bool:
+        """Check if model name is indexed, case-insensitively.
+
+        Args:
+            name (str): Model name
+
+        Returns:
+            bool: True if the name is one of indexed names.
+        """
+        return normalize_name(name) in self.original_names
+
+    def suggest(self, query: str, limit: int) -> List[str]:
+        """Find names most similar to the query.
+
+        Args:
+            query (str): Model name
+            limit (int): Max number of results
+
+        Returns:
+            List[str]: Original names with similarity of at least MIN_SIMILARITY, the most similar first (ties
+                alphabetically).
+        """
+        query_trigrams = trigrams(normalize_name(query))
+        shared: Dict[int, int] = defaultdict(int)
+        for trigram in query_trigrams:
+            for position in self.postings.get(trigram, ()):
+                shared[position] += 1
+        scored = []
+        for position, count in shared.items():
+            similarity = 2 * count / (len(query_trigrams) + self.sizes[position])
+            if similarity >= MIN_SIMILARITY:
+                scored.append((-similarity, position))
+        scored.sort()
+        return [self.original_names[self.sorted_names[position]] for _, position in scored[:limit]]
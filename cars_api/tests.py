@@ -1,14 +1,42 @@
+import asyncio
+import json
+import threading
+import time
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest.mock import AsyncMock
 
+import httpx
 import pytest
+from prometheus_client import REGISTRY
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from pytest_mock import MockerFixture
+from requests.exceptions import ConnectionError as RequestsConnectionError
 from requests.exceptions import RequestException
 from rest_framework import status
 from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
 from rest_framework.test import APIRequestFactory
 
-from cars_api.external_api import external_api_call
-from cars_api.models import Car, Rate
+from cars_api import db_router, external_api_cache, models, ratings, search, suggestions, vehicle_catalogue
+from cars_api.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from cars_api.external_api import (NoMatchingModelError, async_external_api_call, external_api_call, get_breaker,
+                                   get_model_names, get_session)
+from cars_api.models import (STATUS_REJECTED, Car, CarVerificationJob, DailyRates, DataVersion, ExternalApiCache,
+                             PendingRate, Rate, VehicleCatalogue)
+from cars_api.pagination import AvgRatingPagination, RatePagination, RatesNumberPagination
+from cars_api.serializers import CAR_UNIQUE_ERROR, CarSerializer
+from cars_api.streaming import iter_json_array
+from cars_api.views import BulkCreateCarGenerics, ListCarGenerics
 
 """######### AUX #########"""
 
@@ -105,6 +133,15 @@ def mock_external_api_call_raise_request_exception(request, car_model, car_make)
     raise RequestException("")
 
 
+def async_post(path, data):
+    """Post JSON data with async test client, from sync test."""
+
+    async def post():  # type: ignore
+        return await AsyncClient().post(path, data, content_type="application/json")
+
+    return async_to_sync(post)()
+
+
 """######### Views Tests #########"""
 
 
@@ -154,6 +191,45 @@ def test_post_cars_endpoint_negative_case_duplicate_car_records(positive_respons
     assert len(Car.objects.all()) == 1
 
 
+@add_marks("negative_case", "post", "cars_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_post_cars_endpoint_negative_case_duplicate_detected_by_constraint(positive_response_from_external_api, client):
+    Car.objects.create(make="Honda", model="Pilot")
+    # duplicate is detected on insert, differently cased pair is the same car
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post("/cars/", {"make": "HONDA", "model": "pilot"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data == {"non_field_errors": ["The fields make, model must make a unique set."]}
+    assert response.data["non_field_errors"][0].code == "unique"
+    assert not [query for query in queries if query["sql"].startswith("SELECT")]
+    with pytest.raises(IntegrityError), transaction.atomic():
+        Car.objects.create(make="honda", model="PILOT")
+
+
+@add_marks("positive_case", "post", "cars_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_post_cars_endpoint_resubmit_rejected_car(mocker, positive_response_from_external_api, client):
+    Car.objects.create(make="Honda", model="Pilot", status=STATUS_REJECTED)
+    Car.objects.create(make="Honda", model="Civic", status=STATUS_REJECTED)
+    # rejected pair can be submitted again, one by one and in bulk
+    response = client.post("/cars/", {"make": "HONDA", "model": "pilot"})
+    assert response.status_code == status.HTTP_200_OK
+    mocker.patch("cars_api.views.get_model_names", return_value=frozenset({"civic", "pilot"}))
+    data = [{"make": "Honda", "model": "Civic"}, {"make": "Honda", "model": "Pilot"}]
+    response = client.post("/cars/bulk/", data, content_type="application/json")
+    assert response.data["created"] == 1
+    assert response.data["results"][1]["errors"] == {"non_field_errors": [CAR_UNIQUE_ERROR]}
+    assert list(Car.objects.order_by("id").values_list("id", "model", "status")) == [
+        (1, "Pilot", "rejected"),
+        (2, "Civic", "rejected"),
+        (3, "Pilot", "verified"),
+        (4, "Civic", "verified"),
+    ]
+    # the pair is held again once it isn't rejected
+    response = client.post("/cars/", {"make": "Honda", "model": "Pilot"})
+    assert response.data == {"non_field_errors": [CAR_UNIQUE_ERROR]}
+
+
 @add_marks("negative_case", "post", "cars_endpoint")
 @pytest.mark.django_db(reset_sequences=True)
 def test_post_cars_endpoint_negative_case_missing_model(positive_response_from_external_api, client):
@@ -245,14 +321,14 @@ def test_post_cars_endpoint_negative_case_external_request_exception(mocker, cli
 def test_get_cars_endpoint_positive_case_multiple_car_records(db_with_multiple_car_records, client):
     # get list of cars
     expected_response = [
-        {"id": 2, "make": "Civic", "model": "Honda", "avg_rating": None},
         {"id": 1, "make": "Accord", "model": "Honda", "avg_rating": None},
+        {"id": 2, "make": "Civic", "model": "Honda", "avg_rating": None},
         {"id": 3, "make": "Pilot", "model": "Honda", "avg_rating": None},
     ]
     response = client.get("/cars/")
     # validate results
     assert response.status_code == status.HTTP_200_OK
-    assert response.data == expected_response
+    assert response.data["results"] == expected_response
     assert len(Car.objects.all()) == 3
 
 
@@ -264,7 +340,7 @@ def test_get_cars_endpoint_positive_case_no_cars(client):
     response = client.get("/cars/")
     # validate results
     assert response.status_code == status.HTTP_200_OK
-    assert response.data == expected_response
+    assert response.data["results"] == expected_response
     assert len(Car.objects.all()) == 0
 
 
@@ -273,15 +349,15 @@ def test_get_cars_endpoint_positive_case_no_cars(client):
 def test_delete_cars_endpoint_positive_case(db_with_multiple_car_records, client):
     # get list of cars
     expected_response = [
-        {"id": 2, "make": "Civic", "model": "Honda", "avg_rating": None},
         {"id": 1, "make": "Accord", "model": "Honda", "avg_rating": None},
+        {"id": 2, "make": "Civic", "model": "Honda", "avg_rating": None},
         {"id": 3, "make": "Pilot", "model": "Honda", "avg_rating": None},
     ]
     response = client.get("/cars/")
     # validate results, 3 cars in db
     assert response.status_code == status.HTTP_200_OK
     assert len(Car.objects.all()) == 3
-    assert response.data == expected_response
+    assert response.data["results"] == expected_response
     assert Car.objects.get(pk=1) is not None
 
     # remove car with pk=1
@@ -296,7 +372,171 @@ def test_delete_cars_endpoint_positive_case(db_with_multiple_car_records, client
         {"id": 3, "make": "Pilot", "model": "Honda", "avg_rating": None},
     ]
     response = client.get("/cars/")
-    assert response.data == expected_response
+    assert response.data["results"] == expected_response
+
+
+@add_marks("positive_case", "post", "cars_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_post_cars_bulk_endpoint_per_item_status(mocker, client):
+    Car.objects.create(make="Honda", model="Civic")
+    get_model_names_mock = mocker.patch(
+        "cars_api.views.get_model_names",
+        side_effect=lambda request, car_make, car_models: {"honda": frozenset({"civic", "pilot", "accord"})}.get(
+            car_make.lower(), frozenset()
+        ),
+    )
+    data = [
+        {"make": "Honda", "model": "Pilot"},
+        {"make": "honda", "model": "Accord"},
+        {"make": "Honda", "model": "Civic"},
+        {"make": "Honda", "model": "Jazz"},
+        {"make": "Hondda", "model": "Civic"},
+        {"make": "Honda"},
+        {"make": "HONDA", "model": "pilot"},
+    ]
+    response = client.post("/cars/bulk/", data, content_type="application/json")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["created"] == 2
+    assert response.data["results"] == [
+        {"status": "created", "make": "Honda", "model": "Pilot"},
+        {"status": "created", "make": "honda", "model": "Accord"},
+        {"status": "error", "errors": {"non_field_errors": ["The fields make, model must make a unique set."]}},
+        {"status": "error", "errors": {"external_api_error": "No matching result in external api for Honda Jazz"}},
+        {"status": "error", "errors": {"external_api_error": "No matching result in external api for Hondda Civic"}},
+        {"status": "error", "errors": {"model": ["This field is required."]}},
+        {"status": "error", "errors": {"non_field_errors": ["The fields make, model must make a unique set."]}},
+    ]
+    # single external api call per make
+    assert get_model_names_mock.call_count == 2
+    assert sorted(Car.objects.values_list("make", "model")) == [
+        ("Honda", "Accord"),
+        ("Honda", "Civic"),
+        ("Honda", "Pilot"),
+    ]
+
+
+@add_marks("negative_case", "post", "cars_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_post_cars_bulk_endpoint_negative_case_concurrent_duplicate(mocker, client):
+    mocker.patch("cars_api.views.get_model_names", return_value=frozenset({"civic", "pilot"}))
+    check_unique = BulkCreateCarGenerics._check_unique
+
+    def racing_check_unique(self, valid, results):  # type: ignore
+        check_unique(self, valid, results)
+        # concurrent request inserts one of the cars after the check
+        Car.objects.create(make="Honda", model="Civic")
+
+    mocker.patch.object(BulkCreateCarGenerics, "_check_unique", racing_check_unique)
+    data = [{"make": "Honda", "model": "Pilot"}, {"make": "Honda", "model": "Civic"}]
+    response = client.post("/cars/bulk/", data, content_type="application/json")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {
+        "created": 1,
+        "results": [
+            {"status": "created", "make": "Honda", "model": "Pilot"},
+            {"status": "error", "errors": {"non_field_errors": ["The fields make, model must make a unique set."]}},
+        ],
+    }
+    assert sorted(Car.objects.values_list("model", flat=True)) == ["Civic", "Pilot"]
+
+
+@add_marks("negative_case", "post", "cars_endpoint", "external_api")
+@pytest.mark.django_db(reset_sequences=True)
+def test_post_cars_bulk_endpoint_negative_case_external_api_errors(mocker, client):
+    mocker.patch("cars_api.views.get_model_names", side_effect=ConnectionError("External api error or API unavailable"))
+    data = [{"make": "Honda", "model": "Civic"}]
+    response = client.post("/cars/bulk/", data, content_type="application/json")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {
+        "created": 0,
+        "results": [{"status": "error", "errors": {"external_api_error": "External api error or API unavailable"}}],
+    }
+
+    mocker.patch("cars_api.views.get_model_names", side_effect=AttributeError("Wrong request method"))
+    response = client.post("/cars/bulk/", data, content_type="application/json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data == {"external_api_error": "Wrong request method"}
+
+    response = client.post("/cars/bulk/", {"make": "Honda"}, content_type="application/json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data == {"validation_error": "Expected a list of cars"}
+    assert Car.objects.count() == 0
+
+
+@add_marks("positive_case", "post", "cars_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_post_cars_async_endpoint_positive_case(mocker):
+    mocker.patch("cars_api.async_views.async_external_api_call", new=AsyncMock(return_value=[]))
+    data = {"make": "Honda", "model": "Pilot"}
+    response = async_post("/cars/async/", data)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == data
+    # duplicate car
+    response = async_post("/cars/async/", data)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {"non_field_errors": ["The fields make, model must make a unique set."]}
+    assert Car.objects.count() == 1
+
+
+@add_marks("negative_case", "post", "cars_endpoint", "external_api")
+@pytest.mark.django_db(reset_sequences=True)
+def test_post_cars_async_endpoint_negative_case_external_api_errors(mocker):
+    data = {"make": "Honda", "model": "Civic"}
+    for error, status_code in [
+        (mock_external_api_call_raise_value_error, status.HTTP_404_NOT_FOUND),
+        (mock_external_api_call_raise_attribute_error, status.HTTP_400_BAD_REQUEST),
+        (mock_external_api_call_raise_connection_error, status.HTTP_500_INTERNAL_SERVER_ERROR),
+        (mock_external_api_call_raise_request_exception, status.HTTP_500_INTERNAL_SERVER_ERROR),
+    ]:
+        mocker.patch("cars_api.async_views.async_external_api_call", new=AsyncMock(side_effect=error))
+        response = async_post("/cars/async/", data)
+        assert response.status_code == status_code
+        assert list(response.json()) == ["external_api_error"]
+    assert Car.objects.count() == 0
+
+
+@add_marks("positive_case", "post", "cars_endpoint", "external_api")
+@pytest.mark.django_db(reset_sequences=True)
+def test_post_cars_endpoint_queued_verification(mocker, monkeypatch, settings, client):
+    settings.CAR_VERIFICATION_MODE = "queued"
+    settings.CAR_VERIFICATION_RETRY_DELAY = 5
+    monkeypatch.setenv("EXTERNAL_API_URL", "https://vpic.test/api")
+    responses = {
+        "honda": MockResponse(json_data={"Results": [{"Model_Name": "Civic"}]}, status_code=status.HTTP_200_OK),
+        "hondda": MockResponse(json_data={}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE),
+    }
+    get_mock = mocker.patch(
+        "cars_api.external_api.requests.Session.get",
+        side_effect=lambda url, **kwargs: responses[url.split("/")[-1].split("?")[0]],
+    )
+    # cars are accepted as pending, without external api call
+    for index, (car_make, car_model) in enumerate([("Honda", "Civic"), ("honda", "Pilot"), ("Hondda", "Civic")]):
+        response = client.post("/cars/", {"make": car_make, "model": car_model})
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data == {"id": index + 1, "make": car_make, "model": car_model, "status": "pending"}
+    assert get_mock.call_count == 0
+    assert client.get("/cars/").data["results"] == []
+    assert client.get("/popular/").data["results"] == []
+    assert client.post("/rate/", {"car_id": 1, "rating": 5}).status_code == status.HTTP_400_BAD_REQUEST
+
+    # one lookup per make, cars of unavailable make wait for a retry
+    out = StringIO()
+    call_command("verify_cars", "--once", stdout=out)
+    assert out.getvalue().strip() == "Verified 1, rejected 1, retried 1 cars."
+    assert get_mock.call_count == 2
+    assert [car["model"] for car in client.get("/cars/").data["results"]] == ["Civic"]
+    assert client.get("/cars/2/").data["status"] == "rejected"
+    job = CarVerificationJob.objects.get()
+    assert (job.car_id_id, job.attempts, job.last_error) == (3, 1, "External api error or API unavailable")
+    assert job.available_at > timezone.now() + timedelta(seconds=4)
+
+    # retried job is verified once external api is back
+    responses["hondda"] = MockResponse(json_data={"Results": [{"Model_Name": "CIVIC"}]}, status_code=status.HTTP_200_OK)
+    CarVerificationJob.objects.update(available_at=timezone.now())
+    call_command("verify_cars", "--once", stdout=out)
+    assert CarVerificationJob.objects.count() == 0
+    assert [car["make"] for car in client.get("/cars/").data["results"]] == ["Honda", "Hondda"]
+    assert client.post("/rate/", {"car_id": 3, "rating": 5}).status_code == status.HTTP_201_CREATED
 
 
 @add_marks("negative_case", "del", "cars_endpoint")
@@ -327,7 +567,7 @@ def test_post_rate_endpoint_positive_case(client, db_with_single_car_record):
     ]
     response = client.get("/cars/")
     assert response.status_code == status.HTTP_200_OK
-    assert response.data == expected_response
+    assert response.data["results"] == expected_response
 
     # add another rating to car
     expected_response = {"car_id": 1, "rating": 4}
@@ -341,7 +581,30 @@ def test_post_rate_endpoint_positive_case(client, db_with_single_car_record):
     ]
     response = client.get("/cars/")
     assert response.status_code == status.HTTP_200_OK
-    assert response.data == expected_response
+    assert response.data["results"] == expected_response
+
+
+@add_marks("positive_case", "post", "rate_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_post_rate_endpoint_writes_rate_car_and_daily_bucket_once(client, db_with_single_car_record):
+    # the same statements whether daily bucket is missing or not: car aggregates and histogram in a single UPDATE,
+    # daily bucket upserted, data version bumped after commit
+    for rating in (5, 4):
+        with CaptureQueriesContext(connection) as queries:
+            assert client.post("/rate/", {"car_id": 1, "rating": rating}).status_code == status.HTTP_201_CREATED
+        tables = [(query["sql"].split()[0], query["sql"].partition('"')[2].partition('"')[0]) for query in queries]
+        assert tables == [
+            ("SELECT", "cars_api_car"),
+            ("BEGIN", ""),
+            ("INSERT", "cars_api_rate"),
+            ("UPDATE", "cars_api_car"),
+            ("INSERT", "cars_api_dailyrates"),
+            ("UPDATE", "cars_api_dataversion"),
+        ]
+        assert "ON CONFLICT" in queries[4]["sql"]
+    car = Car.objects.get()
+    assert (car.rates_count, car.rating_sum, car.rating_4_count, car.rating_5_count) == (2, 9, 1, 1)
+    assert list(DailyRates.objects.values_list("rates_count", flat=True)) == [2]
 
 
 @add_marks("negative_case", "post", "rate_endpoint")
@@ -394,6 +657,135 @@ def test_post_rate_endpoint_negative_case_no_car_id_param(client):
     assert response.data == expected_response
 
 
+@add_marks("positive_case", "post", "rate_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_post_rate_bulk_endpoint_json_array(mocker, client, db_with_multiple_car_records):
+    mocker.patch("cars_api.views.BulkCreateRateGenerics.chunk_size", 2)
+    data = [
+        {"car_id": 1, "rating": 5},
+        {"car_id": 4, "rating": 3},
+        {"car_id": 1, "rating": 3},
+        {"car_id": 2, "rating": 7},
+        {"car_id": 2, "rating": 2},
+    ]
+    response = client.post("/rate/bulk/", data, content_type="application/json")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {
+        "created": 3,
+        "error_count": 2,
+        "errors": [
+            {"index": 1, "errors": {"car_id": ["Car record does not exist."]}},
+            {"index": 3, "errors": {"rating": ["Rating has to be between 1 and 5."]}},
+        ],
+    }
+    assert list(Car.objects.order_by("id").values_list("rates_count", "rating_sum", "avg_rating")) == [
+        (2, 8, 4.0),
+        (1, 2, 2.0),
+        (0, 0, 0.0),
+    ]
+
+
+@add_marks("negative_case", "post", "rate_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_post_rate_bulk_endpoint_ndjson_invalid_lines(client, db_with_single_car_record):
+    data = '{"car_id": 1, "rating": 5}\n{"car_id": 1, \n\n{"car_id": 1}\n{"car_id": 1, "rating": 1}\n'
+    response = client.post("/rate/bulk/", data, content_type="application/x-ndjson")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["created"] == 2
+    assert [error["index"] for error in response.data["errors"]] == [1, 2]
+    assert response.data["errors"][1]["errors"] == {"rating": ["This field is required."]}
+    assert Car.objects.get(pk=1).rates_count == 2
+
+    # malformed JSON array, rates before the error are still created
+    response = client.post("/rate/bulk/", '[{"car_id": 1, "rating": 4}, {"car_id"', content_type="application/json")
+    assert response.data == {
+        "created": 1,
+        "error_count": 1,
+        "errors": [{"index": 1, "errors": {"non_field_errors": ["Invalid JSON: Expecting ':' delimiter"]}}],
+    }
+
+
+@add_marks("negative_case", "post", "rate_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_post_rate_bulk_endpoint_reports_first_errors_and_counts_all(mocker, client, db_with_single_car_record):
+    mocker.patch("cars_api.views.BulkCreateRateGenerics.chunk_size", 3)
+    mocker.patch("cars_api.views.BulkCreateRateGenerics.max_reported_errors", 2)
+    lines = ['{"car_id": 1, "rating": 9}'] * 6 + ['{"car_id": 1, "rating": 4}', "{"] * 2
+    response = client.post("/rate/bulk/", "\n".join(lines), content_type="application/x-ndjson")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["created"] == 2
+    assert response.data["error_count"] == 8
+    assert [error["index"] for error in response.data["errors"]] == [0, 1]
+
+
+@add_marks("positive_case", "get", "rate_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_get_car_rates_endpoint_constant_number_of_queries(client, db_with_multiple_car_and_rating_records):
+    Rate.objects.bulk_create([Rate(car_id_id=3, rating=1 + i % 5) for i in range(200)])
+    # all pages of a car, newest rates first
+    ids = []
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/cars/3/rates/", {"page_size": 100})
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            ids += [rate["id"] for rate in response.data["results"]]
+            if response.data["next"] is None:
+                break
+            response = client.get(response.data["next"])
+    assert ids == sorted(Rate.objects.filter(car_id=3).values_list("id", flat=True), reverse=True)
+    # 3 pages, car existence check and page query for each one
+    assert len(queries) == 6
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/cars/3/rates/", {"paginate": "false"})
+    assert len(response.data) == 203
+    assert response.data[-1] == {"id": 4, "rating": 4}
+    assert len(queries) == 2
+    response = client.get("/cars/100/rates/")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.data == {"validation_error": "Record doesn't exist"}
+
+
+@add_marks("positive_case", "get", "rate_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_get_rate_endpoint_positive_case(client, db_with_multiple_car_and_rating_records):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/rate/", {"page_size": 2})
+    assert len(queries) == 1
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"] == [
+        {"id": 6, "car_id": 3, "rating": 5, "make": "Pilot", "model": "Honda"},
+        {"id": 5, "car_id": 3, "rating": 4, "make": "Pilot", "model": "Honda"},
+    ]
+    response = client.get(response.data["next"])
+    assert [rate["id"] for rate in response.data["results"]] == [4, 3]
+
+
+@add_marks("positive_case", "post", "rate_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_post_rate_endpoint_buffered_ingestion(mocker, settings, client, db_with_multiple_car_and_rating_records):
+    settings.RATE_INGESTION_MODE = "buffered"
+    for rating in (5, 4, 3):
+        response = client.post("/rate/", {"car_id": 1, "rating": rating})
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data == {"car_id": 1, "rating": rating}
+    response = client.post("/rate/", {"car_id": 1, "rating": 6})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    # accepted rates are buffered, aggregates don't change until flush
+    assert PendingRate.objects.count() == 3
+    assert Car.objects.get(pk=1).rates_count == 1
+    # failed flush is rolled back, rates stay in the buffer
+    mocker.patch.object(Car.objects, "apply_rating_deltas", side_effect=RuntimeError)
+    with pytest.raises(RuntimeError):
+        call_command("flush_rate_buffer", "--once")
+    assert (PendingRate.objects.count(), Rate.objects.filter(car_id=1).count()) == (3, 1)
+    mocker.stopall()
+    out = StringIO()
+    call_command("flush_rate_buffer", "--once", "--batch-size", "2", stdout=out)
+    assert out.getvalue().strip() == "Moved 3 buffered rates."
+    car = Car.objects.get(pk=1)
+    assert (PendingRate.objects.count(), car.rates_count, car.rating_sum) == (0, 4, 13)
+
+
 @add_marks("positive_case", "get", "popular_endpoint")
 @pytest.mark.django_db(reset_sequences=True)
 def test_get_popular_endpoint_positive_case(client, db_with_multiple_car_and_rating_records):
@@ -406,7 +798,505 @@ def test_get_popular_endpoint_positive_case(client, db_with_multiple_car_and_rat
     response = client.get("/popular/")
     # validate results
     assert response.status_code == status.HTTP_200_OK
-    assert response.data == expected_response
+    assert response.data["results"] == expected_response
+
+
+@add_marks("positive_case", "get", "cars_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_get_cars_endpoint_positive_case_ordered_by_stored_avg_rating(client, db_with_multiple_car_and_rating_records):
+    # get list of cars
+    expected_response = [
+        {"id": 3, "make": "Pilot", "model": "Honda", "avg_rating": 13 / 3},
+        {"id": 2, "make": "Civic", "model": "Honda", "avg_rating": 2.5},
+        {"id": 1, "make": "Accord", "model": "Honda", "avg_rating": 1.0},
+    ]
+    response = client.get("/cars/")
+    # validate results
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"] == expected_response
+
+
+@add_marks("positive_case", "get", "cars_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_get_car_detail_endpoint_with_rating_histogram(client, db_with_multiple_car_and_rating_records):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/cars/3/")
+    assert len(queries) == 1
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {
+        "id": 3,
+        "make": "Pilot",
+        "model": "Honda",
+        "rates_number": 3,
+        "avg_rating": 13 / 3,
+        "rating_histogram": {"1": 0, "2": 0, "3": 0, "4": 2, "5": 1},
+        "median_rating": 4.0,
+        "bayesian_avg_rating": 43 / 13,
+        "status": "verified",
+    }
+    # same values in /cars/ list, on request
+    detail = response.data
+    response = client.get("/cars/", {"histogram": "1"})
+    assert response.data["results"][0] == {
+        key: value for key, value in detail.items() if key not in ("rates_number", "status")
+    }
+    response = client.get("/cars/100/")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.data == {"validation_error": "Record doesn't exist"}
+
+
+@add_marks("positive_case", "get", "cars_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_get_cars_search_endpoint_prefix_and_substring(client, db_with_multiple_car_and_rating_records):
+    Car.objects.bulk_create([Car(model="Toyota", make="Corolla")])
+    search.clear_memory_indexes()
+
+    def found(**params):
+        response = client.get("/cars/search/", params)
+        assert response.status_code == status.HTTP_200_OK
+        return [car["id"] for car in response.data]
+
+    assert found(q="hon") == [3, 2, 1]
+    assert found(q="IVI") == [2]
+    assert found(q="  civic   HONDA ") == [2]
+    # prefix matches ("corolla toyota") come before substring matches ("accord honda")
+    assert found(q="cor") == [4, 1]
+    assert found(q="cor", limit=1) == [4]
+    # queries shorter than a trigram match only prefixes
+    assert found(q="a") == [1]
+    assert found(q="ord") == [1]
+    assert found(q="hon", order="popular", limit=2) == [3, 2]
+    assert found(q="xyz") == []
+    # car rejected after index was built isn't returned
+    Car.objects.filter(pk=2).update(status=STATUS_REJECTED)
+    assert found(q="hon") == [3, 1]
+    response = client.get("/cars/search/", {"q": "hon"})
+    assert response.data[0] == {"id": 3, "make": "Pilot", "model": "Honda", "rates_number": 3, "avg_rating": 13 / 3}
+    for params in ({}, {"q": "hon", "order": "name"}, {"q": "hon", "limit": "0"}):
+        assert client.get("/cars/search/", params).status_code == status.HTTP_400_BAD_REQUEST
+
+
+@add_marks("positive_case", "get", "cars_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_search_memory_index_prefix_range_and_ranking_scan_agree(mocker: MockerFixture):
+    Car.objects.bulk_create(
+        [Car(make=f"Make{i}", model=f"Model{i}", avg_rating=i % 7, rates_count=1) for i in range(50)]
+        + [Car(make="Camry", model="Make")]
+    )
+    index = search.MemoryIndex(search.ORDERINGS["rating"], 0)
+    queries = ("make", "make1", "make12", "ake1", "m", "camry make", "xyz")
+    # common prefixes are matched by scan in ranking order, the rest by bisection of sorted search names
+    scanned = [index.search(query, 5) for query in queries]
+    mocker.patch.object(search.MemoryIndex, "common_ratio", 2)
+    assert [index.search(query, 5) for query in queries] == scanned
+    assert scanned[2] == [13]
+    assert scanned[3] == [14, 13, 20, 12, 19]
+    assert scanned[4][0] == 7 and 51 not in scanned[4]
+
+
+@add_marks("positive_case", "get", "cars_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_search_cars_postgresql_queries_prefix_matches_first(
+    mocker: MockerFixture, db_with_multiple_car_and_rating_records
+):
+    Car.objects.bulk_create([Car(model="Toyota", make="Corolla")])
+    mocker.patch.object(search, "connection", mocker.Mock(vendor="postgresql"))
+
+    with CaptureQueriesContext(connection) as queries:
+        assert [row["id"] for row in search.search_cars("cor", limit=1)] == [4]
+    assert len(queries) == 1
+    with CaptureQueriesContext(connection) as queries:
+        assert [row["id"] for row in search.search_cars("cor")] == [4, 1]
+    assert len(queries) == 2
+    with CaptureQueriesContext(connection) as queries:
+        assert [row["id"] for row in search.search_cars("a")] == [1]
+    assert len(queries) == 1
+    assert [row["id"] for row in search.search_cars("hon", "popular", 2)] == [3, 2]
+
+
+@add_marks("positive_case", "get", "cars_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_get_cars_endpoint_positive_case_cursor_pagination(client, db_with_multiple_car_and_rating_records):
+    Car.objects.create(model="Honda", make="Jazz")
+    Car.objects.create(model="Honda", make="Fit")
+    # walk through all pages, page size 2
+    response = client.get("/cars/", {"page_size": 2})
+    assert response.status_code == status.HTTP_200_OK
+    assert [car["id"] for car in response.data["results"]] == [3, 2]
+    response = client.get(response.data["next"])
+    assert [car["id"] for car in response.data["results"]] == [1, 4]
+    response = client.get(response.data["next"])
+    assert [car["id"] for car in response.data["results"]] == [5]
+    assert response.data["next"] is None
+
+
+@add_marks("positive_case", "get", "cars_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_get_cars_endpoint_positive_case_unpaginated_flag(client, db_with_multiple_car_and_rating_records):
+    response = client.get("/cars/", {"paginate": "false", "page_size": 1})
+    assert response.status_code == status.HTTP_200_OK
+    assert [car["id"] for car in response.data] == [3, 2, 1]
+
+
+@add_marks("negative_case", "get", "cars_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_get_cars_endpoint_negative_case_invalid_cursor(client):
+    response = client.get("/cars/", {"cursor": "invalid"})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.data == {"detail": ErrorDetail(string="Invalid cursor", code="not_found")}
+
+
+@add_marks("positive_case", "get", "cars_endpoint", "popular_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_keyset_pagination_cursor_condition_is_index_range():
+    pages = [
+        (AvgRatingPagination(), Car.objects.verified(), "avg_rating", "car_status_avg_rating_idx"),
+        (RatesNumberPagination(), Car.objects.verified(), "rates_count", "car_status_rates_count_idx"),
+        (RatePagination(), Rate.objects.filter(car_id=1), "id", "rate_car_id_idx"),
+    ]
+    for pagination, queryset, field_name, index_name in pages:
+        request = Request(APIRequestFactory().get("/", {"cursor": pagination.encode_cursor((3, 7))}))
+        with CaptureQueriesContext(connection) as queries:
+            pagination.paginate_queryset(queryset, request)
+        sql = queries.captured_queries[-1]["sql"]
+        # OR of the cursor pair is bounded with a plain range on the ordering field
+        assert f'"{field_name}" <= ' in sql
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                plan = cursor.fetchall()[0][-1]
+            assert f"USING INDEX {index_name} (" in plan and f"{field_name}<?)" in plan
+
+
+@add_marks("negative_case", "get", "cars_endpoint", "popular_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_get_list_endpoints_negative_case_invalid_page_size(client):
+    for path in ("/cars/", "/popular/", "/rate/"):
+        for page_size in ("abc", "0", "-5"):
+            response = client.get(path, {"page_size": page_size})
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+            assert response.json() == {"page_size": ["Invalid page size"]}
+
+
+@add_marks("positive_case", "get", "popular_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_get_popular_endpoint_positive_case_cursor_pagination(client, db_with_multiple_car_and_rating_records):
+    response = client.get("/popular/", {"page_size": 2})
+    assert response.status_code == status.HTTP_200_OK
+    assert [car["rates_number"] for car in response.data["results"]] == [3, 2]
+    response = client.get(response.data["next"])
+    assert [car["rates_number"] for car in response.data["results"]] == [1]
+    assert response.data["next"] is None
+
+
+@add_marks("positive_case", "get", "popular_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_get_popular_endpoint_positive_case_time_window(client, db_with_multiple_car_and_rating_records):
+    # car 3 got its rates 10 days ago, car 1 got new ones today and yesterday
+    Rate.objects.filter(car_id=3).update(created_at=timezone.now() - timedelta(days=10))
+    call_command("rollup_rates", "--backfill", stdout=StringIO())
+    Rate.objects.create(car_id_id=1, rating=5)
+    Car.objects.apply_rating_deltas(
+        Rate.objects.bulk_create([Rate(car_id_id=1, rating=4, created_at=timezone.now() - timedelta(days=1))])
+    )
+    response = client.get("/popular/", {"window": "7d"})
+    assert response.status_code == status.HTTP_200_OK
+    assert [(car["id"], car["rates_number"]) for car in response.data["results"]] == [(1, 3), (2, 2)]
+    response = client.get("/popular/", {"window": "30d", "page_size": 2})
+    assert [(car["id"], car["rates_number"]) for car in response.data["results"]] == [(1, 3), (3, 3)]
+    response = client.get(response.data["next"])
+    assert [(car["id"], car["rates_number"]) for car in response.data["results"]] == [(2, 2)]
+    # window is summed from a single query over daily rollups
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/popular/", {"window": "7d", "paginate": "false"})
+    assert len([query for query in queries if "cars_api_rate" in query["sql"]]) == 0
+    # rate deletes are subtracted from rollups, windowed and all-time etags differ
+    Rate.objects.filter(car_id=1).delete()
+    response = client.get("/popular/", {"window": "7d"})
+    assert [(car["id"], car["rates_number"]) for car in response.data["results"]] == [(2, 2)]
+    assert response["ETag"] != client.get("/popular/")["ETag"]
+    for window in ("0d", "7", "91d"):
+        response = client.get("/popular/", {"window": window})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@add_marks("model")
+@pytest.mark.django_db(reset_sequences=True)
+def test_rollup_rates_command_compacts_old_buckets(db_with_multiple_car_and_rating_records):
+    today = timezone.localdate()
+    for days_ago in (100, 101, 130):
+        Rate.objects.create(car_id_id=2, rating=3, created_at=timezone.now() - timedelta(days=days_ago))
+    assert DailyRates.objects.filter(car_id=2).count() == 4
+    out = StringIO()
+    call_command("rollup_rates", stdout=out)
+    buckets = dict(DailyRates.objects.filter(car_id=2).values_list("day", "rates_count"))
+    assert sum(buckets.values()) == Car.objects.get(pk=2).rates_count == 5
+    assert buckets[today] == 2
+    assert all(day.day == 1 for day in buckets if day != today)
+    assert out.getvalue().strip() == f"Compacted {4 - len(buckets)} daily rollups."
+    # already compacted months are left as they are
+    out = StringIO()
+    call_command("rollup_rates", stdout=out)
+    assert out.getvalue().strip() == "Compacted 0 daily rollups."
+
+
+@add_marks("positive_case", "get", "cars_endpoint", "popular_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_get_list_endpoints_fast_path_output_identical_to_serializer(client, db_with_multiple_car_and_rating_records):
+    Car.objects.create(make='Škoda "Quote"', model="Line\u2028Separator")
+    Car.objects.create(make="Tab\tbackslash\\", model="Żółw 🚗")
+    renderer = JSONRenderer()
+    for path, ordering, field in (
+        ("/cars/", "-avg_rating", "avg_rating"),
+        ("/popular/", "-rates_count", "rates_number"),
+    ):
+        cars = Car.objects.order_by(ordering, "id")
+        serializer = CarSerializer(cars, fields=("id", "make", "model", field), many=True)
+        response = client.get(path, {"paginate": "false"})
+        assert response.content == renderer.render(serializer.data)
+        serializer = CarSerializer(cars[:2], fields=("id", "make", "model", field), many=True)
+        response = client.get(path, {"page_size": 2})
+        assert response.content == renderer.render({"next": response.data["next"], "results": serializer.data})
+
+
+@add_marks("positive_case", "get", "cars_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_get_cars_endpoint_positive_case_streamed(mocker, client, db_with_multiple_car_and_rating_records):
+    mocker.patch.object(ListCarGenerics, "stream_chunk_size", 2)
+    Car.objects.create(model="Honda", make="Jazz")
+    expected = client.get("/cars/", {"paginate": "false"}).content
+    # JSON array, rendered in chunks
+    response = client.get("/cars/", {"stream": "1"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    assert response["Content-Type"] == "application/json"
+    assert b"".join(response.streaming_content) == expected
+    # NDJSON, line per car
+    response = client.get("/cars/", HTTP_ACCEPT="application/x-ndjson")
+    assert response.streaming
+    assert response["Content-Type"] == "application/x-ndjson"
+    lines = b"".join(response.streaming_content).splitlines()
+    assert [json.loads(line) for line in lines] == json.loads(expected)
+
+
+@add_marks("positive_case", "get", "cars_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_get_cars_endpoint_positive_case_streamed_empty_list(client):
+    response = client.get("/cars/", {"stream": "1"})
+    assert b"".join(response.streaming_content) == b"[]"
+    response = client.get("/cars/", HTTP_ACCEPT="application/x-ndjson")
+    assert b"".join(response.streaming_content) == b""
+
+
+@pytest.fixture(scope="function")
+def response_cache_enabled(settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@add_marks("positive_case", "get", "cars_endpoint")
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_get_cars_endpoint_positive_case_conditional_get(
+    client, response_cache_enabled, db_with_multiple_car_and_rating_records
+):
+    response = client.get("/cars/")
+    assert response.status_code == status.HTTP_200_OK
+    etag = response["ETag"]
+    assert response.has_header("Last-Modified")
+    # unchanged data, not modified
+    response = client.get("/cars/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response["ETag"] == etag
+    # cached body is served without running the list query
+    with CaptureQueriesContext(connection) as queries:
+        cached = client.get("/cars/")
+    assert len(queries) == 1
+    assert json.loads(cached.content)["results"][0]["id"] == 3
+    # new rate bumps data version, so validators and cached body change
+    client.post("/rate/", {"car_id": 1, "rating": 5})
+    response = client.get("/cars/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"] != etag
+    assert [car["id"] for car in response.data["results"]] == [3, 1, 2]
+    # car delete bumps data version as well
+    etag = response["ETag"]
+    client.delete("/cars/3/")
+    response = client.get("/popular/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert [car["id"] for car in response.data["results"]] == [1, 2]
+
+
+@add_marks("positive_case", "get", "cars_endpoint")
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_get_cars_endpoint_conditional_get_per_representation(
+    client, response_cache_enabled, db_with_multiple_car_and_rating_records
+):
+    response = client.get("/cars/")
+    etag = response["ETag"]
+    assert "Accept" in response["Vary"]
+    # NDJSON representation of the same url has its own validator and cached body
+    ndjson = client.get("/cars/", HTTP_ACCEPT="application/x-ndjson", HTTP_IF_NONE_MATCH=etag)
+    assert ndjson.status_code == status.HTTP_200_OK
+    assert ndjson["Content-Type"] == "application/x-ndjson"
+    assert ndjson["ETag"] != etag and "Accept" in ndjson["Vary"]
+    cached = client.get("/cars/", HTTP_ACCEPT="application/x-ndjson", HTTP_IF_NONE_MATCH=etag)
+    assert cached["Content-Type"] == "application/x-ndjson"
+    response = client.get("/cars/", HTTP_ACCEPT="application/x-ndjson", HTTP_IF_NONE_MATCH=ndjson["ETag"])
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    # HEAD gets the same validators as GET
+    response = client.head("/cars/")
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"] == etag and "Accept" in response["Vary"]
+    assert response.has_header("Last-Modified")
+    assert client.head("/cars/", HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@add_marks("aux", "model")
+@pytest.mark.django_db(transaction=True, reset_sequences=True)
+def test_data_version_bumped_after_car_write_is_visible(mocker):
+    increment = models._increment_data_version
+    seen = []
+
+    def spy():
+        # version bump runs right away in autocommit mode, readers must already see the write
+        seen.append(sorted(Car.objects.values_list("model", flat=True)))
+        increment()
+
+    mocker.patch("cars_api.models._increment_data_version", side_effect=spy)
+    car = Car.objects.create(make="Honda", model="Civic")
+    Car.objects.bulk_create([Car(make="Honda", model="Accord")])
+    car.delete()
+    Car.objects.filter(model="Accord").delete()
+
+    assert seen == [["Civic"], ["Accord", "Civic"], ["Accord"], []]
+    assert DataVersion.objects.get().version == 4
+
+
+@add_marks("positive_case", "get", "cars_endpoint", "popular_endpoint")
+@pytest.mark.django_db(databases=["default", "replica"], reset_sequences=True)
+def test_get_list_endpoints_replica_reads_with_read_your_writes(
+    settings, client, db_with_multiple_car_and_rating_records
+):
+    settings.DATABASE_REPLICAS = ["replica"]
+    # replica db isn't replicated in tests, so data read from it is easy to tell apart
+    Car.objects.using("replica").create(make="Replica", model="Car")
+
+    def listed(path, **params):
+        response = client.get(path, {"paginate": "false", **params})
+        content = b"".join(response.streaming_content) if response.streaming else response.content
+        return [car["make"] for car in json.loads(content)]
+
+    assert listed("/cars/") == listed("/popular/") == listed("/cars/", stream="1") == ["Replica"]
+    # detail endpoint and writes use primary db
+    assert client.get("/cars/1/").data["make"] == "Accord"
+    response = client.post("/rate/", {"car_id": 1, "rating": 5})
+    assert response.status_code == status.HTTP_201_CREATED
+    assert Rate.objects.using("replica").count() == 0
+    # client which just wrote reads from primary db during stickiness window
+    assert db_router.STICKY_COOKIE in response.cookies
+    assert listed("/cars/") == ["Pilot", "Accord", "Civic"]
+    # after the window, or with forged cookie far in the future, reads go to replica again
+    for primary_until in (time.time() - 1, time.time() + 3600):
+        client.cookies[db_router.STICKY_COOKIE] = str(primary_until)
+        assert listed("/cars/") == ["Replica"]
+    # without replicas every read uses primary db
+    settings.DATABASE_REPLICAS = []
+    assert listed("/popular/") == ["Pilot", "Accord", "Civic"]
+
+
+@add_marks("positive_case", "get", "post", "cars_endpoint", "rate_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_api_settings_profile_serves_api_without_admin(settings, client, db_with_single_car_record):
+    from app import settings_api
+
+    for name in ("MIDDLEWARE", "ROOT_URLCONF", "TEMPLATES", "REST_FRAMEWORK"):
+        setattr(settings, name, getattr(settings_api, name))
+    response = client.post("/rate/", {"car_id": 1, "rating": 5})
+    assert response.status_code == status.HTTP_201_CREATED
+    response = client.get("/cars/")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"][0]["avg_rating"] == 5.0
+    assert not response.has_header("X-Frame-Options") and not response.cookies
+    assert client.get("/admin/").status_code == status.HTTP_404_NOT_FOUND
+
+
+@add_marks("positive_case", "get", "metrics_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_get_metrics_endpoint_records_request_breakdown(mocker, client, db_with_multiple_car_and_rating_records):
+    mocker.patch(
+        "cars_api.external_api.requests.Session.get",
+        return_value=MockResponse(
+            json_data={"Results": [{"Make_Name": "HONDA", "Model_Name": "Jazz"}]}, status_code=status.HTTP_200_OK
+        ),
+    )
+
+    def sample(name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    get_labels = {"route": "cars/", "method": "GET"}
+    post_labels = {"route": "cars/", "method": "POST"}
+    requests_before = sample("cars_api_request_duration_seconds_count", **get_labels)
+    queries_before = sample("cars_api_request_db_queries_sum", **get_labels)
+    external_api_before = sample("cars_api_request_external_api_duration_seconds_count", **post_labels)
+    upstream_before = sample("cars_api_external_api_responses_total", status="200")
+
+    client.get("/cars/")
+    client.post("/cars/", {"make": "Honda", "model": "Jazz"})
+
+    assert sample("cars_api_request_duration_seconds_count", **get_labels) == requests_before + 1
+    assert sample("cars_api_request_db_queries_sum", **get_labels) > queries_before
+    assert sample("cars_api_request_external_api_duration_seconds_count", **post_labels) == external_api_before + 1
+    assert sample("cars_api_external_api_responses_total", status="200") == upstream_before + 1
+    assert sample("cars_api_responses_total", status="200", **post_labels) >= 1
+    response = client.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    assert b'cars_api_request_duration_seconds_count{method="GET",route="cars/"}' in response.content
+
+
+@add_marks("negative_case", "get", "metrics_endpoint")
+def test_get_metrics_endpoint_only_for_allowed_clients(settings, client):
+    settings.METRICS_ALLOWED_IPS = ["10.0.0.5"]
+    settings.METRICS_TOKEN = ""
+    assert client.get("/metrics").status_code == status.HTTP_404_NOT_FOUND
+    assert client.get("/metrics", HTTP_AUTHORIZATION="Bearer ").status_code == status.HTTP_404_NOT_FOUND
+    assert client.get("/metrics", REMOTE_ADDR="10.0.0.5").status_code == status.HTTP_200_OK
+    # scraper behind a proxy uses the token
+    settings.METRICS_TOKEN = "secret"
+    assert client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code == status.HTTP_404_NOT_FOUND
+    assert client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret").status_code == status.HTTP_200_OK
+
+
+@add_marks("positive_case", "post", "metrics_endpoint", "cars_endpoint")
+@pytest.mark.django_db(reset_sequences=True)
+def test_metrics_middleware_records_async_view_queries(mocker):
+    mocker.patch(
+        "cars_api.async_views.async_external_api_call",
+        new=AsyncMock(return_value=[{"Make_Name": "HONDA", "Model_Name": "Civic"}]),
+    )
+    labels = {"route": "cars/async/", "method": "POST"}
+    queries_before = REGISTRY.get_sample_value("cars_api_request_db_queries_sum", labels) or 0
+
+    response = async_post("/cars/async/", {"make": "Honda", "model": "Civic"})
+    assert response.status_code == status.HTTP_200_OK
+    # queries made in sync_to_async threads are counted too
+    assert REGISTRY.get_sample_value("cars_api_request_db_queries_sum", labels) > queries_before
+
+
+@add_marks("aux", "metrics_endpoint")
+def test_middleware_chain_not_adapted_to_sync_under_asgi(mocker):
+    from django.core.handlers import base
+
+    async def get():  # type: ignore
+        return await AsyncClient().get("/metrics")
+
+    adapted = mocker.spy(base, "async_to_sync")
+    # middleware chain is loaded by the first request
+    response = async_to_sync(get)()
+    assert response.status_code == status.HTTP_200_OK
+    # every middleware runs in async mode, none needs its next layer adapted to sync
+    assert adapted.call_count == 0
 
 
 """######### Models Tests #########"""
@@ -427,6 +1317,99 @@ def test_rate_mode_aux_methods():
     assert rate.to_dict() == {"car": {"make": "Accord", "model": "Honda"}, "rate": 4}
 
 
+@add_marks("model")
+@pytest.mark.django_db(reset_sequences=True)
+def test_car_rating_aggregates_maintained_on_rate_writes(db_with_multiple_car_and_rating_records):
+    car = Car.objects.get(pk=3)
+    assert (car.rates_count, car.rating_sum, car.average_rating) == (3, 13, 13 / 3)
+    # single rate delete
+    Rate.objects.filter(car_id=car, rating=5).first().delete()
+    car.refresh_from_db()
+    assert (car.rates_count, car.rating_sum, car.avg_rating) == (2, 8, 4.0)
+    # queryset delete
+    Rate.objects.filter(car_id=car).delete()
+    car.refresh_from_db()
+    assert (car.rates_count, car.rating_sum, car.avg_rating, car.average_rating) == (0, 0, 0.0, None)
+    # cascade delete removes rates along with the car, other cars are untouched
+    Car.objects.get(pk=2).delete()
+    assert Rate.objects.count() == 1
+    assert Car.objects.get(pk=1).rates_count == 1
+
+
+@add_marks("model")
+@pytest.mark.django_db(reset_sequences=True)
+def test_car_rating_histogram_maintained_on_rate_writes(db_with_multiple_car_and_rating_records):
+    car = Car.objects.get(pk=3)
+    assert car.rating_histogram == {"1": 0, "2": 0, "3": 0, "4": 2, "5": 1}
+    # bulk insert, single delete, rating change
+    Car.objects.apply_rating_deltas(Rate.objects.bulk_create([Rate(car_id=car, rating=1), Rate(car_id=car, rating=1)]))
+    Rate.objects.filter(car_id=car, rating=5).first().delete()
+    rate = Rate.objects.filter(car_id=car, rating=4).first()
+    rate.rating = 2
+    rate.save()
+    car.refresh_from_db()
+    assert car.rating_histogram == {"1": 2, "2": 1, "3": 0, "4": 1, "5": 0}
+    assert (car.rates_count, car.median_rating) == (4, 1.5)
+    # rebuild gives the same counters
+    Car.objects.update(rating_1_count=0, rating_4_count=0)
+    call_command("rebuild_rating_aggregates")
+    car.refresh_from_db()
+    assert car.rating_histogram == {"1": 2, "2": 1, "3": 0, "4": 1, "5": 0}
+
+
+@add_marks("aux", "model")
+def test_median_and_bayesian_average_from_histogram(settings):
+    assert ratings.median([0, 0, 0, 0, 0]) is None
+    assert ratings.median([1, 0, 0, 0, 0]) == 1.0
+    assert ratings.median([1, 0, 0, 0, 1]) == 3.0
+    assert ratings.median([0, 2, 0, 3, 0]) == 4.0
+    assert ratings.median([3, 0, 1, 0, 2]) == 2.0
+    settings.RATING_PRIOR_MEAN, settings.RATING_PRIOR_WEIGHT = 3.0, 10
+    assert ratings.bayesian_average(0, 0) == 3.0
+    assert ratings.bayesian_average(10, 2) == 40 / 12
+
+
+@add_marks("model")
+@pytest.mark.django_db(reset_sequences=True)
+def test_rebuild_rating_aggregates_command(db_with_multiple_car_and_rating_records):
+    Car.objects.update(rates_count=0, rating_sum=0, avg_rating=0.0)
+    call_command("rebuild_rating_aggregates")
+    assert list(Car.objects.order_by("id").values_list("rates_count", "rating_sum", "avg_rating")) == [
+        (1, 1, 1.0),
+        (2, 5, 2.5),
+        (3, 13, 13 / 3),
+    ]
+
+
+@add_marks("model")
+@pytest.mark.django_db(databases=["default", "replica"], reset_sequences=True)
+def test_migrations_in_sync_with_models(settings):
+    # committed migrations have to cover every model change, production boot doesn't run makemigrations
+    # (tests run with --no-migrations, so migration modules are turned back on)
+    settings.MIGRATION_MODULES = {}
+    call_command("makemigrations", "cars_api", "--check", "--dry-run", stdout=StringIO())
+
+
+@add_marks("aux")
+@pytest.mark.django_db(reset_sequences=True)
+def test_boot_command_skips_redundant_work(settings, tmp_path):
+    settings.STATIC_ROOT = str(tmp_path)
+    settings.STATICFILES_STORAGE = "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"
+
+    def boot():
+        out = StringIO()
+        call_command("boot", stdout=out)
+        return [line.rsplit(" (", 1)[0] for line in out.getvalue().splitlines()]
+
+    assert boot()[:2] == ["boot: migrate skipped, schema is at head", "boot: collectstatic collected static files"]
+    assert (tmp_path / "staticfiles.json").exists()
+    assert boot()[1] == "boot: collectstatic skipped, static files didn't change"
+    # missing manifest is collected again
+    (tmp_path / "staticfiles.json").unlink()
+    assert boot()[1] == "boot: collectstatic collected static files"
+    assert boot()[2].startswith("boot: ready in")
+
+
 """######### Aux Tests #########"""
 
 
@@ -434,7 +1417,8 @@ def test_rate_mode_aux_methods():
 def test_external_api_call_negative_case_raises_attribute_error():
     factory = APIRequestFactory()
     request = factory.get("")
-    with pytest.raises(AttributeError, match="Wrong request method \\(post required\\) or missing api url env variable"):
+    match = "Wrong request method \\(post required\\) or missing api url env variable"
+    with pytest.raises(AttributeError, match=match):
         external_api_call(request, "", "")  # type: ignore
 
 
@@ -443,7 +1427,8 @@ def test_external_api_call_negative_case_raises_connection_error(mocker):
     factory = APIRequestFactory()
     request = factory.post("")
     mocker.patch(
-        "cars_api.external_api.requests.get", return_value=MockResponse(json_data={}, status_code=status.HTTP_400_BAD_REQUEST)
+        "cars_api.external_api.requests.Session.get",
+        return_value=MockResponse(json_data={}, status_code=status.HTTP_400_BAD_REQUEST),
     )
 
     with pytest.raises(ConnectionError, match="External api error or API unavailable"):
@@ -463,7 +1448,7 @@ def test_external_api_call_negative_case_raises_value_error(mocker):
     factory = APIRequestFactory()
     request = factory.post("")
     mocker.patch(
-        "cars_api.external_api.requests.get",
+        "cars_api.external_api.requests.Session.get",
         return_value=MockResponse(
             json_data=mocked_response_data,
             status_code=status.HTTP_200_OK,
@@ -487,7 +1472,7 @@ def test_external_api_call_positive_case(mocker):
     factory = APIRequestFactory()
     request = factory.post("")
     mocker.patch(
-        "cars_api.external_api.requests.get",
+        "cars_api.external_api.requests.Session.get",
         return_value=MockResponse(
             json_data=mocked_response_data,
             status_code=status.HTTP_200_OK,
@@ -497,3 +1482,569 @@ def test_external_api_call_positive_case(mocker):
     resp = external_api_call(request, car_make="Honda", car_model="Accord")  # type: ignore
 
     assert resp == [{"Make_ID": 474, "Make_Name": "HONDA", "Model_ID": 1861, "Model_Name": "Accord"}]
+
+
+@pytest.fixture(scope="function")
+def external_api_cache_enabled(settings, db):
+    settings.VPIC_CACHE_TTL = 60
+    settings.VPIC_CACHE_NEGATIVE_TTL = 30
+    settings.VPIC_CACHE_MAX_ENTRIES = 2
+    # every hit refreshes LRU position and is written to stats right away
+    settings.VPIC_CACHE_TOUCH_INTERVAL = 0
+
+
+@add_marks("aux", "external_api", "positive_case")
+def test_external_api_call_positive_case_cached_model_names(mocker, external_api_cache_enabled):
+    mocked_response_data = {
+        "Count": 2,
+        "Message": "Response returned successfully",
+        "SearchCriteria": "Make:honda",
+        "Results": [
+            {"Make_ID": 474, "Make_Name": "HONDA", "Model_ID": 1861, "Model_Name": "Accord"},
+            {"Make_ID": 474, "Make_Name": "HONDA", "Model_ID": 1863, "Model_Name": "Civic"},
+        ],
+    }
+    request = APIRequestFactory().post("")
+    get_mock = mocker.patch(
+        "cars_api.external_api.requests.Session.get",
+        return_value=MockResponse(json_data=mocked_response_data, status_code=status.HTTP_200_OK),
+    )
+
+    resp = external_api_call(request, car_make="Honda", car_model="Accord")  # type: ignore
+    assert resp == [{"Make_ID": 474, "Make_Name": "HONDA", "Model_ID": 1861, "Model_Name": "Accord"}]
+    # following calls for the same make are served from cache
+    resp = external_api_call(request, car_make=" honda ", car_model="civic")  # type: ignore
+    assert resp == [{"Make_Name": " honda ", "Model_Name": "civic"}]
+    with pytest.raises(ValueError, match="No matching result in external api for HONDA Pilot"):
+        external_api_call(request, car_make="HONDA", car_model="Pilot")  # type: ignore
+
+    assert get_mock.call_count == 1
+    assert external_api_cache.get_stats() == {"entries": 1, "hits": 2, "misses": 1}
+    assert ExternalApiCache.objects.get().model_names == ["Accord", "Civic"]
+
+
+@add_marks("aux", "external_api", "negative_case")
+def test_external_api_call_negative_case_cached_unknown_make(mocker, external_api_cache_enabled):
+    request = APIRequestFactory().post("")
+    get_mock = mocker.patch(
+        "cars_api.external_api.requests.Session.get",
+        return_value=MockResponse(json_data={"Count": 0, "Results": []}, status_code=status.HTTP_200_OK),
+    )
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match="No matching result in external api for Hondda Civic"):
+            external_api_call(request, car_make="Hondda", car_model="Civic")  # type: ignore
+    assert get_mock.call_count == 1
+
+    # expired entry is fetched again
+    ExternalApiCache.objects.update(expires_at=timezone.now())
+    with pytest.raises(ValueError):
+        external_api_call(request, car_make="Hondda", car_model="Civic")  # type: ignore
+    assert get_mock.call_count == 2
+    assert external_api_cache.get_stats() == {"entries": 1, "hits": 1, "misses": 2}
+
+
+@add_marks("aux", "external_api", "negative_case")
+def test_post_cars_endpoint_no_matching_model_suggestions(mocker, client, external_api_cache_enabled):
+    mocked_response_data = {
+        "Count": 5,
+        "Message": "Response returned successfully",
+        "SearchCriteria": "Make:honda",
+        "Results": [
+            {"Make_ID": 474, "Make_Name": "HONDA", "Model_ID": 1861, "Model_Name": model_name}
+            for model_name in ["Accord", "Civic", "Civic Type R", "CR-V", "Pilot"]
+        ],
+    }
+    get_mock = mocker.patch(
+        "cars_api.external_api.requests.Session.get",
+        return_value=MockResponse(json_data=mocked_response_data, status_code=status.HTTP_200_OK),
+    )
+    suggestions.clear_indexes()
+    load_spy = mocker.spy(external_api_cache, "load_model_names")
+
+    # the first miss is checked against the response, the next ones against cached model names
+    # suggestions keep casing of external api model names, also when served from cache
+    for car_model, expected_suggestions in [("Civc", ["Civic", "Civic Type R"]), ("acord", ["Accord"]), ("Jazz", [])]:
+        resp = client.post("/cars/", {"make": "Honda", "model": car_model}, content_type="application/json")
+        assert resp.status_code == status.HTTP_404_NOT_FOUND
+        assert resp.json() == {
+            "external_api_error": f"No matching result in external api for Honda {car_model}",
+            "suggestions": expected_suggestions,
+        }
+    assert get_mock.call_count == 1
+
+    with pytest.raises(NoMatchingModelError) as exc_info:
+        external_api_call(APIRequestFactory().post(""), car_make="HONDA", car_model="crv")  # type: ignore
+    assert exc_info.value.suggestions == ["CR-V"]
+    # index of the make is built once when names are stored, cache hits read only version of the entry
+    assert load_spy.call_count == 0
+    assert list(suggestions._indexes) == ["honda"]
+    index = suggestions._indexes["honda"]
+    assert index.version == ExternalApiCache.objects.get().expires_at
+    assert suggestions.suggest_models("Honda", "pilt", index.version, lambda: ["Jazz"]) == ["Pilot"]
+    assert suggestions._indexes["honda"] is index
+    # other process (without index) loads names once, new version of names is indexed anew
+    suggestions.clear_indexes()
+    for _ in range(2):
+        with pytest.raises(NoMatchingModelError):
+            external_api_call(APIRequestFactory().post(""), car_make="Honda", car_model="Jazz")  # type: ignore
+    assert load_spy.call_count == 1
+    assert suggestions.suggest_models("Honda", "pilt", "other", lambda: ["Jazz"]) == []
+    assert suggestions._indexes["honda"].version == "other"
+
+
+@add_marks("aux", "external_api")
+def test_external_api_cache_evicts_least_recently_used(external_api_cache_enabled):
+    external_api_cache.store_model_names("Honda", ["Civic"])
+    external_api_cache.store_model_names("Audi", ["A4"])
+    # use Honda entry, so Audi is the least recently used one
+    assert external_api_cache.get_model_names("Honda") == {"Civic"}
+    external_api_cache.store_model_names("Bmw", ["X5"])
+
+    assert sorted(ExternalApiCache.objects.values_list("make", flat=True)) == ["bmw", "honda"]
+    assert external_api_cache.get_model_names("Audi") is None
+
+
+@add_marks("aux", "external_api")
+def test_external_api_cache_evicts_with_hits_write(mocker, settings, external_api_cache_enabled):
+    external_api_cache.store_model_names("Honda", ["Civic"])
+    external_api_cache.store_model_names("Audi", ["A4"])
+    # limit lowered without new entries is kept once hits are written
+    settings.VPIC_CACHE_MAX_ENTRIES = 1
+    settings.VPIC_CACHE_TOUCH_INTERVAL = 60
+    mocker.patch.object(external_api_cache, "_hits_written_at", time.monotonic())
+    assert external_api_cache.get_model_names("Audi") == {"A4"}
+    assert ExternalApiCache.objects.count() == 2
+    settings.VPIC_CACHE_TOUCH_INTERVAL = 0
+    assert external_api_cache.get_model_names("Honda") == {"Civic"}
+    assert list(ExternalApiCache.objects.values_list("make", flat=True)) == ["honda"]
+
+
+@add_marks("aux", "external_api")
+def test_async_external_api_call_stores_the_same_cache_entry(mocker, external_api_cache_enabled):
+    results = [{"Make_Name": "HONDA", "Model_Name": "Civic"}, {"Make_Name": "HONDA", "Model_Name": "Accord"}]
+    transport = httpx.MockTransport(lambda request: httpx.Response(status.HTTP_200_OK, json={"Results": results}))
+    mocker.patch("cars_api.external_api.get_async_client", return_value=httpx.AsyncClient(transport=transport))
+    request = APIRequestFactory().post("")
+
+    async_to_sync(async_external_api_call)(request, car_make="Honda", car_model="Civic")
+    # model names are stored as by sync path, and read back by both paths
+    assert ExternalApiCache.objects.get().model_names == ["Accord", "Civic"]
+    assert external_api_cache.get_model_names("Honda") == {"Accord", "Civic"}
+    assert async_to_sync(async_external_api_call)(request, car_make="honda", car_model="accord") == [
+        {"Make_Name": "honda", "Model_Name": "accord"}
+    ]
+
+
+@add_marks("aux", "external_api")
+def test_external_api_cache_hits_are_reads_within_touch_interval(mocker, settings, external_api_cache_enabled):
+    settings.VPIC_CACHE_TOUCH_INTERVAL = 60
+    mocker.patch.object(external_api_cache, "_hits_written_at", time.monotonic())
+    external_api_cache.store_model_names("Honda", ["Civic"])
+    stored_at = ExternalApiCache.objects.get().last_used_at
+
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(3):
+            assert external_api_cache.get_model_names("Honda") == {"Civic"}
+    assert len(queries) == 3
+    assert ExternalApiCache.objects.get().last_used_at == stored_at
+    assert external_api_cache.get_stats() == {"entries": 1, "hits": 0, "misses": 1}
+    # LRU position older than the interval is refreshed
+    ExternalApiCache.objects.update(last_used_at=stored_at - timedelta(seconds=60))
+    external_api_cache.get_model_names("Honda")
+    assert ExternalApiCache.objects.get().last_used_at > stored_at
+    # hits counted so far are written at once, and outlive evicted entries
+    settings.VPIC_CACHE_TOUCH_INTERVAL = 0
+    external_api_cache.get_model_names("Honda")
+    ExternalApiCache.objects.all().delete()
+    assert external_api_cache.get_stats() == {"entries": 0, "hits": 5, "misses": 1}
+
+
+@add_marks("aux", "external_api")
+def test_vpic_cache_stats_command(external_api_cache_enabled):
+    external_api_cache.store_model_names("Honda", ["Civic"])
+    external_api_cache.get_model_names("Honda")
+    out = StringIO()
+    call_command("vpic_cache_stats", stdout=out)
+    assert out.getvalue() == "entries: 1, hits: 1, misses: 1\n"
+
+
+@add_marks("aux", "external_api")
+def test_external_api_session_pooled_per_process(mocker, settings):
+    settings.VPIC_POOL_SIZE = 7
+    mocker.patch("cars_api.external_api._session", None)
+    session = get_session()
+    assert get_session() is session
+    adapter = session.get_adapter("https://vpic.nhtsa.dot.gov")
+    # calls are retried by _fetch_results within deadline, not by the session
+    assert adapter.max_retries.total == 0
+    assert adapter._pool_maxsize == 7
+    # forked worker process gets its own session
+    mocker.patch("cars_api.external_api.os.getpid", return_value=-1)
+    assert get_session() is not session
+
+
+@add_marks("aux", "external_api")
+def test_external_api_call_uses_timeouts(mocker, settings):
+    settings.VPIC_CONNECT_TIMEOUT = 1.5
+    settings.VPIC_READ_TIMEOUT = 4
+    request = APIRequestFactory().post("")
+    get_mock = mocker.patch(
+        "cars_api.external_api.requests.Session.get",
+        return_value=MockResponse(json_data={}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE),
+    )
+    with pytest.raises(ConnectionError, match="External api error or API unavailable"):
+        external_api_call(request, car_make="Honda", car_model="Civic")  # type: ignore
+    assert get_mock.call_args.kwargs["timeout"] == (1.5, 4)
+
+
+@add_marks("aux", "external_api", "negative_case")
+def test_external_api_call_retries_within_deadline(mocker, settings):
+    settings.VPIC_RETRIES = 5
+    settings.VPIC_BACKOFF_FACTOR = 0.5
+    settings.VPIC_DEADLINE = 2
+    clock = [100.0]
+    mocker.patch("cars_api.external_api.time.monotonic", side_effect=lambda: clock[0])
+    sleep_mock = mocker.patch(
+        "cars_api.external_api.time.sleep", side_effect=lambda seconds: clock.__setitem__(0, clock[0] + seconds)
+    )
+    get_mock = mocker.patch(
+        "cars_api.external_api.requests.Session.get",
+        return_value=MockResponse(json_data={}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE),
+    )
+    request = APIRequestFactory().post("")
+
+    with pytest.raises(ConnectionError, match="External api error or API unavailable"):
+        external_api_call(request, car_make="Honda", car_model="Civic")  # type: ignore
+    # the 4th attempt would start 3.5 s after the call, after deadline
+    assert [call.args[0] for call in sleep_mock.call_args_list] == [0.5, 1]
+    # timeouts are capped by time left to deadline
+    assert [call.kwargs["timeout"] for call in get_mock.call_args_list] == [(2, 2), (1.5, 1.5), (0.5, 0.5)]
+
+    # connection errors are retried as well, the last one is raised
+    get_mock.reset_mock(return_value=True)
+    get_mock.side_effect = [RequestsConnectionError("refused"), RequestsConnectionError("refused again")]
+    settings.VPIC_RETRIES = 1
+    with pytest.raises(RequestsConnectionError, match="refused again"):
+        external_api_call(request, car_make="Honda", car_model="Civic")  # type: ignore
+    assert get_mock.call_count == 2
+
+
+@add_marks("aux", "external_api", "negative_case")
+def test_async_external_api_call_cancelled_after_deadline(mocker, settings):
+    settings.VPIC_DEADLINE = 0.05
+
+    async def slow_response(request):  # type: ignore
+        await asyncio.sleep(1)
+        return httpx.Response(status.HTTP_200_OK, json={"Results": []})
+
+    transport = httpx.MockTransport(slow_response)
+    mocker.patch("cars_api.external_api.get_async_client", return_value=httpx.AsyncClient(transport=transport))
+    request = APIRequestFactory().post("")
+
+    started = time.perf_counter()
+    with pytest.raises(RequestException, match="External api deadline exceeded"):
+        async_to_sync(async_external_api_call)(request, car_make="Honda", car_model="Civic")
+    assert time.perf_counter() - started < 0.5
+
+
+@pytest.fixture(scope="function")
+def external_api_breaker_enabled(mocker, settings):
+    settings.VPIC_BREAKER_FAILURES = 2
+    settings.VPIC_BREAKER_RESET_TIMEOUT = 30
+    settings.VPIC_BREAKER_HALF_OPEN_CALLS = 1
+    mocker.patch("cars_api.external_api._breaker", None)
+
+
+@add_marks("aux", "external_api", "negative_case")
+@pytest.mark.django_db(reset_sequences=True)
+def test_external_api_circuit_breaker_fails_fast_while_open(mocker, client, external_api_breaker_enabled):
+    request = APIRequestFactory().post("")
+    get_mock = mocker.patch(
+        "cars_api.external_api.requests.Session.get",
+        return_value=MockResponse(json_data={}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE),
+    )
+    for _ in range(2):
+        with pytest.raises(ConnectionError, match="External api error or API unavailable"):
+            external_api_call(request, car_make="Honda", car_model="Civic")  # type: ignore
+
+    # open circuit fails fast, with the same response as unavailable external api
+    response = client.post("/cars/", {"make": "Honda", "model": "Civic"})
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.data == {"external_api_error": "External api unavailable (circuit open), retry in 30 s"}
+    assert get_mock.call_count == 2
+    assert Car.objects.count() == 0
+
+    # after reset timeout a single trial call is made, its failure opens the circuit again
+    breaker = get_breaker()
+    breaker.opened_at -= 30
+    with pytest.raises(ConnectionError, match="External api error or API unavailable"):
+        external_api_call(request, car_make="Honda", car_model="Civic")  # type: ignore
+    with pytest.raises(CircuitOpenError):
+        external_api_call(request, car_make="Honda", car_model="Civic")  # type: ignore
+    assert get_mock.call_count == 3
+
+    # successful trial call closes the circuit
+    breaker.opened_at -= 30
+    get_mock.return_value = MockResponse(
+        json_data={"Results": [{"Make_Name": "HONDA", "Model_Name": "Civic"}]}, status_code=status.HTTP_200_OK
+    )
+    assert external_api_call(request, car_make="Honda", car_model="Civic") == [  # type: ignore
+        {"Make_Name": "HONDA", "Model_Name": "Civic"}
+    ]
+    assert breaker.state == CLOSED
+    response = client.post("/cars/", {"make": "Honda", "model": "Civic"})
+    assert response.status_code == status.HTTP_200_OK
+    assert get_mock.call_count == 5
+
+
+@add_marks("aux", "external_api")
+def test_circuit_breaker_cancelled_trial_call_gives_back_its_slot():
+    breaker = CircuitBreaker("Service", failure_threshold=1, reset_timeout=30)
+    with pytest.raises(ValueError):
+        with breaker.guard():
+            raise ValueError("failed")
+    assert breaker.state == OPEN
+
+    # cancelled trial call is neither success nor failure, the next call is a trial call again
+    breaker.opened_at -= 30
+    for error in (asyncio.CancelledError, KeyboardInterrupt):
+        with pytest.raises(error):
+            with breaker.guard():
+                raise error()
+        assert (breaker.state, breaker.trial_calls) == (HALF_OPEN, 0)
+    with breaker.guard():
+        with pytest.raises(CircuitOpenError, match="circuit half-open"):
+            with breaker.guard():
+                pass
+    assert (breaker.state, breaker.trial_calls) == (CLOSED, 0)
+
+
+@add_marks("aux", "external_api")
+def test_external_api_concurrent_calls_for_the_same_make_coalesced(mocker):
+    in_flight, release = threading.Event(), threading.Event()
+
+    def slow_get(*args, **kwargs):  # type: ignore
+        in_flight.set()
+        release.wait(5)
+        return MockResponse(json_data={"Results": [{"Model_Name": "Civic"}]}, status_code=status.HTTP_200_OK)
+
+    get_mock = mocker.patch("cars_api.external_api.requests.Session.get", side_effect=slow_get)
+    skipped_mock = mocker.patch("cars_api.external_api.record_skipped_external_api_call")
+    request = APIRequestFactory().post("")
+
+    with ThreadPoolExecutor(3) as executor:
+        calls = [executor.submit(get_model_names, request, "Honda")]
+        assert in_flight.wait(5)
+        calls += [executor.submit(get_model_names, request, car_make) for car_make in ("honda", " HONDA ")]
+        # wait until both calls join the one in flight
+        deadline = time.monotonic() + 5
+        while skipped_mock.call_count < 2 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        assert [call.result() for call in calls] == [frozenset({"civic"})] * 3
+    assert get_mock.call_count == 1
+    skipped_mock.assert_called_with("coalesced")
+
+    # results aren't cached, the next call reaches external api
+    get_model_names(request, "Honda")  # type: ignore
+    assert get_mock.call_count == 2
+
+
+@add_marks("aux", "external_api")
+def test_async_external_api_concurrent_calls_for_the_same_make_coalesced(mocker):
+    calls = []
+
+    async def slow_handler(request):  # type: ignore
+        calls.append(request.url)
+        await asyncio.sleep(0.05)
+        return httpx.Response(status.HTTP_200_OK, json={"Results": [{"Make_Name": "HONDA", "Model_Name": "Civic"}]})
+
+    transport = httpx.MockTransport(slow_handler)
+    mocker.patch("cars_api.external_api.get_async_client", return_value=httpx.AsyncClient(transport=transport))
+    request = APIRequestFactory().post("")
+
+    async def create_concurrently():  # type: ignore
+        return await asyncio.gather(
+            *(async_external_api_call(request, car_make="Honda", car_model="civic") for _ in range(3))
+        )
+
+    assert async_to_sync(create_concurrently)() == [[{"Make_Name": "HONDA", "Model_Name": "Civic"}]] * 3
+    assert len(calls) == 1
+
+
+@add_marks("aux")
+def test_iter_json_array_reads_stream_in_chunks():
+    data = [{"car_id": 1, "rating": 5}, 12345, -1.5e3, "a,]b", [1, [2]], None, True]
+    for chunk_size in (1, 2, 5, 64):
+        assert list(iter_json_array(BytesIO(json.dumps(data).encode()), chunk_size)) == data
+    assert list(iter_json_array(BytesIO(b" [ ] "))) == []
+    with pytest.raises(ValueError, match="Expected a JSON array"):
+        list(iter_json_array(BytesIO(b'{"car_id": 1}')))
+    with pytest.raises(ValueError, match="Expected ',' or ']' in JSON array, got '2'"):
+        list(iter_json_array(BytesIO(b"[1 2]"), 1))
+
+
+@add_marks("aux")
+def test_iter_json_array_stops_at_invalid_item_without_buffering_the_rest():
+    valid = b',{"car_id": 1, "rating": 5}' * 100000
+    for body in (b'[{"car_id": 1}, {"car_id" 2}' + valid + b"]", b'[{"car_id": 1}, "a\\x"' + valid + b"]"):
+        stream = BytesIO(body)
+        items = iter_json_array(stream, chunk_size=1024)
+        assert next(items) == {"car_id": 1}
+        with pytest.raises(ValueError, match="Invalid JSON"):
+            next(items)
+        # error is reported right after the invalid item is read, not at the end of the stream
+        assert stream.tell() <= 2048
+    # items cut at the end of a chunk are still decoded
+    data = [-1.5e-300, "🚗 é", {"a": [None, True, False]}]
+    for chunk_size in range(1, 8):
+        assert list(iter_json_array(BytesIO(json.dumps(data).encode()), chunk_size)) == data
+    # a single item can't grow buffer without limit
+    with pytest.raises(ValueError, match="JSON array item longer than 100 characters"):
+        list(iter_json_array(BytesIO(b'["' + b"a" * 1000 + b'"]'), chunk_size=10, max_item_size=100))
+
+
+@add_marks("aux", "external_api")
+def test_async_external_api_call_retries_server_errors(mocker, settings):
+    settings.VPIC_RETRIES = 1
+    settings.VPIC_BACKOFF_FACTOR = 0
+    responses = [
+        httpx.Response(status.HTTP_503_SERVICE_UNAVAILABLE),
+        httpx.Response(status.HTTP_200_OK, json={"Results": [{"Make_Name": "HONDA", "Model_Name": "Civic"}]}),
+    ]
+    transport = httpx.MockTransport(lambda request: responses.pop(0))
+    mocker.patch("cars_api.external_api.get_async_client", return_value=httpx.AsyncClient(transport=transport))
+    request = APIRequestFactory().post("")
+
+    resp = async_to_sync(async_external_api_call)(request, car_make="Honda", car_model="civic")
+    assert resp == [{"Make_Name": "HONDA", "Model_Name": "Civic"}]
+    assert responses == []
+
+
+@add_marks("aux", "external_api", "negative_case")
+def test_async_external_api_call_negative_case_raises_request_exception(mocker):
+    def raise_connect_error(request):
+        raise httpx.ConnectError("Connection refused", request=request)
+
+    transport = httpx.MockTransport(raise_connect_error)
+    mocker.patch("cars_api.external_api.get_async_client", return_value=httpx.AsyncClient(transport=transport))
+    request = APIRequestFactory().post("")
+
+    with pytest.raises(RequestException, match="Connection refused"):
+        async_to_sync(async_external_api_call)(request, car_make="Honda", car_model="Civic")
+
+
+@add_marks("aux", "model")
+@pytest.mark.django_db
+def test_import_vpic_catalogue_command(tmp_path):
+    api_response = {
+        "Count": 2,
+        "Results": [
+            {"Make_ID": 474, "Make_Name": "HONDA", "Model_ID": 1861, "Model_Name": "Accord"},
+            {"Make_ID": 474, "Make_Name": "HONDA", "Model_ID": 1863, "Model_Name": "Civic"},
+        ],
+    }
+    json_dump = tmp_path / "honda.json"
+    json_dump.write_text(json.dumps(api_response))
+    out = StringIO()
+    call_command("import_vpic_catalogue", str(json_dump), stdout=out)
+    assert out.getvalue() == "Read 2 models, created 2, deleted 0 catalogue records.\n"
+
+    # incremental refresh from csv dump, with removal of models missing in the dump
+    csv_dump = tmp_path / "dump.csv"
+    csv_dump.write_text("Make_Name,Model_Name\nHONDA,Civic\nHONDA,Pilot\nAUDI,A4\nhonda,pilot\n")
+    out = StringIO()
+    call_command("import_vpic_catalogue", str(csv_dump), "--prune", stdout=out)
+    assert out.getvalue() == "Read 4 models, created 2, deleted 1 catalogue records.\n"
+    assert sorted(VehicleCatalogue.objects.values_list("make_key", "model_key")) == [
+        ("audi", "a4"),
+        ("honda", "civic"),
+        ("honda", "pilot"),
+    ]
+
+    # list of results is read as a stream
+    list_dump = tmp_path / "list.json"
+    list_dump.write_text(json.dumps([{"make": "Bmw", "model": "X5"}, {"make": "Bmw"}]))
+    with pytest.raises(CommandError, match="Import failed: Missing make or model name"):
+        call_command("import_vpic_catalogue", str(list_dump))
+
+
+@add_marks("aux", "external_api")
+@pytest.mark.django_db
+def test_external_api_call_uses_local_catalogue(mocker, settings):
+    VehicleCatalogue.objects.create(make="HONDA", model="Civic", make_key="honda", model_key="civic")
+    request = APIRequestFactory().post("")
+    get_mock = mocker.patch(
+        "cars_api.external_api.requests.Session.get",
+        return_value=MockResponse(
+            json_data={"Results": [{"Make_Name": "HONDA", "Model_Name": "Pilot"}]}, status_code=status.HTTP_200_OK
+        ),
+    )
+
+    settings.VPIC_CATALOGUE_MODE = "only"
+    assert external_api_call(request, car_make="Honda", car_model="CIVIC") == [
+        {"Make_Name": "Honda", "Model_Name": "CIVIC"}
+    ]
+    with pytest.raises(ValueError, match="No matching result in external api for Honda Pilot"):
+        external_api_call(request, car_make="Honda", car_model="Pilot")
+    assert get_model_names(request, "Honda", ["Pilot"]) == {"civic"}
+    assert get_mock.call_count == 0
+
+    # external api is called only on catalogue misses
+    settings.VPIC_CATALOGUE_MODE = "fallback"
+    external_api_call(request, car_make="Honda", car_model="Civic")
+    assert get_model_names(request, "Honda", ["Civic"]) == {"civic"}
+    assert get_mock.call_count == 0
+    assert external_api_call(request, car_make="Honda", car_model="Pilot") == [
+        {"Make_Name": "HONDA", "Model_Name": "Pilot"}
+    ]
+    assert get_model_names(request, "Honda", ["Civic", "Pilot"]) == {"civic", "pilot"}
+    assert get_mock.call_count == 2
+
+
+@add_marks("aux")
+@pytest.mark.django_db(reset_sequences=True)
+def test_import_vpic_catalogue_counts_only_inserted_records(mocker):
+    bulk_create = VehicleCatalogue.objects.bulk_create
+
+    def racing_bulk_create(objs, **kwargs):  # type: ignore
+        # concurrent import inserts one of the records after the existence check
+        if not VehicleCatalogue.objects.exists():
+            VehicleCatalogue.objects.create(make="HONDA", model="Civic", make_key="honda", model_key="civic")
+        return bulk_create(objs, **kwargs)
+
+    mocker.patch.object(VehicleCatalogue.objects, "bulk_create", side_effect=racing_bulk_create)
+    dump = json.dumps([{"Make_Name": "HONDA", "Model_Name": model} for model in ("Civic", "Pilot")]).encode()
+    stats = vehicle_catalogue.import_dump(BytesIO(dump), "json")
+    assert stats == {"read": 2, "created": 1, "deleted": 0}
+    assert VehicleCatalogue.objects.count() == 2
+
+
+@add_marks("aux", "external_api")
+@pytest.mark.django_db(reset_sequences=True)
+def test_external_api_call_catalogue_only_mode_works_offline(mocker, monkeypatch, settings, client):
+    VehicleCatalogue.objects.create(make="HONDA", model="Civic", make_key="honda", model_key="civic")
+    settings.VPIC_CATALOGUE_MODE = "only"
+    monkeypatch.delenv("EXTERNAL_API_URL", raising=False)
+    get_mock = mocker.patch("cars_api.external_api.requests.Session.get")
+    request = APIRequestFactory().post("")
+
+    assert external_api_call(request, car_make="Honda", car_model="Civic") == [
+        {"Make_Name": "Honda", "Model_Name": "Civic"}
+    ]
+    assert async_to_sync(async_external_api_call)(request, car_make="Honda", car_model="Civic") == [
+        {"Make_Name": "Honda", "Model_Name": "Civic"}
+    ]
+    with pytest.raises(NoMatchingModelError):
+        external_api_call(request, car_make="Honda", car_model="Pilot")
+    with pytest.raises(NoMatchingModelError) as exc_info:
+        external_api_call(request, car_make="Honda", car_model="civc")
+    assert exc_info.value.suggestions == ["Civic"]
+    assert get_model_names(request, "Honda", ["Pilot"]) == {"civic"}
+    assert client.post("/cars/", {"make": "Honda", "model": "Civic"}).status_code == status.HTTP_200_OK
+    assert get_mock.call_count == 0
+    # url is still required when the external api has to be called
+    settings.VPIC_CATALOGUE_MODE = "fallback"
+    with pytest.raises(AttributeError, match="missing api url env variable"):
+        external_api_call(request, car_make="Honda", car_model="Pilot")
@@ -1,11 +1,20 @@
 from django.urls import path
 
-from .views import (CreateRateGenerics, DetailCarGenerics, ListCarGenerics,
-                    PopularCarGenerics)
+from . import async_views
+from .metrics import metrics_view
+from .views import (BulkCreateCarGenerics, BulkCreateRateGenerics,
+                    CarRatesGenerics, CreateRateGenerics, DetailCarGenerics,
+                    ListCarGenerics, PopularCarGenerics, SearchCarGenerics)
 
 urlpatterns = [
     path("cars/", ListCarGenerics.as_view()),
+    path("cars/async/", async_views.create_car),
+    path("cars/bulk/", BulkCreateCarGenerics.as_view()),
+    path("cars/search/", SearchCarGenerics.as_view()),
     path("cars/<int:pk>/", DetailCarGenerics.as_view()),
+    path("cars/<int:pk>/rates/", CarRatesGenerics.as_view()),
     path("rate/", CreateRateGenerics.as_view()),
+    path("rate/bulk/", BulkCreateRateGenerics.as_view()),
     path("popular/", PopularCarGenerics.as_view()),
+    path("metrics", metrics_view),
 ]
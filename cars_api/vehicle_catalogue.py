@@ -0,0 +1,223 @@
+import csv
+import io
+import json
+from typing import IO, Any, Dict, FrozenSet, Iterator, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max
+
+from .external_api_cache import normalize_make
+from .models import VehicleCatalogue
+from .streaming import iter_json_array
+
+# Validation modes (VPIC_CATALOGUE_MODE setting): catalogue not used, catalogue only, catalogue with external api
+# used on misses
+MODE_OFF = "off"
+MODE_ONLY = "only"
+MODE_FALLBACK = "fallback"
+
+
+def get_mode() -> str:
+    """Get catalogue validation mode.
+
+    Returns:
+        str: One of MODE_OFF, MODE_ONLY, MODE_FALLBACK.
+    """
+    return settings.VPIC_CATALOGUE_MODE
+
+
+def normalize_model(car_model: str) -> str:
+    """Normalize model string, to use it as a lookup key.
+
+    Args:
+        car_model (str): Car model string
+
+    Returns:
+        str: Normalized model string.
+    """
+    return car_model.strip().lower()
+
+
+def contains(car_make: str, car_model: str) -> bool:
+    """Check if (make, model) pair is present in catalogue, with a single indexed lookup.
+
+    Args:
+        car_make (str): Car make string
+        car_model (str): Car model string
+
+    Returns:
+        bool: True if pair is present in catalogue.
+    """
+    lookup = {"make_key": normalize_make(car_make), "model_key": normalize_model(car_model)}
+    return VehicleCatalogue.objects.filter(**lookup).exists()
+
+
+def get_model_names(car_make: str) -> FrozenSet[str]:
+    """Get set of lower-cased model names of a make stored in catalogue.
+
+    Args:
+        car_make (str): Car make string
+
+    Returns:
+        FrozenSet[str]: Set of model names (empty if make is not in catalogue).
+    """
+    model_keys = VehicleCatalogue.objects.filter(make_key=normalize_make(car_make)).values_list("model_key", flat=True)
+    return frozenset(model_keys)
+
+
+def get_model_names_version(car_make: str) -> Tuple[int, Optional[int]]:
+    """Get version of model names of a make stored in catalogue, changed by every import adding or removing its models.
+
+    Args:
+        car_make (str): Car make string
+
+    Returns:
+        Tuple[int, Optional[int]]: Number of models of the make and the highest id of their records.
+    """
+    models = VehicleCatalogue.objects.filter(make_key=normalize_make(car_make))
+    stats = models.aggregate(count=Count("id"), last=Max("id"))
+    return stats["count"], stats["last"]
+
+
+def get_original_model_names(car_make: str) -> FrozenSet[str]:
+    """Get set of model names of a make stored in catalogue, in their original casing (e.g. for suggestions).
+
+    Args:
+        car_make (str): Car make string
+
+    Returns:
+        FrozenSet[str]: Set of model names (empty if make is not in catalogue).
+    """
+    models = VehicleCatalogue.objects.filter(make_key=normalize_make(car_make)).values_list("model", flat=True)
+    return frozenset(models)
+
+
+def iter_dump(stream: IO[bytes], file_format: str) -> Iterator[Tuple[str, str]]:
+    """Iterate over (make, model) pairs of vPIC makes/models dump.
+
+    JSON dump is either a list of vPIC results, or a vPIC api response (object with "Results" list).
+    CSV dump has a header with Make_Name and Model_Name (or make and model) columns.
+
+    Args:
+        stream (IO[bytes]): Dump stream (seekable)
+        file_format (str): "json" or "csv"
+
+    Raises:
+        ValueError: An error occuring if dump can't be parsed
+
+    Yields:
+        Tuple[str, str]: Make and model names.
+    """
+    if file_format == "csv":
+        for row in csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig")):
+            yield _get_pair(row)
+        return
+
+    # Dump file is seekable, peek at the first character to tell list from api response. List is read as a stream
+    first = stream.read(1)
+    while first.isspace():
+        first = stream.read(1)
+    stream.seek(0)
+    items: Any = iter_json_array(stream) if first == b"[" else json.load(stream).get("Results", [])
+    for item in items:
+        yield _get_pair(item)
+
+
+def import_dump(stream: IO[bytes], file_format: str, prune: bool = False, batch_size: int = 5000) -> Dict[str, int]:
+    """Import vPIC makes/models dump into catalogue, incrementally.
+
+    Pairs which are already in catalogue are skipped, new ones are inserted in batches. With prune, models which are
+    not present in the dump are removed from catalogue (only for makes present in the dump).
+
+    Args:
+        stream (IO[bytes]): Dump stream (seekable)
+        file_format (str): "json" or "csv"
+        prune (bool): Remove models missing in the dump
+        batch_size (int): Number of pairs inserted with a single query
+
+    Returns:
+        Dict[str, int]: Number of pairs read from dump, number of inserted and deleted catalogue records.
+    """
+    stats = {"read": 0, "created": 0, "deleted": 0}
+    seen: Dict[str, Set[str]] = {}
+    batch: Dict[Tuple[str, str], VehicleCatalogue] = {}
+
+    with transaction.atomic():
+        for make, model in iter_dump(stream, file_format):
+            stats["read"] += 1
+            make_key, model_key = normalize_make(make), normalize_model(model)
+            if model_key in seen.setdefault(make_key, set()):
+                continue
+            seen[make_key].add(model_key)
+            batch[(make_key, model_key)] = VehicleCatalogue(
+                make=make.strip(), model=model.strip(), make_key=make_key, model_key=model_key
+            )
+            if len(batch) >= batch_size:
+                stats["created"] += _insert_new(batch)
+                batch = {}
+        stats["created"] += _insert_new(batch)
+
+        if prune:
+            for make_key, model_keys in seen.items():
+                missing = VehicleCatalogue.objects.filter(make_key=make_key).exclude(model_key__in=model_keys)
+                stats["deleted"] += missing.delete()[0]
+    return stats
+
+
+def _insert_new(batch: Dict[Tuple[str, str], VehicleCatalogue]) -> int:
+    """Insert records of a batch which are not in catalogue yet.
+
+    If records were inserted concurrently after the existence check, unique constraint fails the batch insert.
+    Records are then inserted one by one, skipping the conflicting ones, so only actually inserted ones are counted.
+
+    Args:
+        batch (Dict[Tuple[str, str], VehicleCatalogue]): Records by (make_key, model_key)
+
+    Returns:
+        int: Number of inserted records.
+    """
+    if not batch:
+        return 0
+    existing = set(
+        VehicleCatalogue.objects.filter(
+            make_key__in={make_key for make_key, _ in batch}, model_key__in={model_key for _, model_key in batch}
+        ).values_list("make_key", "model_key")
+    )
+    new = [record for key, record in batch.items() if key not in existing]
+    try:
+        with transaction.atomic():
+            VehicleCatalogue.objects.bulk_create(new)
+        return len(new)
+    except IntegrityError:
+        pass
+    created = 0
+    for record in new:
+        try:
+            with transaction.atomic():
+                VehicleCatalogue.objects.bulk_create([record])
+            created += 1
+        except IntegrityError:
+            pass
+    return created
+
+
+def _get_pair(item: Dict[str, Any]) -> Tuple[str, str]:
+    """Get make and model names from dump item.
+
+    Args:
+        item (Dict[str, Any]): Dump item
+
+    Raises:
+        ValueError: An error occuring if item has no make or model name
+
+    Returns:
+        Tuple[str, str]: Make and model names.
+    """
+    if not isinstance(item, dict):
+        raise ValueError(f"Expected an object with make and model names, got {item}")
+    make = item.get("Make_Name") or item.get("make")
+    model = item.get("Model_Name") or item.get("model")
+    if not (isinstance(make, str) and isinstance(model, str) and make.strip() and model.strip()):
+        raise ValueError(f"Missing make or model name in {item}")
+    return make, model
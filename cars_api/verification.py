@@ -0,0 +1,174 @@
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple, Union
+
+import requests
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .external_api import get_api_url, lookup_model_names
+from .external_api_cache import normalize_make
+from .models import STATUS_PENDING, STATUS_REJECTED, STATUS_VERIFIED, Car, CarVerificationJob, bump_data_version
+
+# Car verification modes (CAR_VERIFICATION_MODE setting): cars verified by request, or queued and verified by worker
+MODE_SYNC = "sync"
+MODE_QUEUED = "queued"
+# Max delay in seconds before retry of a job failed with external api error
+MAX_RETRY_DELAY = 600
+
+# Claimed job: job id, car id, make key and number of attempts (including current one)
+ClaimedJob = Tuple[int, int, str, int]
+
+
+def is_enabled() -> bool:
+    """Check if queued car verification is turned on.
+
+    Returns:
+        bool: True if cars are verified by verify_cars worker.
+    """
+    return settings.CAR_VERIFICATION_MODE == MODE_QUEUED
+
+
+def enqueue(car: Car) -> CarVerificationJob:
+    """Queue verification of a pending car, in the transaction which creates it.
+
+    Args:
+        car (Car): Pending car
+
+    Returns:
+        CarVerificationJob: Queued job.
+    """
+    return CarVerificationJob.objects.create(car_id=car, make_key=normalize_make(car.make))
+
+
+def claim(batch_size: int) -> List[ClaimedJob]:
+    """Claim a batch of available jobs, oldest first, leasing them for CAR_VERIFICATION_LEASE seconds.
+
+    Jobs are locked with SKIP LOCKED (where supported) only while they're claimed, so external api calls don't hold
+    db locks, and multiple workers don't claim the same jobs.
+
+    Args:
+        batch_size (int): Max number of claimed jobs
+
+    Returns:
+        List[ClaimedJob]: Claimed jobs.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            CarVerificationJob.objects.select_for_update(skip_locked=True)
+            .filter(available_at__lte=now)
+            .order_by("available_at", "id")
+            .values_list("id", "car_id", "make_key", "attempts")[:batch_size]
+        )
+        CarVerificationJob.objects.filter(id__in=[job[0] for job in jobs]).update(
+            available_at=now + timedelta(seconds=settings.CAR_VERIFICATION_LEASE), attempts=F("attempts") + 1
+        )
+    return [(job_id, car_id, make_key, attempts + 1) for job_id, car_id, make_key, attempts in jobs]
+
+
+def verify_batch(batch_size: Optional[int] = None, concurrency: Optional[int] = None) -> Dict[str, int]:
+    """Claim a batch of jobs and verify their cars against external api, with a single lookup per make.
+
+    Makes are looked up concurrently, by at most `concurrency` threads. Cars are then marked verified or rejected and
+    their jobs removed, in a single transaction. Jobs of makes failed with external api error (including open circuit
+    breaker) stay queued, and are retried after exponential backoff.
+
+    Args:
+        batch_size (Optional[int]): Max number of verified cars, CAR_VERIFICATION_BATCH_SIZE by default
+        concurrency (Optional[int]): Max number of concurrent lookups, CAR_VERIFICATION_CONCURRENCY by default
+
+    Returns:
+        Dict[str, int]: Number of verified, rejected and retried cars.
+    """
+    jobs = claim(batch_size or settings.CAR_VERIFICATION_BATCH_SIZE)
+    counts = {"verified": 0, "rejected": 0, "retried": 0}
+    if not jobs:
+        return counts
+
+    models = dict(Car.objects.filter(id__in=[job[1] for job in jobs]).values_list("id", "model"))
+    by_make: Dict[str, List[ClaimedJob]] = defaultdict(list)
+    for job in jobs:
+        by_make[job[2]].append(job)
+    api_url = get_api_url()
+
+    def lookup(make_key: str) -> Union[FrozenSet[str], Exception]:
+        try:
+            return lookup_model_names(api_url, make_key, [models.get(job[1], "") for job in by_make[make_key]])
+        except (requests.exceptions.RequestException, ConnectionError) as e:
+            return e
+        finally:
+            # Lookups can use db (cache, catalogue), connections of pool threads aren't closed by anything else
+            connections.close_all()
+
+    workers = min(concurrency or settings.CAR_VERIFICATION_CONCURRENCY, len(by_make))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        lookups = dict(zip(by_make, executor.map(lookup, by_make)))
+
+    statuses: Dict[str, List[int]] = defaultdict(list)
+    done: List[int] = []
+    # Failed jobs by number of attempts and error message
+    retries: Dict[Tuple[int, str], List[int]] = defaultdict(list)
+    for make_key, make_jobs in by_make.items():
+        model_names = lookups[make_key]
+        for job_id, car_id, _, attempts in make_jobs:
+            if isinstance(model_names, Exception):
+                retries[(attempts, f"{model_names}"[:200])].append(job_id)
+                continue
+            # Car removed after its job was claimed has no job anymore (cascade delete)
+            if car_id in models:
+                statuses[STATUS_VERIFIED if models[car_id].lower() in model_names else STATUS_REJECTED].append(car_id)
+            done.append(job_id)
+
+    now = timezone.now()
+    with transaction.atomic():
+        for car_status, car_ids in statuses.items():
+            Car.objects.filter(id__in=car_ids, status=STATUS_PENDING).update(status=car_status)
+        CarVerificationJob.objects.filter(id__in=done).delete()
+        for (attempts, error), job_ids in retries.items():
+            delay = min(settings.CAR_VERIFICATION_RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+            CarVerificationJob.objects.filter(id__in=job_ids).update(
+                available_at=now + timedelta(seconds=delay), last_error=error
+            )
+        if statuses:
+            # Verified cars show up in lists, cached list responses have to be invalidated
+            bump_data_version()
+
+    counts["verified"] = len(statuses[STATUS_VERIFIED])
+    counts["rejected"] = len(statuses[STATUS_REJECTED])
+    counts["retried"] = sum(len(job_ids) for job_ids in retries.values())
+    return counts
+
+
+def run_worker(
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    interval: Optional[float] = None,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> Dict[str, int]:
+    """Verify queued cars in a loop: full batches are verified one after another, then worker waits for interval.
+
+    Args:
+        batch_size (Optional[int]): Max number of cars verified in a batch, CAR_VERIFICATION_BATCH_SIZE by default
+        concurrency (Optional[int]): Max number of concurrent lookups, CAR_VERIFICATION_CONCURRENCY by default
+        interval (Optional[float]): Wait time in seconds after partial batch, CAR_VERIFICATION_INTERVAL by default
+        should_stop (Callable[[], bool]): Function checked after every batch, loop ends when it returns True
+
+    Returns:
+        Dict[str, int]: Number of verified, rejected and retried cars.
+    """
+    batch_size = batch_size or settings.CAR_VERIFICATION_BATCH_SIZE
+    interval = settings.CAR_VERIFICATION_INTERVAL if interval is None else interval
+    totals = {"verified": 0, "rejected": 0, "retried": 0}
+    while True:
+        counts = verify_batch(batch_size, concurrency)
+        for key, count in counts.items():
+            totals[key] += count
+        if should_stop():
+            return totals
+        if sum(counts.values()) < batch_size:
+            time.sleep(interval)
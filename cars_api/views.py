@@ -1,38 +1,190 @@
+import json
+import re
+from calendar import timegm
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
 import requests
-from django.db.models import Avg, Count
-from django.http import Http404
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, QuerySet, Sum
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.http.response import HttpResponseBase
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
 from rest_framework import generics, status
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from .external_api import external_api_call
-from .models import Car, Rate
-from .serializers import CarSerializer, RateSerializer
+from . import rate_buffer, search, verification
+from .external_api import NoMatchingModelError, external_api_call, get_model_names
+from .external_api_cache import normalize_make
+from .models import STATUS_PENDING, STATUS_REJECTED, Car, DataVersion, Rate
+from .pagination import AvgRatingPagination, RatePagination, RatesNumberPagination, WindowRatesPagination
+from .renderers import FastJSONRenderer, NDJSONRenderer
+from .serializers import (
+    CAR_HISTOGRAM_FIELDS,
+    CAR_ROW_FIELDS,
+    CAR_UNIQUE_ERROR,
+    BulkRateSerializer,
+    CarSerializer,
+    RateSerializer,
+    car_rows_to_representation,
+)
+from .streaming import iter_chunks, iter_json_array, iter_ndjson, iter_rendered_json_array, iter_rendered_ndjson
+
+
+class DataVersionCacheMixin:
+    """Conditional GET handling and server-side cache of rendered responses, for list endpoints.
+
+    ETag and Last-Modified are taken from global data version, so answering conditional request or serving cached
+    response costs a single primary key lookup, without running the list query. ETag includes format of negotiated
+    renderer (JSON or NDJSON representation of the same url) and responses vary on Accept header, so caches don't
+    mix up representations. HEAD requests are handled by get, and get the same headers.
+    """
+
+    response_cache_timeout = 60 * 60
+
+    def get(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        """Overridden get method, answers with 304 or cached response if data didn't change.
+
+        Args:
+            request (Request): Input data
+
+        Returns:
+            HttpResponseBase: Not modified, cached or freshly rendered response.
+        """
+        version, updated_at = self.get_data_version(request)
+        changed = f"{updated_at.timestamp():.6f}" if updated_at else "0"
+        self.etag: Optional[str] = quote_etag(f"{version}-{changed}-{request.accepted_renderer.format}")
+        self.last_modified: Optional[int] = timegm(updated_at.utctimetuple()) if updated_at else None
+        self.response_cache_key: Optional[str] = None
+
+        response = get_conditional_response(request, etag=self.etag, last_modified=self.last_modified)
+        if response is not None:
+            return response
+        cache_key = f"cars_api:{self.etag}:{request.build_absolute_uri()}"
+        cached = cache.get(cache_key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+        self.response_cache_key = cache_key
+        return super(DataVersionCacheMixin, self).get(request, *args, **kwargs)  # type: ignore
+
+    def get_data_version(self, request: Request) -> Tuple[str, Optional[datetime]]:
+        """Get version of response data and time of its last change, global data version by default.
+
+        Args:
+            request (Request): Input data
+
+        Returns:
+            Tuple[str, Optional[datetime]]: Version and time of the last change (None if data never changed).
+        """
+        version, updated_at = DataVersion.get()
+        return str(version), updated_at
+
+    def finalize_response(self, request: Request, response: HttpResponseBase, *args, **kwargs) -> HttpResponseBase:
+        """Overridden finalize_response method, caches rendered response and adds validator headers.
 
+        Args:
+            request (Request): Input data
+            response (HttpResponseBase): Response returned by handler
 
-class ListCarGenerics(generics.ListCreateAPIView):
+        Returns:
+            HttpResponseBase: Response with ETag, Last-Modified and Vary headers.
+        """
+        response = super(DataVersionCacheMixin, self).finalize_response(  # type: ignore
+            request, response, *args, **kwargs
+        )
+        if request.method not in ("GET", "HEAD") or getattr(self, "etag", None) is None:
+            return response
+        patch_vary_headers(response, ["Accept"])
+        if self.response_cache_key and isinstance(response, Response) and response.status_code == status.HTTP_200_OK:
+            response.render()
+            cache.set(
+                self.response_cache_key, (response.content, response["Content-Type"]), self.response_cache_timeout
+            )
+        response["ETag"] = self.etag
+        if self.last_modified is not None:
+            response["Last-Modified"] = http_date(self.last_modified)
+        return response
+
+
+class ListCarGenerics(DataVersionCacheMixin, generics.ListCreateAPIView):
     """Post and Get handle for /cars/ endpoint."""
 
-    queryset = Car.objects.all()
+    queryset = Car.objects.verified().order_by("-avg_rating", "id")
     serializer_class = CarSerializer
+    pagination_class = AvgRatingPagination
+    renderer_classes = [FastJSONRenderer, NDJSONRenderer]
+    # GET requests are read from a replica, if configured (see cars_api.db_router)
+    replica_reads = True
+    stream_query_param = "stream"
+    stream_chunk_size = 2000
+    histogram_query_param = "histogram"
 
-    def list(self, request: Request) -> Response:
+    def list(self, request: Request) -> HttpResponseBase:
         """Overridden list method.
 
-            Uses custom queryset, serializer with additional fields and return data ordered by avg_rating value.
+            Returns CarSerializer fields with avg_rating, ordered by stored avg_rating value. Rows are projected
+            with values() and rendered with orjson, without serializer instances (same output as CarSerializer).
+            Data is paginated with cursor, unless `?paginate=false` is passed.
+            Whole list is streamed (JSON array with `?stream=1`, NDJSON with `Accept: application/x-ndjson`), rows
+            are read with a server-side cursor and rendered in chunks, so memory use doesn't depend on list size.
+            With `?histogram=1`, rating histogram, median and Bayesian average rating are added to every car.
         Args:
             request (Request): Input data
 
         Returns:
-            Response: Response with car object list.
+            HttpResponseBase: Response with car object list (single page of it, if paginated), or streamed list.
         """
-        queryset = Car.objects.annotate(avg_rating=Avg("rate__rating")).order_by("-avg_rating")
-        serializer = CarSerializer(queryset, fields=("id", "make", "model", "avg_rating"), many=True)
-        return Response(serializer.data)
+        fields: Tuple[str, ...] = ("id", "make", "model", "avg_rating")
+        if request.query_params.get(self.histogram_query_param, "").lower() in ("1", "true", "yes"):
+            fields += CAR_HISTOGRAM_FIELDS
+        rows = self.get_queryset().values(*CAR_ROW_FIELDS)
+        ndjson = request.accepted_renderer.format == NDJSONRenderer.format
+        if ndjson or request.query_params.get(self.stream_query_param, "").lower() in ("1", "true", "yes"):
+            return self.stream_rows(rows, fields, ndjson)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(car_rows_to_representation(page, fields))
+        return Response(car_rows_to_representation(rows, fields))
+
+    def stream_rows(self, rows: QuerySet, fields: Tuple[str, ...], ndjson: bool) -> StreamingHttpResponse:
+        """Stream represented car rows as JSON array or NDJSON.
+
+        Args:
+            rows (QuerySet): Car rows projected with values()
+            fields (Tuple[str, ...]): CarSerializer field names
+            ndjson (bool): Render NDJSON instead of JSON array
+
+        Returns:
+            StreamingHttpResponse: Streamed list.
+        """
+        # Rows are read after the view returns, so db picked for this request (e.g. a replica) is fixed up front
+        rows = rows.using(rows.db)
+        chunks = (
+            car_rows_to_representation(chunk, fields)
+            for chunk in iter_chunks(rows.iterator(chunk_size=self.stream_chunk_size), self.stream_chunk_size)
+        )
+        renderer = FastJSONRenderer()
+        if ndjson:
+            return StreamingHttpResponse(
+                iter_rendered_ndjson(chunks, renderer.render), content_type=NDJSONRenderer.media_type
+            )
+        return StreamingHttpResponse(
+            iter_rendered_json_array(chunks, renderer.render), content_type=FastJSONRenderer.media_type
+        )
 
     def create(self, request: Request, *args, **kwargs) -> Response:
         """Overriden create method.
 
+            In queued verification mode (CAR_VERIFICATION_MODE setting), car is saved as pending along with its
+            verification job, without calling external api, and accepted with 202 status. It's listed once
+            verify_cars worker verifies it.
         Args:
             request (Request): Input data
 
@@ -41,6 +193,12 @@ class ListCarGenerics(generics.ListCreateAPIView):
         """
         serializer = CarSerializer(data=request.data, fields=("make", "model"))
         serializer.is_valid(raise_exception=True)
+        if verification.is_enabled():
+            with transaction.atomic():
+                car = serializer.save(status=STATUS_PENDING)
+                verification.enqueue(car)
+            data = CarSerializer(car, fields=("id", "make", "model", "status")).data
+            return Response(data, status=status.HTTP_202_ACCEPTED)
 
         car_make = serializer.validated_data.get("make", "")
         car_model = serializer.validated_data.get("model", "")
@@ -54,6 +212,9 @@ class ListCarGenerics(generics.ListCreateAPIView):
             return Response(data={"external_api_error": f"{e}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         except AttributeError as e:
             return Response(data={"external_api_error": f"{e}"}, status=status.HTTP_400_BAD_REQUEST)
+        except NoMatchingModelError as e:
+            data = {"external_api_error": f"{e}", "suggestions": e.suggestions}
+            return Response(data=data, status=status.HTTP_404_NOT_FOUND)
         except ValueError as e:
             return Response(data={"external_api_error": f"{e}"}, status=status.HTTP_404_NOT_FOUND)
 
@@ -61,11 +222,206 @@ class ListCarGenerics(generics.ListCreateAPIView):
         return Response(serializer.data)
 
 
-class DetailCarGenerics(generics.DestroyAPIView):
-    """Delete handle for /cars/<pk>/ endpoint."""
+class SearchCarGenerics(generics.ListAPIView):
+    """Get handle for /cars/search/ endpoint."""
+
+    queryset = Car.objects.all()
+    serializer_class = CarSerializer
+    renderer_classes = [FastJSONRenderer]
+    replica_reads = True
+    default_limit = 10
+    max_limit = 50
+    max_query_length = 100
+
+    def list(self, request: Request) -> Response:
+        """Overridden list method.
+
+            Returns top cars with make or model matching `q` query param (case-insensitive prefix or substring),
+            ranked by average rating (`order=rating`, default) or number of rates (`order=popular`).
+        Args:
+            request (Request): Input data
+
+        Returns:
+            Response: Response with car list, 400 for invalid query params.
+        """
+        query = request.query_params.get("q", "").strip()
+        order = request.query_params.get("order", "rating")
+        if not query or len(query) > self.max_query_length:
+            return Response(
+                data={"validation_error": f"Query param q is required, {self.max_query_length} characters at most"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if order not in search.ORDERINGS:
+            return Response(
+                data={"validation_error": f"Query param order has to be one of: {', '.join(search.ORDERINGS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            limit = min(int(request.query_params.get("limit", self.default_limit)), self.max_limit)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return Response(
+                data={"validation_error": "Query param limit has to be a positive integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        rows = search.search_cars(query, order, limit)
+        return Response(car_rows_to_representation(rows, ("id", "make", "model", "rates_number", "avg_rating")))
+
+
+class BulkCreateCarGenerics(generics.GenericAPIView):
+    """Post handle for /cars/bulk/ endpoint."""
 
     queryset = Car.objects.all()
     serializer_class = CarSerializer
+    max_items = 1000
+
+    def post(self, request: Request, *args, **kwargs) -> Response:
+        """Create multiple cars at once.
+
+            Items are validated with the same rules as in /cars/ endpoint, external api is called once per distinct
+            make and valid cars are inserted with a single query.
+        Args:
+            request (Request): Input data, list of objects with make and model
+
+        Returns:
+            Response: Response with number of created cars and status of each item (in input order).
+        """
+        if not isinstance(request.data, list) or not request.data:
+            return Response(data={"validation_error": "Expected a list of cars"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(request.data) > self.max_items:
+            return Response(
+                data={"validation_error": f"Too many cars, {self.max_items} at most"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results: List[Dict[str, Any]] = [{} for _ in request.data]
+        valid: Dict[int, Dict[str, str]] = {}
+        for index, item in enumerate(request.data):
+            serializer = CarSerializer(data=item, fields=("make", "model"))
+            if serializer.is_valid():
+                valid[index] = serializer.validated_data
+            else:
+                results[index] = {"status": "error", "errors": serializer.errors}
+
+        self._check_unique(valid, results)
+        try:
+            self._check_external_api(request, valid, results)
+        except AttributeError as e:
+            return Response(data={"external_api_error": f"{e}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        self._insert(valid, results)
+        for index, data in valid.items():
+            results[index] = {"status": "created", "make": data["make"], "model": data["model"]}
+        return Response(data={"created": len(valid), "results": results})
+
+    def _insert(self, valid: Dict[int, Dict[str, str]], results: List[Dict[str, Any]]) -> None:
+        """Insert valid items with a single query.
+
+        If a concurrent request inserted some of the cars after _check_unique, unique constraint fails the whole
+        query. Items are then inserted one by one, and duplicates get the same error as in _check_unique.
+
+        Args:
+            valid (Dict[int, Dict[str, str]]): Validated items by input index, updated in place
+            results (List[Dict[str, Any]]): Items statuses, updated in place
+        """
+        try:
+            with transaction.atomic():
+                Car.objects.bulk_create([Car(make=data["make"], model=data["model"]) for data in valid.values()])
+            return
+        except IntegrityError:
+            pass
+        errors = {"non_field_errors": [CAR_UNIQUE_ERROR]}
+        with transaction.atomic():
+            for index, data in list(valid.items()):
+                try:
+                    with transaction.atomic():
+                        Car.objects.create(make=data["make"], model=data["model"])
+                except IntegrityError:
+                    del valid[index]
+                    results[index] = {"status": "error", "errors": errors}
+
+    def _check_unique(self, valid: Dict[int, Dict[str, str]], results: List[Dict[str, Any]]) -> None:
+        """Drop items which already exist in db or are repeated in the input, with a single db query.
+
+        Rejected cars don't count as existing, the same as in car_make_model_unique constraint.
+
+        Args:
+            valid (Dict[int, Dict[str, str]]): Validated items by input index, updated in place
+            results (List[Dict[str, Any]]): Items statuses, updated in place
+        """
+        # Values are compared in the same format as they are saved (see TitleCharField)
+        keys = {index: (str(data["make"]).title(), str(data["model"]).title()) for index, data in valid.items()}
+        existing = set(
+            Car.objects.filter(
+                make__in={make for make, _ in keys.values()}, model__in={model for _, model in keys.values()}
+            )
+            .exclude(status=STATUS_REJECTED)
+            .values_list("make", "model")
+        )
+        errors = {"non_field_errors": [CAR_UNIQUE_ERROR]}
+        for index, key in keys.items():
+            if key in existing:
+                del valid[index]
+                results[index] = {"status": "error", "errors": errors}
+            existing.add(key)
+
+    def _check_external_api(
+        self, request: Request, valid: Dict[int, Dict[str, str]], results: List[Dict[str, Any]]
+    ) -> None:
+        """Drop items not present in external api, with a single external api call per make.
+
+        Args:
+            request (Request): Input data
+            valid (Dict[int, Dict[str, str]]): Validated items by input index, updated in place
+            results (List[Dict[str, Any]]): Items statuses, updated in place
+
+        Raises:
+            AttributeError: An error occuring when incorrect request type and api url are provided
+        """
+        by_make: Dict[str, List[int]] = defaultdict(list)
+        for index, data in valid.items():
+            by_make[normalize_make(data["make"])].append(index)
+
+        for indexes in by_make.values():
+            car_make = valid[indexes[0]]["make"]
+            try:
+                model_names = get_model_names(request, car_make, [valid[index]["model"] for index in indexes])
+            except (requests.exceptions.RequestException, ConnectionError) as e:
+                for index in indexes:
+                    del valid[index]
+                    results[index] = {"status": "error", "errors": {"external_api_error": f"{e}"}}
+                continue
+            for index in indexes:
+                car_model = valid[index]["model"]
+                if car_model.lower() not in model_names:
+                    message = f"No matching result in external api for {valid[index]['make']} {car_model}"
+                    del valid[index]
+                    results[index] = {"status": "error", "errors": {"external_api_error": message}}
+
+
+class DetailCarGenerics(generics.RetrieveDestroyAPIView):
+    """Get and Delete handle for /cars/<pk>/ endpoint."""
+
+    queryset = Car.objects.all()
+    serializer_class = CarSerializer
+
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        """Overridden retrieve method.
+
+            Returns car with rating aggregates, rating histogram and values derived from it (median and Bayesian
+            average rating), read from stored counters with a single query.
+        Args:
+            request (Request): Input data
+
+        Returns:
+            Response: Response with car data, 404 if car doesn't exist.
+        """
+        try:
+            instance = self.get_object()
+        except Http404:
+            return Response(data={"validation_error": "Record doesn't exist"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(CarSerializer(instance).data)
 
     def destroy(self, request: Request, *args, **kwargs) -> Response:
         """Overriden destroy method.
@@ -85,29 +441,306 @@ class DetailCarGenerics(generics.DestroyAPIView):
         return Response(data={"message": "Record deleted"}, status=status.HTTP_200_OK)
 
 
-class PopularCarGenerics(generics.ListAPIView):
+class CarRatesGenerics(generics.ListAPIView):
+    """Get handle for /cars/<pk>/rates/ endpoint."""
+
+    queryset = Rate.objects.order_by("-id")
+    serializer_class = RateSerializer
+    pagination_class = RatePagination
+    renderer_classes = [FastJSONRenderer]
+    replica_reads = True
+
+    def list(self, request: Request, pk: int) -> Response:
+        """Overridden list method.
+
+            Returns rates of a car (id and rating), newest first, with a constant number of queries.
+            Data is paginated with cursor, unless `?paginate=false` is passed.
+        Args:
+            request (Request): Input data
+            pk (int): Car primary key
+
+        Returns:
+            Response: Response with rate list (single page of it, if paginated), 404 if car doesn't exist.
+        """
+        if not Car.objects.filter(pk=pk).exists():
+            return Response(data={"validation_error": "Record doesn't exist"}, status=status.HTTP_404_NOT_FOUND)
+        rows = self.get_queryset().filter(car_id=pk).values("id", "rating")
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(list(rows))
+
+
+class PopularCarGenerics(DataVersionCacheMixin, generics.ListAPIView):
     """Get handle for /popular/ endpoint."""
 
-    queryset = Car.objects.annotate(rates_number=Count("rate")).order_by("-rates_number")
+    queryset = Car.objects.verified().order_by("-rates_count", "id")
     serializer_class = CarSerializer
+    pagination_class = RatesNumberPagination
+    renderer_classes = [FastJSONRenderer]
+    replica_reads = True
+    window_query_param = "window"
 
     def list(self, request: Request) -> Response:
         """Overridden list method.
 
-            Uses serializer with additional field and return data ordered by rate number.
+            Returns CarSerializer fields with rates_number, ordered by rate number. Rows are projected with values()
+            and rendered with orjson, without serializer instances (same output as CarSerializer).
+            With `?window=<n>d`, cars are ranked by number of rates from the last n days (today included), summed
+            from daily rollups (see DailyRates), cars without rates in the window are left out.
+            Data is paginated with cursor, unless `?paginate=false` is passed.
         Args:
             request (Request): Input data
 
         Returns:
-            Response: Response with car object list, ordered by avg_rating
+            Response: Response with car object list (single page of it, if paginated), ordered by rates number,
+            400 for invalid window.
         """
-        queryset = self.get_queryset()
-        serializer = CarSerializer(queryset, fields=("id", "make", "model", "rates_number"), many=True)
-        return Response(serializer.data)
+        try:
+            window_start = self.get_window_start()
+        except ValueError as e:
+            return Response(data={"validation_error": f"{e}"}, status=status.HTTP_400_BAD_REQUEST)
+        if window_start is not None:
+            return self.list_window(window_start)
+        fields = ("id", "make", "model", "rates_number")
+        rows = self.get_queryset().values(*CAR_ROW_FIELDS)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(car_rows_to_representation(page, fields))
+        return Response(car_rows_to_representation(rows, fields))
 
+    def list_window(self, window_start: date) -> Response:
+        """List cars ranked by number of rates since given day, summed from daily rollup buckets.
 
-class CreateRateGenerics(generics.CreateAPIView):
-    """Post handle for /rate/ endpoint."""
+        Args:
+            window_start (date): First day of the window
 
-    queryset = Rate.objects.all()
+        Returns:
+            Response: Response with car object list (single page of it, if paginated).
+        """
+        rows = (
+            Car.objects.verified()
+            .filter(daily_rates__day__gte=window_start, daily_rates__rates_count__gt=0)
+            .values("id", "make", "model")
+            .annotate(window_rates=Sum("daily_rates__rates_count"))
+            .order_by("-window_rates", "id")
+        )
+        paginator = WindowRatesPagination()
+        page = paginator.paginate_queryset(rows, self.request, view=self)
+        data = [
+            {"id": row["id"], "make": str(row["make"]), "model": str(row["model"]), "rates_number": row["window_rates"]}
+            for row in (rows if page is None else page)
+        ]
+        if page is not None:
+            return paginator.get_paginated_response(data)
+        return Response(data)
+
+    def get_window_start(self) -> Optional[date]:
+        """Read popularity window (`<n>d`, up to RATE_ROLLUP_RETENTION_DAYS days) from query params.
+
+        Raises:
+            ValueError: Raised if window is invalid
+
+        Returns:
+            Optional[date]: First day of the window, None for all-time popularity.
+        """
+        value = self.request.query_params.get(self.window_query_param)
+        if value is None:
+            return None
+        match = re.fullmatch(r"(\d+)d", value)
+        days = int(match.group(1)) if match else 0
+        if not 1 <= days <= settings.RATE_ROLLUP_RETENTION_DAYS:
+            raise ValueError(
+                f"Query param window has to be a number of days from 1d to {settings.RATE_ROLLUP_RETENTION_DAYS}d"
+            )
+        return timezone.localdate() - timedelta(days=days - 1)
+
+    def get_data_version(self, request: Request) -> Tuple[str, Optional[datetime]]:
+        """Overridden get_data_version method, windowed lists also change at midnight, when the window moves.
+
+        Args:
+            request (Request): Input data
+
+        Returns:
+            Tuple[str, Optional[datetime]]: Version and time of the last change (None if data never changed).
+        """
+        version, updated_at = super(PopularCarGenerics, self).get_data_version(request)
+        try:
+            window_start = self.get_window_start()
+        except ValueError:
+            return version, updated_at
+        if window_start is None:
+            return version, updated_at
+        midnight = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+        return f"{version}-{window_start.isoformat()}", max(updated_at, midnight) if updated_at else midnight
+
+
+class CreateRateGenerics(generics.ListCreateAPIView):
+    """Post and Get handle for /rate/ endpoint."""
+
+    queryset = Rate.objects.order_by("-id")
     serializer_class = RateSerializer
+    pagination_class = RatePagination
+    renderer_classes = [FastJSONRenderer]
+    replica_reads = True
+
+    def list(self, request: Request) -> Response:
+        """Overridden list method.
+
+            Returns rates with make and model of rated car, newest first. Car data is joined in the same query and
+            rows are projected with values(), so the number of queries doesn't depend on the number of rates.
+            Data is paginated with cursor, unless `?paginate=false` is passed.
+        Args:
+            request (Request): Input data
+
+        Returns:
+            Response: Response with rate list (single page of it, if paginated).
+        """
+        rows = self.get_queryset().values("id", "car_id", "rating", make=F("car_id__make"), model=F("car_id__model"))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(list(rows))
+
+    def create(self, request: Request, *args, **kwargs) -> Response:
+        """Overridden create method.
+
+            In buffered ingestion mode (RATE_INGESTION_MODE setting), validated rate is appended to the buffer and
+            accepted with 202 status, it's moved into Rate table later by the flusher (flush_rate_buffer command).
+        Args:
+            request (Request): Input data
+
+        Returns:
+            Response: Response with rate data, 201 if rate is saved, 202 if it's buffered.
+        """
+        if not rate_buffer.is_enabled():
+            return super(CreateRateGenerics, self).create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        rate_buffer.append(serializer.validated_data["car_id"].pk, serializer.validated_data["rating"])
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class BulkCreateRateGenerics(generics.GenericAPIView):
+    """Post handle for /rate/bulk/ endpoint."""
+
+    queryset = Rate.objects.all()
+    serializer_class = BulkRateSerializer
+    chunk_size = 1000
+    ndjson_content_type = "application/x-ndjson"
+    # Max number of invalid rates reported with details, all of them are counted
+    max_reported_errors = 100
+
+    def post(self, request: Request, *args, **kwargs) -> Response:
+        """Create multiple rates at once.
+
+            Accepts JSON array or newline-delimited JSON (with application/x-ndjson content type) of rates.
+            Request body is read as a stream and rates are validated and inserted in chunks, so memory use doesn't
+            depend on the size of the upload. Invalid rates are skipped, valid ones are still created. Errors of
+            the first max_reported_errors invalid rates are reported, the rest are only counted, so memory use
+            doesn't grow with the number of invalid rates either.
+        Args:
+            request (Request): Input data
+
+        Returns:
+            Response: Response with number of created rates, number of invalid ones and errors of the first invalid
+                ones (with their input index).
+        """
+        created = 0
+        errors = _ErrorReport(self.max_reported_errors)
+        chunk: List[Tuple[int, Any]] = []
+        for index, item in self._iter_items(request, errors):
+            chunk.append((index, item))
+            if len(chunk) == self.chunk_size:
+                created += self._create_chunk(chunk, errors)
+                chunk = []
+        if chunk:
+            created += self._create_chunk(chunk, errors)
+        return Response(data={"created": created, "error_count": errors.count, "errors": errors.errors})
+
+    def _iter_items(self, request: Request, errors: "_ErrorReport") -> Iterator[Tuple[int, Any]]:
+        """Iterate over decoded items of request body, reporting items which can't be decoded.
+
+        Args:
+            request (Request): Input data
+            errors (_ErrorReport): Errors of invalid items, updated in place
+
+        Yields:
+            Tuple[int, Any]: Index of item in input, and decoded item.
+        """
+        if request.content_type.startswith(self.ndjson_content_type):
+            for index, line in enumerate(iter_ndjson(request.stream)):
+                try:
+                    yield index, json.loads(line)
+                except ValueError as e:
+                    errors.add({"index": index, "errors": {"non_field_errors": [f"Invalid JSON: {e}"]}})
+            return
+        index = 0
+        try:
+            for item in iter_json_array(request.stream):
+                yield index, item
+                index += 1
+        except ValueError as e:
+            # Array can't be parsed any further, rates parsed so far are still created
+            errors.add({"index": index, "errors": {"non_field_errors": [f"{e}"]}})
+
+    def _create_chunk(self, chunk: List[Tuple[int, Any]], errors: "_ErrorReport") -> int:
+        """Validate and insert a chunk of rates, with a single query for car existence and a single insert.
+
+        Args:
+            chunk (List[Tuple[int, Any]]): Input index and data of rates
+            errors (_ErrorReport): Errors of invalid rates, updated in place
+
+        Returns:
+            int: Number of created rates.
+        """
+        chunk_errors: List[Dict[str, Any]] = []
+        valid: List[Tuple[int, Dict[str, int]]] = []
+        for index, item in chunk:
+            serializer = BulkRateSerializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                chunk_errors.append({"index": index, "errors": serializer.errors})
+
+        existing = set(
+            Car.objects.verified().filter(pk__in={data["car_id"] for _, data in valid}).values_list("pk", flat=True)
+        )
+        message = RateSerializer.Meta.extra_kwargs["car_id"]["error_messages"]["does_not_exist"]
+        rates = []
+        for index, data in valid:
+            if data["car_id"] in existing:
+                rates.append(Rate(car_id_id=data["car_id"], rating=data["rating"]))
+            else:
+                chunk_errors.append({"index": index, "errors": {"car_id": [message]}})
+        for error in sorted(chunk_errors, key=lambda error: error["index"]):
+            errors.add(error)
+
+        with transaction.atomic():
+            Rate.objects.bulk_create(rates)
+            Car.objects.apply_rating_deltas(rates)
+        return len(rates)
+
+
+class _ErrorReport:
+    """Errors of invalid items of a bulk request: details of the first `limit` errors, and number of all of them."""
+
+    def __init__(self, limit: int) -> None:
+        """Init method of _ErrorReport class.
+
+        Args:
+            limit (int): Max number of errors kept with details
+        """
+        self.limit = limit
+        self.count = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def add(self, error: Dict[str, Any]) -> None:
+        """Count an error, keep its details if the limit isn't reached yet.
+
+        Args:
+            error (Dict[str, Any]): Error of an item, with its input index
+        """
+        self.count += 1
+        if len(self.errors) < self.limit:
+            self.errors.append(error)
@@ -11,9 +11,15 @@ then
     echo "PostgreSQL started"
 fi
 
-python manage.py flush --no-input
-python manage.py collectstatic --noinput
-python manage.py makemigrations
-python manage.py migrate
+if [ "$BOOT_MODE" = "production" ]
+then
+    # Committed migrations are applied only if schema isn't at head, static files are collected only if they changed
+    # (they're collected at image build), data is never flushed
+    python manage.py boot
+else
+    python manage.py flush --no-input
+    python manage.py collectstatic --noinput
+    python manage.py migrate
+fi
 
 exec "$@"
\ No newline at end of file
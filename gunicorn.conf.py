@@ -0,0 +1,24 @@
+"""Gunicorn config, loaded automatically from the working directory.
+
+With PROMETHEUS_MULTIPROC_DIR env variable set, metrics files of previous runs are removed on start, and files of
+exited workers are marked as dead, so /metrics aggregates values of live workers (and totals of exited ones).
+"""
+import glob
+import os
+
+from prometheus_client import multiprocess
+
+
+def on_starting(server) -> None:  # type: ignore
+    """Remove metrics files of previous runs."""
+    metrics_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(metrics_dir, "*.db")):
+            os.remove(path)
+
+
+def child_exit(server, worker) -> None:  # type: ignore
+    """Mark metrics files of exited worker as dead."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)